@@ -0,0 +1 @@
+"""Benchmark suite: Amadeus stand-in, stubbed LLM, load runner and result comparison."""
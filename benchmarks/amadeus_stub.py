@@ -0,0 +1,105 @@
+"""Local stand-in for the Amadeus REST API that replays recorded responses.
+
+Run it on its own with `python -m benchmarks.serve stub --port 8090`, or let
+`python -m benchmarks.run` start it. Point the services at it with
+AMADEUS_BASE_URL / ACCESS_TOKEN_URL (see `benchmarks.run.stub_environment`).
+"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Amadeus endpoint -> recorded fixture file name (without .json).
+ENDPOINT_FIXTURES = {
+    "/v1/security/oauth2/token": "token",
+    "/v1/reference-data/locations": "locations",
+    "/v2/shopping/flight-offers": "flight_offers",
+    "/v1/shopping/flight-destinations": "flight_destinations",
+    "/v1/travel/predictions/trip-purpose": "trip_purpose",
+}
+
+# Query parameters used when re-recording fixtures from the real API.
+RECORD_PARAMS = {
+    "locations": {"keyword": "OPO", "subType": "AIRPORT,CITY"},
+    "flight_offers": {
+        "originLocationCode": "MAD",
+        "destinationLocationCode": "JFK",
+        "departureDate": "2026-03-01",
+        "returnDate": "2026-03-08",
+        "adults": 1,
+        "max": 10,
+    },
+    "flight_destinations": {"origin": "MAD"},
+    "trip_purpose": {
+        "originLocationCode": "MAD",
+        "destinationLocationCode": "NYC",
+        "departureDate": "2026-03-01",
+        "returnDate": "2026-03-05",
+    },
+}
+
+
+def load_fixtures(fixtures_dir: str = FIXTURES_DIR) -> dict:
+    """Read every fixture once and keep the serialized bytes for replay."""
+    fixtures = {}
+    for name in set(ENDPOINT_FIXTURES.values()):
+        with open(os.path.join(fixtures_dir, f"{name}.json"), "rb") as f:
+            fixtures[name] = json.dumps(json.load(f)).encode()
+    return fixtures
+
+
+def create_stub_app(latency_ms: float = 0.0, fixtures_dir: str = FIXTURES_DIR) -> Starlette:
+    """Build the stand-in app; `latency_ms` emulates upstream response time."""
+    fixtures = load_fixtures(fixtures_dir)
+    requests_served = Counter()
+
+    def make_endpoint(name: str):
+        async def endpoint(request: Request) -> Response:
+            requests_served[name] += 1
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000)
+            return Response(fixtures[name], media_type="application/json")
+
+        return endpoint
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(dict(requests_served))
+
+    routes = [
+        Route(
+            path,
+            make_endpoint(name),
+            methods=["POST"] if name == "token" else ["GET"],
+        )
+        for path, name in ENDPOINT_FIXTURES.items()
+    ]
+    routes.append(Route("/__stub__/stats", stats))
+    return Starlette(routes=routes)
+
+
+def record_fixtures(fixtures_dir: str = FIXTURES_DIR):
+    """Re-record the fixtures from the Amadeus test API configured in .env."""
+    from services.amadeus_api_client import AmadeusAPI
+    from utils.token import fetch_token
+
+    api = AmadeusAPI()
+    recorded = {"token": {**fetch_token(), "access_token": "benchmark-access-token"}}
+    for path, name in ENDPOINT_FIXTURES.items():
+        if name in RECORD_PARAMS:
+            recorded[name] = api.get(path, RECORD_PARAMS[name])
+    for name, payload in recorded.items():
+        with open(os.path.join(fixtures_dir, f"{name}.json"), "w") as f:
+            json.dump(payload, f, indent=1)
+        logger.info(f"Recorded fixture {name}")
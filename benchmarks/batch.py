@@ -0,0 +1,213 @@
+"""Round trips and latency saved by batching the tool calls of one turn.
+
+A model response often asks for several tools at once (airport info for the
+origin and the destination, trip purpose for a few date ranges). Each group
+of calls is sent to the MCP server's `/mcp` endpoint three ways, against the
+Amadeus stand-in with the response cache disabled:
+
+- `sequential`: one `tools/call` request after the other;
+- `concurrent`: one request per call, all in flight at once (what ADK's MCP
+  client does);
+- `batch`: one JSON-RPC batch through `ToolCallBatcher` (MCP_TRANSPORT=batch).
+
+and reports HTTP round trips per group (requests counted on the client),
+latency until the last and the first result, and the time saved by the batch:
+
+    python -m benchmarks.batch --requests 100 --latency-ms 40
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import time
+
+import httpx
+
+from benchmarks.run import (
+    MCP_HEADERS,
+    Target,
+    parse_mcp_response,
+    percentile_summary,
+    stub_environment,
+)
+
+# scenario -> rotating groups of (tool name, arguments) requested together
+BATCH_SCENARIOS = {
+    "airports": [
+        [
+            ("get_airport_info", {"airport_code": origin}),
+            ("get_airport_info", {"airport_code": destination}),
+        ]
+        for origin, destination in (("MAD", "JFK"), ("OPO", "LHR"), ("NCE", "BIO"))
+    ],
+    "trip_purpose": [
+        [
+            (
+                "get_trip_purpose",
+                {
+                    "origin": "MAD",
+                    "destination": destination,
+                    "departure_date": f"2026-03-{day:02d}",
+                    "return_date": f"2026-03-{day + 4:02d}",
+                },
+            )
+            for day in (1, 8, 15, 22)
+        ]
+        for destination in ("NYC", "LON", "PAR", "ROM")
+    ],
+    "mixed_turn": [
+        [
+            ("get_airport_info", {"airport_code": origin}),
+            ("get_airport_info", {"airport_code": destination}),
+            (
+                "flight_search_assistant",
+                {
+                    "origin": origin,
+                    "destination": destination,
+                    "departure_date": "2026-03-01",
+                    "return_date": "2026-03-08",
+                },
+            ),
+            ("get_inspiration", {"origin_airport_code": origin}),
+        ]
+        for origin, destination in (("MAD", "JFK"), ("BCN", "LHR"), ("LIS", "CDG"))
+    ],
+}
+
+MODES = ("sequential", "concurrent", "batch")
+
+
+def individual_sender(client: httpx.AsyncClient, url: str):
+    async def call(i: int, name: str, arguments: dict):
+        response = await client.post(
+            url,
+            json={
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "tools/call",
+                "params": {"name": name, "arguments": arguments},
+            },
+            headers=MCP_HEADERS,
+        )
+        message = parse_mcp_response(response)
+        if "result" not in message or message["result"].get("isError"):
+            raise RuntimeError(f"{name} failed: {message}")
+
+    return call
+
+
+async def time_group(mode: str, group: list, call, batcher) -> tuple:
+    """`(seconds to the last result, seconds to the first result)` for one group."""
+    started = time.perf_counter()
+    if mode == "sequential":
+        first = None
+        for i, (name, arguments) in enumerate(group):
+            await call(i, name, arguments)
+            first = first or time.perf_counter() - started
+        return time.perf_counter() - started, first
+    if mode == "concurrent":
+        pending = [call(i, name, arguments) for i, (name, arguments) in enumerate(group)]
+    else:
+        pending = [batcher.call(name, arguments) for name, arguments in group]
+    first = None
+    for finished in asyncio.as_completed(pending):
+        result = await finished
+        if mode == "batch" and result.isError:
+            raise RuntimeError(f"Batched call failed: {result.content}")
+        first = first or time.perf_counter() - started
+    return time.perf_counter() - started, first
+
+
+async def run_comparison(args) -> dict:
+    env = stub_environment(args.stub_port)
+    env["BENCH_TRACE_ALLOC"] = "0"
+    env["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    env["RESPONSE_CACHE_PATH"] = ""
+    os.environ.update(env)
+    from smart_trip_agent.tools import ToolCallBatcher
+
+    targets = [
+        Target("stub", args.stub_port, env, "--latency-ms", str(args.latency_ms)),
+        Target("mcp", args.mcp_port, env),
+    ]
+    url = f"{targets[1].base_url}/mcp/"
+    sent = {"requests": 0}
+
+    async def count_request(request: httpx.Request):
+        sent["requests"] += 1
+
+    report = {}
+    try:
+        async with httpx.AsyncClient(
+            timeout=60.0, event_hooks={"request": [count_request]}
+        ) as client:
+            batcher = ToolCallBatcher(url, window=args.window_ms / 1000, client=client)
+            for target in targets:
+                await target.wait_ready(client)
+            call = individual_sender(client, url)
+            for scenario in args.scenarios:
+                groups = BATCH_SCENARIOS[scenario]
+                calls = len(groups[0])
+                report[scenario] = {"calls_per_group": calls}
+                for mode in MODES:
+                    for i in range(args.warmup):
+                        await time_group(mode, groups[i % len(groups)], call, batcher)
+                    last, first = [], []
+                    sent["requests"] = 0
+                    for i in range(args.requests):
+                        total, earliest = await time_group(
+                            mode, groups[i % len(groups)], call, batcher
+                        )
+                        last.append(total)
+                        first.append(earliest)
+                    report[scenario][mode] = {
+                        "round_trips": round(sent["requests"] / args.requests, 2),
+                        "latency_ms": percentile_summary(last),
+                        "first_result_ms": percentile_summary(first),
+                    }
+                batch = report[scenario]["batch"]["latency_ms"]
+                for mode in ("sequential", "concurrent"):
+                    latency = report[scenario][mode]["latency_ms"]
+                    report[scenario][f"saved_vs_{mode}_ms"] = {
+                        key: latency[key] - batch[key] for key in ("mean", "p50", "p95")
+                    }
+                print(
+                    f"{scenario:13s} {calls} calls  "
+                    + "  ".join(
+                        f"{mode} {report[scenario][mode]['round_trips']:g} rt "
+                        f"p50 {report[scenario][mode]['latency_ms']['p50']:7.2f} ms"
+                        for mode in MODES
+                    )
+                    + f"  saved vs concurrent {report[scenario]['saved_vs_concurrent_ms']['p50']:7.2f} ms"
+                )
+    finally:
+        for target in targets:
+            target.stop()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched MCP tool call benchmark")
+    parser.add_argument(
+        "--scenarios", nargs="*", default=list(BATCH_SCENARIOS), choices=list(BATCH_SCENARIOS)
+    )
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Amadeus stand-in latency")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Batch collection window")
+    parser.add_argument("--stub-port", type=int, default=8090)
+    parser.add_argument("--mcp-port", type=int, default=8082)
+    parser.add_argument("--output", help="Optional JSON results file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_comparison(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
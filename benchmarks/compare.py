@@ -0,0 +1,64 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Exits with status 1 when any scenario's p50/p95/p99 latency grows, or its
+throughput drops, by more than the threshold percentage.
+"""
+
+import sys
+import json
+import argparse
+
+LATENCY_KEYS = ("p50", "p95", "p99")
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """Return `(scenario, metric, before, after, change %, regressed)` rows."""
+    rows = []
+    for scenario, after in candidate["scenarios"].items():
+        before = baseline["scenarios"].get(scenario)
+        if before is None:
+            continue
+        for key in LATENCY_KEYS:
+            b, a = before["latency_ms"][key], after["latency_ms"][key]
+            delta = change(b, a)
+            rows.append((scenario, f"{key} ms", b, a, delta, delta > threshold))
+        delta = change(before["rps"], after["rps"])
+        rows.append((scenario, "req/s", before["rps"], after["rps"], delta, -delta > threshold))
+        b = before.get("allocations", {}).get("peak_kib_per_request")
+        a = after.get("allocations", {}).get("peak_kib_per_request")
+        if b is not None and a is not None:
+            delta = change(b, a)
+            rows.append((scenario, "peak KiB/req", b, a, delta, delta > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}")
+    rows = compare(baseline, candidate, args.threshold)
+    for scenario, metric, before, after, delta, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{scenario:18s} {metric:13s} {before:10.2f} -> {after:10.2f} ({delta:+6.1f}%){flag}"
+        )
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""Latency/throughput benchmark for the MCP mounts and the /chat endpoint.
+
+Starts the Amadeus stand-in, the MCP server and (for the chat scenario) the
+chatbot with a stubbed LLM as subprocesses, drives them at the requested
+concurrency and writes machine-readable results:
+
+    python -m benchmarks.run --concurrency 8 --requests 400
+    python -m benchmarks.run --scenarios mcp_flights chat --output before.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+MCP_HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
+
+# scenario -> (mount, tool name, rotating tool arguments)
+MCP_SCENARIOS = {
+    "mcp_airport": (
+        "/airport/",
+        "get_airport_info",
+        [{"airport_code": code} for code in ("JFK", "OPO", "MAD", "NCE", "LHR", "BIO")],
+    ),
+    "mcp_flights": (
+        "/flights/",
+        "flight_search_assistant",
+        [
+            {
+                "origin": origin,
+                "destination": destination,
+                "departure_date": f"2026-03-{day:02d}",
+                "return_date": f"2026-03-{day + 7:02d}",
+            }
+            for origin, destination in (("MAD", "JFK"), ("BCN", "LHR"), ("LIS", "CDG"))
+            for day in range(1, 8)
+        ],
+    ),
+    "mcp_inspiration": (
+        "/inspiration/",
+        "get_inspiration",
+        [{"origin_airport_code": code} for code in ("MAD", "BCN", "LIS", "PAR", "LON")],
+    ),
+    "mcp_trip_purpose": (
+        "/trip-purpose/",
+        "get_trip_purpose",
+        [
+            {
+                "origin": "MAD",
+                "destination": destination,
+                "departure_date": "2026-03-01",
+                "return_date": "2026-03-05",
+            }
+            for destination in ("NYC", "LON", "PAR", "ROM")
+        ],
+    ),
+}
+
+CHAT_MESSAGES = [
+    "Tell me about the airport JFK",
+    "Search flights from MAD to JFK on 2026-03-01",
+    "Inspire me for a trip from MAD",
+    "What is the trip purpose for MAD to NYC from 2026-03-01 to 2026-03-05",
+]
+
+SCENARIOS = [*MCP_SCENARIOS, "chat"]
+
+
+def percentile_summary(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    cuts = (
+        statistics.quantiles(ordered, n=100, method="inclusive")
+        if len(ordered) > 1
+        else ordered * 99
+    )
+    return {
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": ordered[-1] * 1000,
+    }
+
+
+def parse_mcp_response(response: httpx.Response) -> Dict[str, Any]:
+    """Return the JSON-RPC message from a JSON or SSE MCP response."""
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                return json.loads(line[5:])
+        return {}
+    return response.json()
+
+
+async def run_load(
+    send: Callable[[int], Awaitable[bool]], concurrency: int, requests: int
+) -> Dict[str, Any]:
+    """Issue `requests` calls across `concurrency` workers and time each one."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                ok = await send(i)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "latency_ms": percentile_summary(latencies),
+    }
+
+
+def mcp_sender(client: httpx.AsyncClient, base_url: str, scenario: str):
+    mount, tool, arguments = MCP_SCENARIOS[scenario]
+
+    async def send(i: int) -> bool:
+        payload = {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "tools/call",
+            "params": {"name": tool, "arguments": arguments[i % len(arguments)]},
+        }
+        response = await client.post(
+            f"{base_url}{mount}", json=payload, headers=MCP_HEADERS
+        )
+        message = parse_mcp_response(response)
+        return (
+            response.status_code == 200
+            and "error" not in message
+            and not message.get("result", {}).get("isError")
+        )
+
+    return send
+
+
+def chat_sender(client: httpx.AsyncClient, base_url: str):
+    async def send(i: int) -> bool:
+        response = await client.post(
+            f"{base_url}/chat",
+            json={"message": CHAT_MESSAGES[i % len(CHAT_MESSAGES)], "session_id": None},
+        )
+        return response.status_code == 200 and not response.json()[
+            "response"
+        ].startswith("Error:")
+
+    return send
+
+
+async def measure_allocations(
+    client: httpx.AsyncClient, base_url: str, send, samples: int
+) -> Dict[str, Any]:
+    """Sequential pass against a target started with BENCH_TRACE_ALLOC=1."""
+    await client.post(f"{base_url}/__bench__/alloc")
+    for i in range(samples):
+        await send(i)
+    response = await client.get(f"{base_url}/__bench__/alloc")
+    return response.json()
+
+
+def stub_environment(stub_port: int) -> Dict[str, str]:
+    """Environment pointing the services at the Amadeus stand-in."""
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    return {
+        "AMADEUS_BASE_URL": stub_url,
+        "ACCESS_TOKEN_URL": f"{stub_url}/v1/security/oauth2/token",
+        # oauthlib refuses plain-http token endpoints unless told otherwise.
+        "OAUTHLIB_INSECURE_TRANSPORT": "1",
+        "AMADEUS_CLIENT_ID": "benchmark-client",
+        "AMADEUS_CLIENT_SECRET": "benchmark-secret",
+        "BENCH_TRACE_ALLOC": "1",
+    }
+
+
+class Target:
+    """A `benchmarks.serve` subprocess."""
+
+    def __init__(self, name: str, port: int, env: Dict[str, str], *extra: str):
+        self.name = name
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", name, "--port", str(port), *extra],
+            cwd=ROOT_DIR,
+            env={**os.environ, **env},
+        )
+
+    async def wait_ready(self, client: httpx.AsyncClient, timeout: float = 60.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.name} exited with {self.process.returncode}")
+            try:
+                await client.get(self.base_url + "/", timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"{self.name} did not start within {timeout}s")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    env = stub_environment(args.stub_port)
+    if args.no_cache:
+        env["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+        env["RESPONSE_CACHE_PATH"] = ""
+    targets = [
+        Target("stub", args.stub_port, env, "--latency-ms", str(args.upstream_latency_ms)),
+        Target("mcp", args.mcp_port, env),
+    ]
+    if "chat" in args.scenarios:
+        targets.append(
+            Target(
+                "chat",
+                args.chat_port,
+                env,
+                "--llm-latency-ms",
+                str(args.llm_latency_ms),
+            )
+        )
+
+    results: Dict[str, Any] = {}
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    try:
+        async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+            for target in targets:
+                await target.wait_ready(client)
+            mcp, chat = targets[1], targets[2] if len(targets) > 2 else None
+            for scenario in args.scenarios:
+                if scenario == "chat":
+                    target, send = chat, chat_sender(client, chat.base_url)
+                else:
+                    target, send = mcp, mcp_sender(client, mcp.base_url, scenario)
+                for i in range(args.warmup):
+                    await send(i)
+                result = await run_load(send, args.concurrency, args.requests)
+                result["allocations"] = await measure_allocations(
+                    client, target.base_url, send, args.alloc_samples
+                )
+                results[scenario] = result
+                latency = result["latency_ms"]
+                print(
+                    f"{scenario:18s} {result['rps']:8.1f} req/s  "
+                    f"p50 {latency['p50']:7.2f} ms  p95 {latency['p95']:7.2f} ms  "
+                    f"p99 {latency['p99']:7.2f} ms  errors {result['errors']}"
+                )
+            upstream = await client.get(f"{targets[0].base_url}/__stub__/stats")
+            upstream_requests = upstream.json()
+    finally:
+        for target in targets:
+            target.stop()
+
+    return {
+        "schema": 1,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "cache": not args.no_cache,
+        },
+        "upstream_requests": upstream_requests,
+        "scenarios": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smart Trip Planner benchmarks")
+    parser.add_argument("--scenarios", nargs="*", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    parser.add_argument("--stub-port", type=int, default=8090)
+    # The sub-agents connect to the MCP server on port 8082.
+    parser.add_argument("--mcp-port", type=int, default=8082)
+    parser.add_argument("--chat-port", type=int, default=8091)
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_benchmarks(args))
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{report['commit'] or 'results'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Start one benchmark target (Amadeus stub, MCP server or chatbot) in this process.
+
+    python -m benchmarks.serve stub --port 8090 --latency-ms 80
+    python -m benchmarks.serve mcp --port 8082
+    python -m benchmarks.serve chat --port 8000 --llm-latency-ms 0
+
+With BENCH_TRACE_ALLOC=1 the target is wrapped in `AllocationTracker`, which
+records per-request tracemalloc figures under `/__bench__/alloc`.
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import tracemalloc
+
+import uvicorn
+
+logging.basicConfig(level=logging.WARNING)
+
+
+class AllocationTracker:
+    """ASGI middleware measuring Python allocations made while serving a request.
+
+    For each request it records the tracemalloc peak above the starting
+    point (transient allocations) and the memory still held afterwards
+    (retained allocations). Figures are only meaningful when requests do
+    not overlap, so the benchmark runner measures them in a sequential pass.
+    Tracing slows everything down, so it is only switched on for that pass:
+    POST /__bench__/alloc resets the counters and starts tracing, GET
+    /__bench__/alloc stops tracing and returns the averages.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.peak_bytes = 0
+        self.retained_bytes = 0
+
+    async def _respond(self, send, payload: dict):
+        body = json.dumps(payload).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["path"] == "/__bench__/alloc":
+            if scope["method"] == "POST":
+                self.reset()
+                tracemalloc.start()
+            else:
+                tracemalloc.stop()
+            requests = self.requests or 1
+            return await self._respond(
+                send,
+                {
+                    "requests": self.requests,
+                    "peak_kib_per_request": self.peak_bytes / requests / 1024,
+                    "retained_kib_per_request": self.retained_bytes / requests / 1024,
+                },
+            )
+
+        if not tracemalloc.is_tracing():
+            return await self.app(scope, receive, send)
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.requests += 1
+            self.peak_bytes += max(0, peak - start)
+            self.retained_bytes += max(0, current - start)
+
+
+def build_target(args):
+    if args.target == "stub":
+        from benchmarks.amadeus_stub import create_stub_app
+
+        return create_stub_app(latency_ms=args.latency_ms)
+    if args.target == "mcp":
+        from server import create_app
+
+        return create_app()
+    if args.target == "chat":
+        import chatbot_app
+        from benchmarks.stub_llm import install_stub_llm
+
+        create_smart_trip = chatbot_app.create_smart_trip
+
+        def create_stubbed_smart_trip():
+            # Runs in the app's startup task, before the agent serves requests.
+            smart_trip = create_smart_trip()
+            install_stub_llm(smart_trip.agent, latency_ms=args.llm_latency_ms)
+            return smart_trip
+
+        chatbot_app.create_smart_trip = create_stubbed_smart_trip
+        return chatbot_app.app
+    raise ValueError(f"Unknown target {args.target}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("target", choices=["stub", "mcp", "chat"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    app = build_target(args)
+    if os.getenv("BENCH_TRACE_ALLOC") == "1":
+        app = AllocationTracker(app)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Deterministic stand-in for Gemini so `/chat` can be benchmarked offline.
+
+The stub mimics the shape of a real conversation: the root agent transfers
+to the sub-agent matching the message, the sub-agent calls its tool with
+arguments pulled from the message, and then answers with a short summary
+of the tool result.
+"""
+
+import re
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+CODE_PATTERN = re.compile(r"\b[A-Z]{3}\b")
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Keyword -> sub-agent, checked in order (mirrors ROOT_AGENT_PROMPT_V1).
+ROUTES = (
+    ("purpose", "trip_purpose_agent"),
+    ("inspir", "inspiration_agent"),
+    ("airport", "airport_agent"),
+    ("flight", "flight_search_agent"),
+)
+
+
+def _last_user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents):
+        if content.role == "user":
+            texts = [part.text for part in content.parts or [] if part.text]
+            if texts:
+                return " ".join(texts)
+    return ""
+
+
+def _tool_arguments(tool_name: str, text: str) -> dict:
+    codes = CODE_PATTERN.findall(text) or ["MAD", "JFK"]
+    dates = DATE_PATTERN.findall(text) or ["2026-03-01", "2026-03-08"]
+    origin = codes[0]
+    destination = codes[1] if len(codes) > 1 else "JFK"
+    if tool_name == "get_airport_info":
+        return {"airport_code": origin}
+    if tool_name == "get_inspiration":
+        return {"origin_airport_code": origin}
+    if tool_name == "get_trip_purpose":
+        return {
+            "origin": origin,
+            "destination": destination,
+            "departure_date": dates[0],
+            "return_date": dates[-1],
+        }
+    if tool_name == "flight_search_assistant":
+        return {
+            "origin": origin,
+            "destination": destination,
+            "departure_date": dates[0],
+        }
+    return {"request": text}
+
+
+class StubLlm(BaseLlm):
+    """BaseLlm that answers from simple rules after `latency_ms` of "thinking"."""
+
+    model: str = "stub-llm"
+    latency_ms: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        last_parts = last.parts or [] if last else []
+        function_responses = [p.function_response for p in last_parts if p.function_response]
+        tools = [name for name in llm_request.tools_dict if name != "transfer_to_agent"]
+        text = _last_user_text(llm_request)
+
+        if function_responses and function_responses[0].name != "transfer_to_agent":
+            summary = str(function_responses[0].response)[:200]
+            part = types.Part.from_text(text=f"Here is what I found: {summary}")
+        elif tools:
+            part = types.Part.from_function_call(
+                name=tools[0], args=_tool_arguments(tools[0], text)
+            )
+        elif "transfer_to_agent" in llm_request.tools_dict:
+            lowered = text.lower()
+            agent_name = next(
+                (agent for keyword, agent in ROUTES if keyword in lowered),
+                "flight_search_agent",
+            )
+            part = types.Part.from_function_call(
+                name="transfer_to_agent", args={"agent_name": agent_name}
+            )
+        else:
+            part = types.Part.from_text(text="How can I help with your trip?")
+
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def install_stub_llm(agent, latency_ms: float = 0.0):
+    """Replace the model of `agent` and every agent below it with `StubLlm`."""
+    if hasattr(agent, "model"):
+        agent.model = StubLlm(latency_ms=latency_ms)
+    for tool in getattr(agent, "tools", []) or []:
+        if hasattr(tool, "agent"):
+            install_stub_llm(tool.agent, latency_ms)
+    for sub_agent in agent.sub_agents:
+        install_stub_llm(sub_agent, latency_ms)
@@ -0,0 +1,114 @@
+"""Per-tool-call overhead of the HTTP MCP transport versus the in-process one.
+
+Calls the same tools with the same arguments through the MCP server
+(`tools/call` over Streamable HTTP) and through `InProcessTool`, both backed
+by the Amadeus stand-in with the response cache disabled, and reports the
+latency difference per call:
+
+    python -m benchmarks.transport --requests 200
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import time
+
+import httpx
+
+from benchmarks.run import (
+    MCP_SCENARIOS,
+    Target,
+    mcp_sender,
+    percentile_summary,
+    stub_environment,
+)
+
+
+async def time_calls(send, requests: int) -> list:
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        await send(i)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def run_comparison(args) -> dict:
+    env = stub_environment(args.stub_port)
+    env["BENCH_TRACE_ALLOC"] = "0"
+    env["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    env["RESPONSE_CACHE_PATH"] = ""
+    # The in-process side runs here, so it needs the same environment before
+    # the services are imported.
+    os.environ.update(env)
+    from smart_trip_agent.tools import InProcessToolset
+
+    targets = [
+        Target("stub", args.stub_port, env, "--latency-ms", "0"),
+        Target("mcp", args.mcp_port, env),
+    ]
+    report = {}
+    try:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            for target in targets:
+                await target.wait_ready(client)
+            for scenario in args.scenarios:
+                mount, tool_name, arguments = MCP_SCENARIOS[scenario]
+                tool = next(
+                    tool
+                    for tool in InProcessToolset(mount.strip("/")).tools
+                    if tool.name == tool_name
+                )
+
+                async def send_inprocess(i):
+                    await tool.call(arguments[i % len(arguments)])
+
+                send_http = mcp_sender(client, targets[1].base_url, scenario)
+                for send in (send_http, send_inprocess):
+                    await time_calls(send, args.warmup)
+                http = percentile_summary(await time_calls(send_http, args.requests))
+                inprocess = percentile_summary(
+                    await time_calls(send_inprocess, args.requests)
+                )
+                report[scenario] = {
+                    "http_ms": http,
+                    "inprocess_ms": inprocess,
+                    "saved_per_call_ms": {
+                        key: http[key] - inprocess[key] for key in ("mean", "p50", "p95")
+                    },
+                }
+                saved = report[scenario]["saved_per_call_ms"]
+                print(
+                    f"{scenario:18s} http p50 {http['p50']:7.2f} ms  "
+                    f"in-process p50 {inprocess['p50']:7.2f} ms  "
+                    f"saved {saved['p50']:7.2f} ms/call"
+                )
+    finally:
+        for target in targets:
+            target.stop()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MCP transport overhead benchmark")
+    parser.add_argument(
+        "--scenarios", nargs="*", default=list(MCP_SCENARIOS), choices=list(MCP_SCENARIOS)
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--stub-port", type=int, default=8090)
+    parser.add_argument("--mcp-port", type=int, default=8082)
+    parser.add_argument("--output", help="Optional JSON results file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_comparison(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
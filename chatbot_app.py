@@ -1,21 +1,51 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 import os
+import json
+import importlib
 
-from smart_trip_agent.agent import SmartTripAgent
+from utils.startup import Startup
+from utils.telemetry import configure_tracing, metrics_response_body, span
 
 app = FastAPI()
 
+# Optional OTLP export of chat, agent, tool and Amadeus spans.
+configure_tracing("smart-trip-chatbot")
+
 # Serve static files (for CSS/JS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Configure Jinja2 templates
 templates = Jinja2Templates(directory="templates")
 
-# Initialize the smart trip agent
-smart_trip = SmartTripAgent()
+# The smart trip agent is imported, built and warmed up in the background
+# after startup; requests arriving earlier wait for it.
+startup = Startup.from_env()
+
+
+def create_smart_trip():
+    return importlib.import_module("smart_trip_agent.agent").SmartTripAgent()
+
+
+@app.on_event("startup")
+async def start_agent():
+    startup.start(create_smart_trip)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush queued session writes before the worker exits."""
+    await startup.stop()
+    if startup.agent is not None:
+        await startup.agent.close()
+
+
+@app.get("/health")
+async def health():
+    """Readiness of the agent, with import, build and warm-up timings; 503 until ready."""
+    return JSONResponse(startup.status(), status_code=200 if startup.ready else 503)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -29,8 +59,68 @@ async def chat(request: Request):
     data = await request.json()
     user_message = data.get("message")
     session_id = data.get("session_id")  # Can be None for a new conversation
-    try:
-        agent_response_data = await smart_trip.get_response(user_message, session_id)
-        return JSONResponse(agent_response_data)
-    except Exception as e:
-        return JSONResponse({"response": f"Error: {str(e)}", "session_id": session_id})
+    with span("chat.request", "/chat") as current:
+        try:
+            smart_trip = await startup.get_agent()
+            agent_response_data = await smart_trip.get_response(user_message, session_id)
+            return JSONResponse(agent_response_data)
+        except Exception as e:
+            current.status = "error"
+            return JSONResponse({"response": f"Error: {str(e)}", "session_id": session_id})
+
+
+@app.get("/chat/{session_id}/tokens")
+async def chat_tokens(session_id: str):
+    """Token counts of the session's model requests, before and after compaction."""
+    smart_trip = await startup.get_agent()
+    stats = smart_trip.token_stats(session_id)
+    if stats is None:
+        return JSONResponse({"error": "Unknown session"}, status_code=404)
+    return JSONResponse({"session_id": session_id, **stats})
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: span latencies, token counts, router and cache counters."""
+    body, content_type = metrics_response_body()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/router/stats")
+async def router_stats():
+    """How often the intent router skipped the routing model call."""
+    smart_trip = await startup.get_agent()
+    return JSONResponse(smart_trip.router_stats() or {"enabled": False})
+
+
+@app.get("/answer-cache/stats")
+async def answer_cache_stats():
+    """Hits and misses of the opt-in answer cache."""
+    smart_trip = await startup.get_agent()
+    return JSONResponse(smart_trip.answer_cache_stats() or {"enabled": False})
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: Request):
+    """Stream agent events as newline-delimited JSON while the agent runs."""
+    data = await request.json()
+    user_message = data.get("message")
+    session_id = data.get("session_id")
+
+    async def event_lines():
+        with span("chat.request", "/chat/stream") as current:
+            try:
+                smart_trip = await startup.get_agent()
+                async for event in smart_trip.stream_response(user_message, session_id):
+                    yield json.dumps(event) + "\n"
+            except Exception as e:
+                current.status = "error"
+                yield json.dumps(
+                    {"type": "error", "message": f"Error: {str(e)}", "session_id": session_id}
+                ) + "\n"
+
+    return StreamingResponse(
+        event_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 
 # Airport Info Model
@@ -11,12 +11,9 @@ class AirportInfo(BaseModel):
     detailedName: Optional[str] = Field(None, description="Detailed airport name")
 
 
-# Flight Search Model
-class FlightSearch(BaseModel):
+# Flight Leg Model (one direction of a flight)
+class FlightLeg(BaseModel):
     airline: str = Field(..., description="Name of the airline operating the flight")
-    price: str = Field(
-        ..., description="Total price for the flight, including currency"
-    )
     duration: str = Field(..., description="Total duration of the flight")
     stops: str = Field(..., description="Number of stops (e.g., Nonstop, 1 stop(s))")
     departure: str = Field(..., description="Departure airport and time")
@@ -24,6 +21,63 @@ class FlightSearch(BaseModel):
     travel_class: str = Field(
         ..., description="Cabin class for the flight (e.g., Economy, Business)"
     )
+    layovers: Optional[List[str]] = Field(None, description="Connection airports, in order")
+    longest_layover: Optional[str] = Field(None, description="Longest connection time")
+
+
+# Flight Search Model
+class FlightSearch(FlightLeg):
+    price: str = Field(
+        ..., description="Total price for the flight, including currency"
+    )
+    return_flight: Optional[FlightLeg] = Field(
+        None, description="Return leg of a round trip"
+    )
+
+
+# Flight Search Result Model (structured output of flight_search_assistant)
+class FlightSearchResult(BaseModel):
+    status: str = Field(..., description="success, not_found or error")
+    total_offers: Optional[int] = Field(
+        None, description="Offers returned by Amadeus before filtering and ranking"
+    )
+    message: Optional[str] = Field(None, description="Why no offers are listed")
+    data: List[FlightSearch] = Field(default_factory=list)
+
+
+# Compact Flight Offer Model (abbreviated keys, see `utils.compact_formatter.FLIGHT_KEYS`)
+class CompactFlightOffer(BaseModel):
+    al: str = Field(..., description="Airline")
+    p: float = Field(..., description="Price")
+    c: str = Field(..., description="Currency")
+    d: str = Field(..., description="Duration")
+    s: int = Field(..., description="Stops")
+    o: str = Field(..., description="Origin")
+    ot: str = Field(..., description="Departure time")
+    a: str = Field(..., description="Destination")
+    at: str = Field(..., description="Arrival time")
+    cb: str = Field(..., description="Cabin")
+    rtd: Optional[str] = Field(None, description="Return duration")
+    rts: Optional[int] = Field(None, description="Return stops")
+    rto: Optional[str] = Field(None, description="Return departure time")
+    rta: Optional[str] = Field(None, description="Return arrival time")
+    r: Optional[str] = Field(None, description="Route")
+    sd: Optional[str] = Field(None, description="Searched departure date")
+    sr: Optional[str] = Field(None, description="Searched return date")
+
+
+# Compact Flight Search Result Model (structured output in TOOL_OUTPUT_MODE=compact)
+class CompactFlightSearchResult(BaseModel):
+    status: str = Field(..., description="success, not_found or error")
+    total: Optional[int] = Field(
+        None, description="Offers returned by Amadeus before filtering and ranking"
+    )
+    message: Optional[str] = Field(None, description="Why no offers are listed")
+    k: Optional[Dict[str, str]] = Field(None, description="Legend of the abbreviated keys")
+    data: List[CompactFlightOffer] = Field(default_factory=list)
+    truncated: Optional[int] = Field(
+        None, description="Offers dropped to fit the output budget"
+    )
 
 
 # Inspiration Flight Model
@@ -52,14 +106,108 @@ class TripPurpose(BaseModel):
 
 # Request Models (for input validation)
 class AirportInfoRequest(BaseModel):
-    airport_code: str = Field(..., description="3-letter IATA airport code")
+    airport_code: str = Field(
+        ..., description="3-letter IATA airport code (e.g., LAX, JFK)"
+    )
 
 
-class FlightSearchRequest(BaseModel):
-    origin: str = Field(..., description="Departure airport code")
-    destination: str = Field(..., description="Arrival airport code")
+# Ranking and filter arguments shared by the flight search tools
+# (see `utils.offer_engine.OfferFilters`).
+class OfferFilterRequest(BaseModel):
+    sort_by: Optional[Literal["price", "duration", "departure", "best"]] = Field(
+        None,
+        description="Order of the returned offers (default price; best balances price, duration and stops)",
+    )
+    max_price: Optional[float] = Field(None, description="Highest total price")
+    max_stops: Optional[int] = Field(
+        None, description="Most stops per direction (0 for nonstop only)"
+    )
+    max_duration_hours: Optional[float] = Field(
+        None, description="Longest travel time per direction, in hours"
+    )
+    max_layover_hours: Optional[float] = Field(
+        None, description="Longest connection time, in hours"
+    )
+    departure_time_from: Optional[str] = Field(
+        None, description="Earliest outbound departure time (HH:MM, local)"
+    )
+    departure_time_to: Optional[str] = Field(
+        None, description="Latest outbound departure time (HH:MM, local)"
+    )
+    return_departure_time_from: Optional[str] = Field(
+        None, description="Earliest return departure time (HH:MM, local)"
+    )
+    return_departure_time_to: Optional[str] = Field(
+        None, description="Latest return departure time (HH:MM, local)"
+    )
+    airlines: Optional[List[str]] = Field(
+        None, description='Only offers from these airline codes (e.g., ["IB", "UX"])'
+    )
+
+
+class FlightSearchRequest(OfferFilterRequest):
+    origin: str = Field(..., description="Departure airport code (e.g., ATL, JFK)")
+    destination: str = Field(
+        ..., description="Destination airport code (e.g., LAX, ORD)"
+    )
     departure_date: str = Field(..., description="Departure date (YYYY-MM-DD)")
     return_date: Optional[str] = Field(None, description="Return date (YYYY-MM-DD)")
+    max_results: Optional[int] = Field(
+        None, ge=1, description="Number of offers to return (default 5)"
+    )
+
+
+class FlightSearchBatchRequest(OfferFilterRequest):
+    origins: List[str] = Field(
+        ..., description='Departure airport codes (e.g., ["MAD", "BCN"])'
+    )
+    destinations: List[str] = Field(
+        ..., description='Destination airport codes (e.g., ["JFK", "EWR"])'
+    )
+    departure_date_from: str = Field(
+        ..., description="First departure date to search (YYYY-MM-DD)"
+    )
+    departure_date_to: Optional[str] = Field(
+        None,
+        description="Last departure date to search (YYYY-MM-DD); defaults to departure_date_from",
+    )
+    return_date: Optional[str] = Field(
+        None, description="Fixed return date for round trips (YYYY-MM-DD)"
+    )
+    trip_length_days: Optional[int] = Field(
+        None,
+        ge=1,
+        description="For round trips with flexible dates: days between departure and return",
+    )
+    max_results: Optional[int] = Field(
+        None, ge=1, description="Maximum number of offers to return (default 10)"
+    )
+
+
+class PriceCalendarRequest(BaseModel):
+    origin: str = Field(..., description="Departure airport code (e.g., MAD)")
+    destination: str = Field(..., description="Destination airport code (e.g., JFK)")
+    departure_date_from: str = Field(
+        ..., description="First departure date of interest (YYYY-MM-DD)"
+    )
+    departure_date_to: Optional[str] = Field(
+        None,
+        description="Last departure date of interest (YYYY-MM-DD); defaults to 30 days after departure_date_from",
+    )
+    trip_length_days: Optional[int] = Field(
+        None,
+        ge=0,
+        description="For round trips: days between departure and return; omit for one-way",
+    )
+    max_results: Optional[int] = Field(
+        None, ge=1, description="Number of cheapest dates to highlight (default 5)"
+    )
+
+
+class InspirationRequest(BaseModel):
+    origin_airport_code: str = Field(
+        ..., description="3-letter IATA airport code (e.g., LAX, JFK)"
+    )
 
 
 class InspirationFlightRequest(BaseModel):
@@ -70,9 +218,12 @@ class InspirationFlightRequest(BaseModel):
 
 
 class TripPurposeRequest(BaseModel):
-    origin: str = Field(..., description="Name or IATA code of the origin airport")
+    origin: str = Field(
+        ..., description="3-letter IATA code for the origin airport (e.g., 'LAX')"
+    )
     destination: str = Field(
-        ..., description="Name or IATA code of the destination airport"
+        ..., description="3-letter IATA code for the destination airport (e.g., 'JFK')"
     )
-    departure_date: str = Field(..., description="Departure date (YYYY-MM-DD)")
-    return_date: str = Field(..., description="Return date (YYYY-MM-DD)")
+    departure_date: str = Field(..., description="Departure date in YYYY-MM-DD format")
+    return_date: str = Field(..., description="Return date in YYYY-MM-DD format")
+    adults: Optional[int] = Field(None, description="Number of adult passengers")
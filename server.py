@@ -1,11 +1,18 @@
+import os
+import json
+import asyncio
 import logging
+import time
+import tempfile
 import contextlib
 
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 from collections.abc import AsyncIterator
 
 import mcp.types as types
-from starlette.routing import Mount
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
 from mcp.server.lowlevel import Server
 from starlette.applications import Starlette
 from starlette.types import Receive, Scope, Send
@@ -16,6 +23,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from services.service_orchestrator import TravelAgentService
+from services.tool_definitions import (
+    AIRPORT_TOOLS,
+    FLIGHT_TOOLS,
+    INSPIRATION_TOOLS,
+    MOUNT_TOOLS,
+    TRIP_PURPOSE_TOOLS,
+    TOOL_REGISTRY,
+    call_tool,
+    error_result,
+    to_call_tool_result,
+)
+from utils.telemetry import configure_tracing, metrics_response_body, registry, span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,11 +42,16 @@ logger = logging.getLogger(__name__)
 
 travel_agent_service = TravelAgentService()
 
+# ASGI scope key carrying the mount alias a consolidated-server request came through.
+MOUNT_SCOPE_KEY = "smart_trip.mcp_mount"
+# Most tool calls accepted in one JSON-RPC batch.
+MCP_MAX_BATCH = int(os.getenv("MCP_MAX_BATCH", "20"))
+
 
 def create_airport_mcp_server(server_name: str):
     app = Server(server_name)
 
-    @app.call_tool()
+    @app.call_tool(validate_input=False)
     async def airport_info_tool(
         name: str, arguments: dict[str, Any]
     ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
@@ -40,29 +64,16 @@ def create_airport_mcp_server(server_name: str):
         Returns:
             JSON string containing airport information
         """
+        arguments = TOOL_REGISTRY.validate(name, arguments)
         airport_code = arguments.get("airport_code")
         logger.info(f"Getting airport info for: {airport_code}")
-        return travel_agent_service.get_airport_info(name, arguments)
+        with span("mcp.tool", name):
+            return await travel_agent_service.get_airport_info_async(name, arguments)
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools."""
-        return [
-            types.Tool(
-                name="get_airport_info",
-                description="Get information about an airport using Amadeus API.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "airport_code": {
-                            "type": "string",
-                            "description": "3-letter IATA airport code (e.g., LAX, JFK)",
-                        }
-                    },
-                    "required": ["airport_code"],
-                },
-            )
-        ]
+        return AIRPORT_TOOLS
 
     return app
 
@@ -71,7 +82,7 @@ def create_flight_mcp_server(server_name: str):
     """Create and configure the MCP server."""
     app = Server(server_name)
 
-    @app.call_tool()
+    @app.call_tool(validate_input=False)
     async def search_flights_tool(
         name: str, arguments: dict[str, Any]
     ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
@@ -90,78 +101,29 @@ def create_flight_mcp_server(server_name: str):
         Returns:
             A list of available flights with details
         """
-        origin = arguments.get("origin")
-        destination = arguments.get("destination")
-        logger.info(f"Getting flight search results for: {origin} - {destination}")
-        return travel_agent_service.search_flights(name, arguments)
+        arguments = TOOL_REGISTRY.validate(name, arguments)
+        with span("mcp.tool", name):
+            if name == "flight_search_batch":
+                logger.info(
+                    f"Getting batch flight search results for: {arguments.get('origins')} - {arguments.get('destinations')}"
+                )
+                return await travel_agent_service.search_flights_batch_async(
+                    name, arguments
+                )
+            if name == "flight_price_calendar":
+                logger.info(
+                    f"Getting price calendar for: {arguments.get('origin')} - {arguments.get('destination')}"
+                )
+                return await travel_agent_service.get_price_calendar_async(name, arguments)
+            origin = arguments.get("origin")
+            destination = arguments.get("destination")
+            logger.info(f"Getting flight search results for: {origin} - {destination}")
+            return await travel_agent_service.search_flights_async(name, arguments)
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools."""
-        return [
-            types.Tool(
-                name="flight_search_assistant",
-                description="An intelligent agent that helps travelers find and recommend flights based on their itinerary, including origin, destination, and travel dates.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "origin": {
-                            "type": "string",
-                            "description": "Departure airport code (e.g., ATL, JFK)",
-                        },
-                        "destination": {
-                            "type": "string",
-                            "description": "Destination airport code (e.g., LAX, ORD)",
-                        },
-                        "departure_date": {
-                            "type": "string",
-                            "description": "Departure date (YYYY-MM-DD)",
-                        },
-                        "return_date": {
-                            "type": "string",
-                            "description": "Return date (YYYY-MM-DD)",
-                        },
-                    },
-                    "required": ["origin", "destination", "departure_date"],
-                },
-                outputSchema={
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "airline": {
-                                "type": "string",
-                                "description": "Name of the airline operating the flight.",
-                            },
-                            "price": {
-                                "type": "string",
-                                "description": "Total price for the flight, including currency.",
-                            },
-                            "duration": {
-                                "type": "string",
-                                "description": "Total duration of the flight.",
-                            },
-                            "stops": {
-                                "type": "string",
-                                "description": "Number of stops (e.g., Nonstop, 1 stop(s)).",
-                            },
-                            "departure": {
-                                "type": "string",
-                                "description": "Departure airport and time.",
-                            },
-                            "arrival": {
-                                "type": "string",
-                                "description": "Arrival airport and time.",
-                            },
-                            "travel_class": {
-                                "type": "string",
-                                "description": "Cabin class for the flight (e.g., Economy, Business).",
-                            },
-                        },
-                    },
-                },
-            ),
-        ]
+        return FLIGHT_TOOLS
 
     return app
 
@@ -170,64 +132,23 @@ def create_flight_inspiration_mcp_server(server_name: str):
     """Create and configure the MCP server."""
     app = Server(server_name)
 
-    @app.call_tool()
+    @app.call_tool(validate_input=False)
     async def get_inspiration(
         name: str, arguments: dict[str, Any]
     ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
         """
         Handle inspiration tool call
         """
+        arguments = TOOL_REGISTRY.validate(name, arguments)
         origin_airport_code = arguments.get("origin_airport_code")
         logger.info(f"Getting inspiration for: {origin_airport_code}")
-        return travel_agent_service.get_travel_inspiration(name, arguments)
+        with span("mcp.tool", name):
+            return await travel_agent_service.get_travel_inspiration_async(name, arguments)
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools."""
-        return [
-            types.Tool(
-                name="get_inspiration",
-                description="Help travelers discover their next destination by finding the cheapest flight destinations from a specific city",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "origin_airport_code": {
-                            "type": "string",
-                            "description": "3-letter IATA airport code (e.g., LAX, JFK)",
-                        }
-                    },
-                    "required": ["origin_airport_code"],
-                },
-                outputSchema={
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "origin": {
-                                "type": "string",
-                                "description": "Name and IATA code of the origin airport.",
-                            },
-                            "destination": {
-                                "type": "string",
-                                "description": "Name and IATA code of the destination airport.",
-                            },
-                            "departureDate": {
-                                "type": "string",
-                                "description": "Departure date in YYYY-MM-DD format.",
-                            },
-                            "returnDate": {
-                                "type": "string",
-                                "description": "Return date in YYYY-MM-DD format.",
-                            },
-                            "price": {
-                                "type": "string",
-                                "description": "Total price for the flight.",
-                            },
-                        },
-                    },
-                },
-            ),
-        ]
+        return INSPIRATION_TOOLS
 
     return app
 
@@ -236,155 +157,440 @@ def create_trip_purpose_mcp_server(server_name: str):
     """Create and configure the MCP server."""
     app = Server(server_name)
 
-    @app.call_tool()
+    @app.call_tool(validate_input=False)
     async def get_trip_purpose(
         name: str, arguments: dict[str, Any]
     ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
         """
         Handle trip purpose tool call
         """
+        arguments = TOOL_REGISTRY.validate(name, arguments)
         origin = arguments.get("origin")
         destination = arguments.get("destination")
         logger.info(f"Getting trip purpose for: {origin} to {destination}")
-        return travel_agent_service.get_trip_purpose(name, arguments)
+        with span("mcp.tool", name):
+            return await travel_agent_service.get_trip_purpose_async(name, arguments)
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools."""
-        return [
-            types.Tool(
-                name="get_trip_purpose",
-                description="Predict the purpose of a trip (business or leisure)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "origin": {
-                            "type": "string",
-                            "description": "3-letter IATA code for the origin airport (e.g., 'LAX')",
-                        },
-                        "destination": {
-                            "type": "string",
-                            "description": "3-letter IATA code for the destination airport (e.g., 'JFK')",
-                        },
-                        "departure_date": {
-                            "type": "string",
-                            "description": "Departure date in YYYY-MM-DD format",
-                        },
-                        "return_date": {
-                            "type": "string",
-                            "description": "Return date in YYYY-MM-DD format",
-                        },
-                        "adults": {
-                            "type": "integer",
-                            "description": "Number of adult passengers",
-                        },
-                    },
-                    "required": [
-                        "origin",
-                        "destination",
-                        "departure_date",
-                        "return_date",
-                    ],
-                },
-            ),
-        ]
+        return TRIP_PURPOSE_TOOLS
 
     return app
 
 
-def main(port: int = 8080, json_response: bool = False):
-    """Main server function."""
-    logging.basicConfig(level=logging.INFO)
+def _fast_path_message(request: Request, body: bytes):
+    """The JSON-RPC payload if the mount wrapper answers it itself, else None.
+
+    That is a `tools/list` request (a dict) or a batch of `tools/call`
+    requests (a list), sent with the headers the transport would accept.
+    """
+    if b'"tools/list"' not in body and b'"tools/call"' not in body:
+        return None
+    if not request.headers.get("content-type", "").startswith("application/json"):
+        return None
+    accept = request.headers.get("accept", "")
+    if "application/json" not in accept or "text/event-stream" not in accept:
+        return None
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(message, dict) and message.get("method") == "tools/list":
+        return message
+    if isinstance(message, list) and message and all(
+        isinstance(call, dict)
+        and call.get("method") == "tools/call"
+        and call.get("id") is not None
+        and isinstance(call.get("params"), dict)
+        for call in message
+    ):
+        return message
+    return None
+
+
+def _check_mount(name: Optional[str], mount: Optional[str]):
+    """Raise ValueError unless tool `name` is served under `mount` (None: `/mcp`)."""
+    if mount is not None and name not in {tool.name for tool in TOOL_REGISTRY.tools_for(mount)}:
+        raise ValueError(f"Unknown tool on /{mount}: {name}")
+
+
+async def _batched_call(mount: Optional[str], call: dict) -> bytes:
+    """Run one call of a batch; failures become error results like in the MCP server."""
+    params = call["params"]
+    try:
+        _check_mount(params.get("name"), mount)
+        result = to_call_tool_result(
+            await call_tool(travel_agent_service, params.get("name"), params.get("arguments") or {})
+        )
+    except Exception as e:
+        logger.info(f"Batched call to {params.get('name')} failed due to: {e}")
+        result = error_result(e)
+    response = types.JSONRPCResponse(
+        jsonrpc="2.0",
+        id=call["id"],
+        result=result.model_dump(by_alias=True, mode="json", exclude_none=True),
+    )
+    return response.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+def _batch_response(mount: Optional[str], calls: list, json_response: bool) -> Response:
+    """Run a batch of `tools/call` requests concurrently.
+
+    With SSE each result is sent as soon as its call finishes; with JSON
+    responses the array of results is returned once all have finished.
+    """
+    if len(calls) > MCP_MAX_BATCH:
+        return JSONResponse(
+            {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": types.INVALID_REQUEST,
+                    "message": f"Batch of {len(calls)} calls exceeds MCP_MAX_BATCH ({MCP_MAX_BATCH})",
+                },
+            },
+            status_code=400,
+        )
+    logger.info(f"Running a batch of {len(calls)} tool calls via /{mount or 'mcp'}")
+
+    async def results():
+        with span("mcp.batch", mount or "mcp"):
+            tasks = [asyncio.create_task(_batched_call(mount, call)) for call in calls]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    yield await finished
+            finally:
+                for task in tasks:
+                    task.cancel()
 
-    app = create_airport_mcp_server("airport_mcp_server")
+    if json_response:
 
-    # Create session manager with stateless mode for scalability
-    airport_session_manager = StreamableHTTPSessionManager(
-        app=app,
-        event_store=None,
-        json_response=json_response,
-        stateless=True,  # Important for Cloud Run scalability
+        async def body():
+            messages = [message async for message in results()]
+            yield b"[" + b",".join(messages) + b"]"
+
+        return StreamingResponse(body(), media_type="application/json")
+
+    async def events():
+        async for message in results():
+            yield b"event: message\r\ndata: " + message + b"\r\n\r\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache, no-transform"},
     )
 
-    async def handle_streamable_http(
-        scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        await airport_session_manager.handle_request(scope, receive, send)
 
-    flight_app = create_flight_mcp_server("flight_mcp_server")
+def serve_mcp_mount(mount: Optional[str], handle_request, json_response: bool):
+    """Wrap a mount's ASGI handler to answer `tools/list` from the registry and
+    to run batches of tool calls (`mount=None` is `/mcp`, listing every tool).
+
+    The session managers are stateless, so each request otherwise sets up a
+    transport and a server session just to return the same tool list. The
+    cached response carries the tool list's ETag; a client sending it back in
+    `If-None-Match` gets `304 Not Modified`.
+
+    A JSON-RPC array of `tools/call` requests, which the MCP transport would
+    reject, runs its calls concurrently on the shared `TravelAgentService`
+    (so they share its response cache and request coalescing) and streams
+    each result back as it completes, in completion order. Every other
+    request is passed on unchanged.
+    """
+    result, etag = TOOL_REGISTRY.list_tools_result(mount)
+
+    async def handler(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await handle_request(scope, receive, send)
+            return
+        request = Request(scope, receive)
+        body = await request.body()
+        message = _fast_path_message(request, body)
+        if message is None:
+            replayed = False
+
+            async def replay():
+                nonlocal replayed
+                if not replayed:
+                    replayed = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                return await receive()
+
+            await handle_request(scope, replay, send)
+            return
+        if isinstance(message, list):
+            response = _batch_response(mount, message, json_response)
+        elif request.headers.get("if-none-match") == etag:
+            response = Response(status_code=304, headers={"ETag": etag})
+        else:
+            message = b'{"jsonrpc":"2.0","id":%s,"result":%s}' % (
+                json.dumps(message.get("id")).encode(),
+                result,
+            )
+            if json_response:
+                response = Response(
+                    message, media_type="application/json", headers={"ETag": etag}
+                )
+            else:
+                response = Response(
+                    b"event: message\r\ndata: " + message + b"\r\n\r\n",
+                    media_type="text/event-stream",
+                    headers={"ETag": etag, "Cache-Control": "no-cache, no-transform"},
+                )
+        await response(scope, receive, send)
+
+    return handler
+
+
+def create_consolidated_mcp_server(server_name: str):
+    """One MCP server for every tool, routing each call by tool name.
+
+    Requests through a mount alias (`/airport`, ...) list only that mount's
+    tools; `/mcp` lists all of them.
+    """
+    app = Server(server_name)
+
+    def request_mount():
+        try:
+            request = app.request_context.request
+        except LookupError:
+            return None
+        return request.scope.get(MOUNT_SCOPE_KEY) if request is not None else None
+
+    @app.call_tool(validate_input=False)
+    async def route_tool_call(
+        name: str, arguments: dict[str, Any]
+    ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
+        """Validate the arguments and run the tool's `TravelAgentService` handler."""
+        mount = request_mount()
+        logger.info(f"Calling {name} via {mount or '/mcp'}")
+        _check_mount(name, mount)
+        return await call_tool(travel_agent_service, name, arguments)
+
+    @app.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        """List the tools of the mount the request came through (all on `/mcp`)."""
+        return TOOL_REGISTRY.tools_for(request_mount())
+
+    return app
 
-    # Create session manager with stateless mode for scalability
-    flight_session_manager = StreamableHTTPSessionManager(
-        app=flight_app,
+
+def _session_manager(app: Server, json_response: bool) -> StreamableHTTPSessionManager:
+    return StreamableHTTPSessionManager(
+        app=app,
         event_store=None,
         json_response=json_response,
         stateless=True,  # Important for Cloud Run scalability
     )
 
-    async def handle_streamable_http_flight(
-        scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        await flight_session_manager.handle_request(scope, receive, send)
+
+def consolidated_mounts(json_response: bool):
+    """`/mcp` plus the four mount paths as aliases, all on one session manager."""
+    session_manager = _session_manager(
+        create_consolidated_mcp_server("smart_trip_mcp_server"), json_response
+    )
+
+    def alias(mount: str):
+        async def handle_alias(scope: Scope, receive: Receive, send: Send) -> None:
+            await session_manager.handle_request(
+                {**scope, MOUNT_SCOPE_KEY: mount}, receive, send
+            )
+
+        return serve_mcp_mount(mount, handle_alias, json_response)
+
+    mounts = [
+        Mount(
+            "/mcp",
+            app=serve_mcp_mount(
+                None, session_manager.handle_request, json_response
+            ),
+        )
+    ]
+    mounts += [Mount(f"/{mount}", app=alias(mount)) for mount in MOUNT_TOOLS]
+    return [session_manager], mounts
+
+
+def separate_mounts(json_response: bool):
+    """One MCP server and session manager per mount (MCP_CONSOLIDATED=false)."""
+    app = create_airport_mcp_server("airport_mcp_server")
+    airport_session_manager = _session_manager(app, json_response)
+
+    flight_app = create_flight_mcp_server("flight_mcp_server")
+    flight_session_manager = _session_manager(flight_app, json_response)
 
     inspiration_app = create_flight_inspiration_mcp_server(
         "flight_inspiration_mcp_server"
     )
-    # Create session manager with stateless mode for scalability
-    inspiration_session_manager = StreamableHTTPSessionManager(
-        app=inspiration_app,
-        event_store=None,
-        json_response=json_response,
-        stateless=True,  # Important for Cloud Run scalability
-    )
-
-    async def handle_streamable_http_inspiration(
-        scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        await inspiration_session_manager.handle_request(scope, receive, send)
+    inspiration_session_manager = _session_manager(inspiration_app, json_response)
 
     trip_purpose_app = create_trip_purpose_mcp_server("trip_purpose_mcp_server")
-    # Create session manager with stateless mode for scalability
-    trip_purpose_session_manager = StreamableHTTPSessionManager(
-        app=trip_purpose_app,
-        event_store=None,
-        json_response=json_response,
-        stateless=True,  # Important for Cloud Run scalability
-    )
+    trip_purpose_session_manager = _session_manager(trip_purpose_app, json_response)
 
-    async def handle_streamable_http_trip_purpose(
-        scope: Scope, receive: Receive, send: Send
-    ) -> None:
-        await trip_purpose_session_manager.handle_request(scope, receive, send)
+    mounts = [
+        Mount(
+            "/airport",
+            app=serve_mcp_mount(
+                "airport", airport_session_manager.handle_request, json_response
+            ),
+        ),
+        Mount(
+            "/flights",
+            app=serve_mcp_mount(
+                "flights", flight_session_manager.handle_request, json_response
+            ),
+        ),
+        Mount(
+            "/inspiration",
+            app=serve_mcp_mount(
+                "inspiration", inspiration_session_manager.handle_request, json_response
+            ),
+        ),
+        Mount(
+            "/trip-purpose",
+            app=serve_mcp_mount(
+                "trip-purpose", trip_purpose_session_manager.handle_request, json_response
+            ),
+        ),
+    ]
+    session_managers = [
+        trip_purpose_session_manager,
+        inspiration_session_manager,
+        flight_session_manager,
+        airport_session_manager,
+    ]
+    return session_managers, mounts
+
+
+def create_app(json_response: bool = None, consolidated: bool = None) -> Starlette:
+    """Build the Starlette app hosting the MCP tools.
+
+    By default (MCP_CONSOLIDATED=true) one MCP server and session manager
+    serve every tool on `/mcp`, and `/airport`, `/flights`, `/inspiration`
+    and `/trip-purpose` are aliases listing only their own tools. Otherwise
+    each mount gets its own server and session manager.
+
+    Also used as the uvicorn app factory (`server:create_app`) in multi-worker
+    mode, where each worker process builds its own app; `json_response` then
+    comes from MCP_JSON_RESPONSE.
+    """
+    if json_response is None:
+        json_response = os.getenv("MCP_JSON_RESPONSE", "false").lower() == "true"
+    if consolidated is None:
+        consolidated = os.getenv("MCP_CONSOLIDATED", "true").lower() == "true"
+    configure_tracing("smart-trip-mcp-server")
+    registry.add_collector(travel_agent_service.metric_samples)
+
+    if consolidated:
+        session_managers, mounts = consolidated_mounts(json_response)
+    else:
+        session_managers, mounts = separate_mounts(json_response)
+
+    started = time.perf_counter()
+    readiness = {"ready": False}
 
     @contextlib.asynccontextmanager
     async def lifespan(app: Starlette) -> AsyncIterator[None]:
         """Manage session manager lifecycle."""
-        # async with session_manager.run():
         async with contextlib.AsyncExitStack() as stack:
-            await stack.enter_async_context(trip_purpose_session_manager.run())
-            await stack.enter_async_context(inspiration_session_manager.run())
-            await stack.enter_async_context(flight_session_manager.run())
-            await stack.enter_async_context(airport_session_manager.run())
+            for session_manager in session_managers:
+                await stack.enter_async_context(session_manager.run())
+            travel_agent_service.start_background_jobs()
+            readiness["ready"] = True
+            readiness["startup_s"] = round(time.perf_counter() - started, 3)
             logger.info("MCP Streamable HTTP server started!")
             try:
                 yield
             finally:
-                logger.info("MCP server shutting down...")
-
-    starlette_app = Starlette(
+                readiness["ready"] = False
+                # uvicorn has stopped accepting connections and waited for
+                # in-flight requests (up to MCP_DRAIN_TIMEOUT) by now.
+                logger.info(f"MCP server worker {os.getpid()} shutting down...")
+                await travel_agent_service.aclose()
+
+    async def health(request: Request) -> JSONResponse:
+        """Readiness of this worker: 200 once every session manager runs."""
+        return JSONResponse(
+            {"status": "ready" if readiness["ready"] else "starting", **readiness},
+            status_code=200 if readiness["ready"] else 503,
+        )
+
+    async def stats(request: Request) -> JSONResponse:
+        """Response cache and request coalescing counters for this worker."""
+        return JSONResponse(travel_agent_service.stats())
+
+    async def metrics(request: Request) -> Response:
+        """Prometheus metrics (span latencies, Amadeus responses, cache counters) for this worker."""
+        body, content_type = metrics_response_body()
+        return Response(body, media_type=content_type)
+
+    return Starlette(
         debug=False,  # Set to False for production
         routes=[
-            Mount("/airport", app=handle_streamable_http),
-            Mount("/flights", app=handle_streamable_http_flight),
-            Mount("/inspiration", app=handle_streamable_http_inspiration),
-            Mount("/trip-purpose", app=handle_streamable_http_trip_purpose),
+            Route("/health", health),
+            Route("/stats", stats),
+            Route("/metrics", metrics),
+            *mounts,
         ],
         lifespan=lifespan,
     )
 
+
+def configure_shared_state():
+    """Point every worker at the same token store and response cache files.
+
+    Workers inherit the environment, so they share the Amadeus token, the
+    on-disk response cache and the price calendars unless TOKEN_STORE_PATH /
+    RESPONSE_CACHE_PATH / PRICE_CALENDAR_PATH were set explicitly.
+    """
+    state_dir = os.getenv("MCP_STATE_DIR", tempfile.gettempdir())
+    os.environ.setdefault(
+        "TOKEN_STORE_PATH", os.path.join(state_dir, "smart_trip_token.sqlite3")
+    )
+    os.environ.setdefault(
+        "RESPONSE_CACHE_PATH", os.path.join(state_dir, "smart_trip_cache.sqlite3")
+    )
+    os.environ.setdefault(
+        "PRICE_CALENDAR_PATH",
+        os.path.join(state_dir, "smart_trip_price_calendar.sqlite3"),
+    )
+
+
+def main(port: int = 8080, json_response: bool = False, workers: int = None):
+    """Main server function.
+
+    With more than one worker (`workers` or MCP_WORKERS), uvicorn starts that
+    many processes sharing the listening socket, each building its app from
+    `create_app`. On shutdown every worker stops accepting connections and
+    drains in-flight requests for up to MCP_DRAIN_TIMEOUT seconds.
+    """
+    logging.basicConfig(level=logging.INFO)
+
     import uvicorn
 
-    uvicorn.run(starlette_app, host="0.0.0.0", port=port)
+    workers = workers or int(os.getenv("MCP_WORKERS", "1"))
+    drain_timeout = int(os.getenv("MCP_DRAIN_TIMEOUT", "30"))
+
+    if workers > 1:
+        configure_shared_state()
+        os.environ["MCP_JSON_RESPONSE"] = str(json_response).lower()
+        logger.info(f"Starting MCP server with {workers} workers on port {port}")
+        uvicorn.run(
+            "server:create_app",
+            factory=True,
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            timeout_graceful_shutdown=drain_timeout,
+        )
+    else:
+        starlette_app = create_app(json_response=json_response)
+        uvicorn.run(
+            starlette_app,
+            host="0.0.0.0",
+            port=port,
+            timeout_graceful_shutdown=drain_timeout,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import time
+import bisect
+import difflib
+import logging
+import argparse
+import itertools
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "airport_index.json",
+)
+
+FIELDS = (
+    "subType",
+    "iataCode",
+    "name",
+    "detailedName",
+    "cityName",
+    "cityCode",
+    "countryName",
+    "countryCode",
+    "regionCode",
+)
+ADDRESS_FIELDS = ("cityName", "cityCode", "countryName", "countryCode", "regionCode")
+
+
+def location_to_row(location: Dict[str, Any]) -> Optional[tuple]:
+    """Flatten an Amadeus location record into an index row."""
+    iata_code = location.get("iataCode")
+    if not iata_code:
+        return None
+    address = location.get("address", {})
+    return (
+        location.get("subType", ""),
+        iata_code.upper(),
+        location.get("name", ""),
+        location.get("detailedName", ""),
+        address.get("cityName", ""),
+        address.get("cityCode", ""),
+        address.get("countryName", ""),
+        address.get("countryCode", ""),
+        address.get("regionCode", ""),
+    )
+
+
+class AirportIndex:
+    """Compact, array-backed index of Amadeus airport and city locations.
+
+    Each field is stored as one column list and rows are addressed by
+    position, so the whole index is a handful of flat lists rather than a
+    dict per location. Lookups by IATA code go through a code -> row
+    positions map (O(1)); name lookups bisect a sorted list of name tokens
+    for prefix search and fall back to `difflib` for fuzzy matching.
+
+    Records are returned in the same shape as the Amadeus locations API so
+    they can be passed straight to `format_airport_info_response`.
+    """
+
+    def __init__(self, rows: Iterable[tuple] = (), generated_at: Optional[float] = None):
+        self.generated_at = generated_at
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._columns: Dict[str, List[str]] = {field: [] for field in FIELDS}
+        self._by_code: Dict[str, List[int]] = {}
+        self._row_keys: set = set()
+        self._name_tokens: List[tuple] = []
+        self._names: Dict[str, List[int]] = {}
+        # City and airport name -> code (the city code for city names).
+        self._places: Dict[str, str] = {}
+        self._longest_place = 1
+        self.add_rows(rows)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "AirportIndex":
+        """Load the bundled index file; an unreadable file yields an empty index."""
+        try:
+            with open(path) as f:
+                document = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load airport index from {path}: {e}")
+            return cls()
+        positions = [document["fields"].index(field) for field in FIELDS]
+        rows = (tuple(row[i] for i in positions) for row in document["rows"])
+        index = cls(rows, generated_at=document.get("generated_at"))
+        logger.info(f"Loaded airport index with {len(index)} locations from {path}")
+        return index
+
+    def save(self, path: str = DEFAULT_INDEX_PATH, source: str = "amadeus"):
+        """Write the index as a compact JSON row file."""
+        with self._lock:
+            rows = [
+                [self._columns[field][i] for field in FIELDS] for i in range(len(self))
+            ]
+        document = {
+            "version": 1,
+            "generated_at": self.generated_at,
+            "source": source,
+            "fields": list(FIELDS),
+            "rows": rows,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(document, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote airport index with {len(rows)} locations to {path}")
+
+    def __len__(self) -> int:
+        return len(self._columns["iataCode"])
+
+    def add_rows(self, rows: Iterable[tuple]) -> int:
+        """Append rows that are not already indexed; returns the number added."""
+        added = 0
+        tokens = []
+        with self._lock:
+            for row in rows:
+                key = (row[0], row[1])
+                if key in self._row_keys:
+                    continue
+                self._row_keys.add(key)
+                position = len(self._columns["iataCode"])
+                for field, value in zip(FIELDS, row):
+                    self._columns[field].append(value or "")
+                self._by_code.setdefault(row[1], []).append(position)
+                name = (row[2] or "").upper()
+                self._names.setdefault(name, []).append(position)
+                tokens.extend((token, position) for token in {name, *name.split()})
+                city = (row[4] or "").upper()
+                if city:
+                    self._places.setdefault(city, row[5] or row[1])
+                self._places.setdefault(name, row[1])
+                self._longest_place = max(
+                    self._longest_place, len(city.split()), len(name.split())
+                )
+                added += 1
+            if tokens:
+                self._name_tokens.extend(tokens)
+                self._name_tokens.sort()
+        return added
+
+    def add_locations(self, locations: Iterable[Dict[str, Any]]) -> int:
+        """Index Amadeus location records, e.g. from an API fallback response."""
+        rows = [row for row in map(location_to_row, locations) if row]
+        return self.add_rows(rows)
+
+    def __contains__(self, iata_code: str) -> bool:
+        return iata_code.strip().upper() in self._by_code
+
+    def codes(self) -> List[str]:
+        """Return every indexed IATA code."""
+        return sorted(self._by_code)
+
+    def _record(self, position: int) -> Dict[str, Any]:
+        columns = self._columns
+        return {
+            "type": "location",
+            "subType": columns["subType"][position],
+            "name": columns["name"][position],
+            "detailedName": columns["detailedName"][position],
+            "iataCode": columns["iataCode"][position],
+            "address": {
+                field: columns[field][position]
+                for field in ADDRESS_FIELDS
+                if columns[field][position]
+            },
+        }
+
+    def lookup(self, iata_code: str) -> List[Dict[str, Any]]:
+        """Return every airport/city record with this IATA code."""
+        positions = self._by_code.get(iata_code.strip().upper(), ())
+        if positions:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return [self._record(position) for position in positions]
+
+    def find_places(self, words: List[str]) -> List[Tuple[int, int, str]]:
+        """`(start, end, code)` for each run of `words` naming an indexed city or
+        airport, longest match first ("new york" -> NYC, "heathrow" -> LHR)."""
+        words = [word.upper() for word in words]
+        places = []
+        start = 0
+        while start < len(words):
+            for end in range(min(len(words), start + self._longest_place), start, -1):
+                code = self._places.get(" ".join(words[start:end]))
+                if code:
+                    places.append((start, end, code))
+                    start = end
+                    break
+            else:
+                start += 1
+        return places
+
+    def search_prefix(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return locations whose name (or a word in it) starts with `prefix`."""
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._name_tokens, (prefix, -1))
+        positions = []
+        for token, position in itertools.islice(self._name_tokens, start, None):
+            if not token.startswith(prefix):
+                break
+            if position not in positions:
+                positions.append(position)
+            if len(positions) >= limit:
+                break
+        return [self._record(position) for position in positions]
+
+    def search_fuzzy(
+        self, query: str, limit: int = 5, cutoff: float = 0.6
+    ) -> List[Dict[str, Any]]:
+        """Return locations whose name is close to `query` (typo tolerant)."""
+        matches = difflib.get_close_matches(
+            query.strip().upper(), list(self._names), n=limit, cutoff=cutoff
+        )
+        return [
+            self._record(position)
+            for name in matches
+            for position in self._names[name]
+        ][:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "locations": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "generated_at": self.generated_at,
+        }
+
+
+def fetch_locations(amadeus_api, keyword: str, page_limit: int = 100) -> List[dict]:
+    """Page through the Amadeus locations API for one keyword."""
+    locations = []
+    offset = 0
+    while True:
+        response = amadeus_api.get(
+            "/v1/reference-data/locations",
+            {
+                "keyword": keyword,
+                "subType": "AIRPORT,CITY",
+                "page[limit]": page_limit,
+                "page[offset]": offset,
+            },
+        )
+        data = response.get("data", [])
+        locations.extend(data)
+        if not data or "next" not in response.get("meta", {}).get("links", {}):
+            return locations
+        offset += len(data)
+
+
+def rebuild_index(
+    keywords: Iterable[str], path: str = DEFAULT_INDEX_PATH, amadeus_api=None
+) -> AirportIndex:
+    """Rebuild the index file from Amadeus bulk location responses."""
+    if amadeus_api is None:
+        from services.amadeus_api_client import AmadeusAPI
+
+        amadeus_api = AmadeusAPI()
+    index = AirportIndex(generated_at=time.time())
+    for keyword in keywords:
+        try:
+            added = index.add_locations(fetch_locations(amadeus_api, keyword))
+            logger.info(f"Indexed {added} locations for keyword {keyword}")
+        except Exception as e:
+            logger.error(f"Failed to fetch locations for keyword {keyword}: {e}")
+    if len(index):
+        index.save(path)
+    else:
+        logger.error("No locations fetched; keeping the existing airport index")
+    return index
+
+
+def main(argv: Optional[List[str]] = None):
+    """Refresh job: python -m services.airport_index [--keywords JFK LON ...]"""
+    parser = argparse.ArgumentParser(description="Rebuild the local airport index.")
+    parser.add_argument("--path", default=DEFAULT_INDEX_PATH)
+    parser.add_argument(
+        "--keywords",
+        nargs="*",
+        help="Location keywords to fetch (defaults to every code already indexed)",
+    )
+    args = parser.parse_args(argv)
+    keywords = args.keywords or AirportIndex.load(args.path).codes()
+    index = rebuild_index(keywords, args.path)
+    return 0 if len(index) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
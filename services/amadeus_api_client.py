@@ -2,7 +2,15 @@ import logging
 import requests
 import json
 import os
-from utils.token import get_token
+from services.rate_limiter import (
+    RETRYABLE_STATUSES,
+    RetryableUpstreamError,
+    amadeus_guard,
+    endpoint_family,
+    parse_retry_after,
+)
+from utils.telemetry import AMADEUS_RESPONSES, span
+from utils.token import get_token, token_manager
 from dotenv import load_dotenv
 
 
@@ -28,23 +36,49 @@ class AmadeusAPI:
         }
 
     def get(self, endpoint: str, params: dict = None) -> dict:
-        """Make authenticated request to Amadeus API"""
+        """Make authenticated request to Amadeus API, rate limited and retried
+        by `amadeus_guard`."""
+        return amadeus_guard.call_sync(
+            endpoint_family(endpoint), lambda: self._get(endpoint, params)
+        )
+
+    def _get(self, endpoint: str, params: dict = None, retried: bool = False) -> dict:
         token = get_token()
         headers = self._get_headers(token)
         url = f"{self.base_url}{endpoint}"
         logger.info(f"Making request to: {url} with params: {params}")
-        try:
-            response = self.session.get(
-                url, headers=headers, params=params, verify=False, timeout=30
-            )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network request failed: {str(e)}")
-            raise Exception(f"Network request failed: {str(e)}")
+        family = endpoint_family(endpoint)
+        with span("amadeus.http", family, endpoint=endpoint) as current:
+            try:
+                response = self.session.get(
+                    url, headers=headers, params=params, verify=False, timeout=30
+                )
+            except requests.exceptions.RequestException as e:
+                AMADEUS_RESPONSES.inc(family=family, status="error")
+                logger.error(f"Network request failed: {str(e)}")
+                raise RetryableUpstreamError(f"Network request failed: {str(e)}")
+            AMADEUS_RESPONSES.inc(family=family, status=response.status_code)
+            current.set("http.status_code", response.status_code)
+            if response.status_code != 200:
+                current.status = "error"
+
+        if response.status_code == 401 and not retried:
+            # The cached token was revoked or expired early; fetch a fresh one.
+            logger.info("Access token rejected, refreshing and retrying once")
+            token_manager.invalidate()
+            return self._get(endpoint, params, retried=True)
 
         logger.info(
             f"Response status: {response.status_code}, {len(response.content)} bytes"
         )
 
+        if response.status_code in RETRYABLE_STATUSES:
+            raise RetryableUpstreamError(
+                f"API request failed with status {response.status_code}",
+                status=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
         if response.status_code != 200:
             logger.error(
                 f"API request failed with status {response.status_code}: {response.text}"
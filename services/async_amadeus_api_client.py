@@ -0,0 +1,166 @@
+import importlib.util
+import logging
+import json
+import os
+
+import httpx
+from dotenv import load_dotenv
+
+from services.rate_limiter import (
+    RETRYABLE_STATUSES,
+    RetryableUpstreamError,
+    amadeus_guard,
+    endpoint_family,
+    parse_retry_after,
+)
+from utils.telemetry import AMADEUS_RESPONSES, span
+from utils.token import token_manager
+
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Amadeus REST endpoints backing the SDK calls used by TravelAgentService.
+LOCATIONS_ENDPOINT = "/v1/reference-data/locations"
+FLIGHT_OFFERS_ENDPOINT = "/v2/shopping/flight-offers"
+FLIGHT_DESTINATIONS_ENDPOINT = "/v1/shopping/flight-destinations"
+FLIGHT_DATES_ENDPOINT = "/v1/shopping/flight-dates"
+TRIP_PURPOSE_ENDPOINT = "/v1/travel/predictions/trip-purpose"
+
+
+class AsyncAmadeusAPI:
+    """asyncio counterpart of `AmadeusAPI`.
+
+    Requests go through one pooled `httpx.AsyncClient` that keeps connections
+    alive between calls and negotiates HTTP/2 when the `h2` package is
+    installed. The client is created lazily so it binds to the running event
+    loop, and must be released with `aclose()` on shutdown.
+    """
+
+    def __init__(self):
+        self.base_url = os.getenv(
+            "AMADEUS_BASE_URL", "https://test.api.amadeus.com"
+        ).rstrip("/")
+        self.max_connections = int(os.getenv("AMADEUS_MAX_CONNECTIONS", "100"))
+        self.max_keepalive = int(os.getenv("AMADEUS_MAX_KEEPALIVE", "20"))
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=30,
+                ),
+                timeout=30,
+                verify=False,
+            )
+        return self._client
+
+    def _get_headers(self, token: str) -> dict:
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "cache-control": "no-cache",
+        }
+
+    async def get(self, endpoint: str, params: dict = None) -> dict:
+        """Make authenticated request to Amadeus API, rate limited and retried
+        by `amadeus_guard`."""
+        return await amadeus_guard.call(
+            endpoint_family(endpoint), lambda: self._get(endpoint, params)
+        )
+
+    async def _get(
+        self, endpoint: str, params: dict = None, retried: bool = False
+    ) -> dict:
+        token = await token_manager.get_token_async()
+        headers = self._get_headers(token)
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+        logger.info(f"Making request to: {self.base_url}{endpoint} with params: {params}")
+        family = endpoint_family(endpoint)
+        with span("amadeus.http", family, endpoint=endpoint) as current:
+            try:
+                response = await self.client.get(endpoint, headers=headers, params=params)
+            except httpx.HTTPError as e:
+                AMADEUS_RESPONSES.inc(family=family, status="error")
+                logger.error(f"Network request failed: {str(e)}")
+                raise RetryableUpstreamError(f"Network request failed: {str(e)}")
+            AMADEUS_RESPONSES.inc(family=family, status=response.status_code)
+            current.set("http.status_code", response.status_code)
+            if response.status_code != 200:
+                current.status = "error"
+
+        if response.status_code == 401 and not retried:
+            logger.info("Access token rejected, refreshing and retrying once")
+            token_manager.invalidate()
+            return await self._get(endpoint, params, retried=True)
+
+        logger.info(
+            f"Response status: {response.status_code} ({response.http_version}), "
+            f"{len(response.content)} bytes"
+        )
+
+        if response.status_code in RETRYABLE_STATUSES:
+            raise RetryableUpstreamError(
+                f"API request failed with status {response.status_code}",
+                status=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+        if response.status_code != 200:
+            logger.error(
+                f"API request failed with status {response.status_code}: {response.text}"
+            )
+            raise Exception(
+                f"API request failed with status {response.status_code}: {response.text}"
+            )
+
+        if not response.content:
+            logger.error("Empty response from Amadeus API")
+            raise Exception("Empty response from Amadeus API")
+
+        try:
+            return response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON response: {e}")
+            logger.error(f"Raw response: {response.text}")
+            return {
+                "raw_response": response.text,
+                "status_code": response.status_code,
+                "error": f"Failed to parse JSON: {str(e)}",
+            }
+
+    async def get_locations(self, **params) -> dict:
+        """Async equivalent of `amadeus.reference_data.locations.get`."""
+        return await self.get(LOCATIONS_ENDPOINT, params)
+
+    async def get_flight_offers(self, **params) -> dict:
+        """Async equivalent of `amadeus.shopping.flight_offers_search.get`."""
+        return await self.get(FLIGHT_OFFERS_ENDPOINT, params)
+
+    async def get_flight_destinations(self, **params) -> dict:
+        """Async equivalent of `amadeus.shopping.flight_destinations.get`."""
+        return await self.get(FLIGHT_DESTINATIONS_ENDPOINT, params)
+
+    async def get_flight_dates(self, **params) -> dict:
+        """Cheapest fare per departure date (flight cheapest date search)."""
+        return await self.get(FLIGHT_DATES_ENDPOINT, params)
+
+    async def get_trip_purpose(self, **params) -> dict:
+        """Async equivalent of `amadeus.travel.predictions.trip_purpose.get`."""
+        return await self.get(TRIP_PURPOSE_ENDPOINT, params)
+
+    async def aclose(self):
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,241 @@
+"""Speculative prefetch of the Amadeus calls a conversation is likely to make next.
+
+Travel chats follow predictable patterns: after an inspiration result the
+user picks one of the cheap destinations and asks for flights on the dates
+shown; after a flight search they ask about the destination airport or the
+trip purpose. `TravelAgentService` turns each result into a short list of
+predicted calls and hands them to `Prefetcher.schedule`, which runs them in
+the background at `background_priority()` so the response cache is warm when
+the follow-up arrives.
+
+Prefetching spends real quota, so it is bounded and measured:
+
+- at most `max_per_result` predictions are made from one result;
+- a sliding budget caps prefetches per minute and per hour, and at most
+  `concurrency` run at once (extra predictions are dropped, not queued);
+- a prefetch counts as a hit when a real request asks for the same key
+  within `window` seconds, and as wasted otherwise. If the hit rate over the
+  last `min_samples` resolved prefetches falls below `min_hit_rate`,
+  prefetching is suspended for `suspend_for` seconds.
+
+Budgets and counters are per worker process.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from dotenv import load_dotenv
+
+from services.rate_limiter import background_priority
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+
+class Prefetcher:
+    """Budgeted background warming of the response cache, with hit-rate tracking.
+
+    Attributes:
+        enabled: Whether `schedule` starts any prefetch at all.
+        max_per_result: Predictions taken from one tool result.
+        budget_per_minute: Prefetches started per rolling minute.
+        budget_per_hour: Prefetches started per rolling hour.
+        concurrency: Prefetches allowed in flight at once.
+        window: Seconds a prefetched key waits for a real request before it
+            counts as wasted.
+        min_hit_rate: Hit rate below which prefetching is suspended.
+        min_samples: Resolved prefetches the hit rate is measured over.
+        suspend_for: Seconds prefetching stays off after a poor hit rate.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_per_result: int = 3,
+        budget_per_minute: int = 10,
+        budget_per_hour: int = 200,
+        concurrency: int = 2,
+        window: float = 30 * MINUTE,
+        min_hit_rate: float = 0.1,
+        min_samples: int = 50,
+        suspend_for: float = HOUR,
+    ):
+        self.enabled = enabled
+        self.max_per_result = max_per_result
+        self.budget_per_minute = budget_per_minute
+        self.budget_per_hour = budget_per_hour
+        self.concurrency = concurrency
+        self.window = window
+        self.min_hit_rate = min_hit_rate
+        self.min_samples = min_samples
+        self.suspend_for = suspend_for
+        self._lock = threading.Lock()
+        self._started: deque = deque()
+        self._in_flight = 0
+        self._tasks: set = set()
+        # key -> (endpoint, deadline) of prefetches no real request has used yet.
+        self._pending: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._outcomes: deque = deque(maxlen=max(min_samples, 1))
+        self._suspended_until = 0.0
+        self._stats = {
+            "scheduled": 0,
+            "completed": 0,
+            "failed": 0,
+            "hits": 0,
+            "wasted": 0,
+            "skipped_budget": 0,
+            "skipped_busy": 0,
+            "skipped_suspended": 0,
+            "suspensions": 0,
+        }
+        self._endpoints: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "Prefetcher":
+        """Build from PREFETCH (on/off), PREFETCH_MAX_PER_RESULT,
+        PREFETCH_BUDGET_PER_MINUTE, PREFETCH_BUDGET_PER_HOUR,
+        PREFETCH_CONCURRENCY, PREFETCH_WINDOW, PREFETCH_MIN_HIT_RATE,
+        PREFETCH_MIN_SAMPLES and PREFETCH_SUSPEND."""
+        return cls(
+            enabled=os.getenv("PREFETCH", "true").lower() == "true",
+            max_per_result=int(os.getenv("PREFETCH_MAX_PER_RESULT", "3")),
+            budget_per_minute=int(os.getenv("PREFETCH_BUDGET_PER_MINUTE", "10")),
+            budget_per_hour=int(os.getenv("PREFETCH_BUDGET_PER_HOUR", "200")),
+            concurrency=int(os.getenv("PREFETCH_CONCURRENCY", "2")),
+            window=float(os.getenv("PREFETCH_WINDOW", str(30 * MINUTE))),
+            min_hit_rate=float(os.getenv("PREFETCH_MIN_HIT_RATE", "0.1")),
+            min_samples=int(os.getenv("PREFETCH_MIN_SAMPLES", "50")),
+            suspend_for=float(os.getenv("PREFETCH_SUSPEND", str(HOUR))),
+        )
+
+    def _count(self, endpoint: str, counter: str):
+        self._stats[counter] += 1
+        counters = self._endpoints.setdefault(
+            endpoint, {"scheduled": 0, "hits": 0, "wasted": 0}
+        )
+        if counter in counters:
+            counters[counter] += 1
+
+    def _resolve(self, endpoint: str, hit: bool):
+        """Record the outcome of one prefetch and suspend on a poor hit rate."""
+        self._count(endpoint, "hits" if hit else "wasted")
+        self._outcomes.append(hit)
+        if len(self._outcomes) == self._outcomes.maxlen:
+            hit_rate = sum(self._outcomes) / len(self._outcomes)
+            if hit_rate < self.min_hit_rate:
+                self._suspended_until = time.time() + self.suspend_for
+                self._stats["suspensions"] += 1
+                self._outcomes.clear()
+                logger.warning(
+                    f"Prefetch hit rate {hit_rate:.0%} is below {self.min_hit_rate:.0%}; suspending prefetch for {self.suspend_for:.0f}s"
+                )
+
+    def _expire(self, now: float):
+        while self._pending:
+            key, (endpoint, deadline) = next(iter(self._pending.items()))
+            if deadline > now:
+                break
+            del self._pending[key]
+            self._resolve(endpoint, hit=False)
+
+    def _take_budget(self, now: float) -> str:
+        """Reserve a prefetch slot; returns the skip counter name if there is none."""
+        if now < self._suspended_until:
+            return "skipped_suspended"
+        if self._in_flight >= self.concurrency:
+            return "skipped_busy"
+        while self._started and self._started[0] <= now - HOUR:
+            self._started.popleft()
+        last_minute = sum(1 for started in self._started if started > now - MINUTE)
+        if len(self._started) >= self.budget_per_hour or last_minute >= self.budget_per_minute:
+            return "skipped_budget"
+        self._started.append(now)
+        self._in_flight += 1
+        return ""
+
+    def record_use(self, key: str):
+        """Called for every real (non-prefetch) cache lookup of `key`."""
+        if not self._pending:
+            return
+        with self._lock:
+            self._expire(time.time())
+            entry = self._pending.pop(key, None)
+            if entry is not None:
+                self._resolve(entry[0], hit=True)
+
+    def schedule(
+        self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> bool:
+        """Start `fetch()` in the background if the budget allows.
+
+        `fetch` must store its result under `key` in the response cache.
+        Returns False when the budget is exhausted, so callers can stop
+        predicting for the current result.
+        """
+        if not self.enabled:
+            return False
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if key in self._pending:
+                return True
+            skipped = self._take_budget(now)
+            if skipped:
+                self._stats[skipped] += 1
+                return False
+            self._count(endpoint, "scheduled")
+            self._pending[key] = (endpoint, now + self.window)
+        task = asyncio.get_running_loop().create_task(self._run(endpoint, key, fetch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            with background_priority():
+                await fetch()
+            with self._lock:
+                self._stats["completed"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Prefetch of {key} failed: {e}")
+            with self._lock:
+                self._stats["failed"] += 1
+                # A failed prefetch warmed nothing; don't count it either way.
+                self._pending.pop(key, None)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def aclose(self):
+        """Cancel prefetches still in flight."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.time())
+            stats = dict(self._stats)
+            stats["endpoints"] = {name: dict(c) for name, c in self._endpoints.items()}
+            stats["in_flight"] = self._in_flight
+            stats["awaiting_use"] = len(self._pending)
+            stats["suspended"] = time.time() < self._suspended_until
+        resolved = stats["hits"] + stats["wasted"]
+        stats["hit_rate"] = stats["hits"] / resolved if resolved else 0.0
+        return stats
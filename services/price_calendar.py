@@ -0,0 +1,424 @@
+"""Precomputed price calendars for the routes users actually search.
+
+Flexible-date questions ("cheapest day to fly MAD-JFK in November") would
+otherwise need one live flight offers search per date. Instead:
+
+- `search_flights` calls record each route searched (and the trip length),
+  buffered in memory and flushed to SQLite by every worker;
+- a background job picks the routes most searched within the observation
+  window (searches are counted per day) and refreshes a calendar
+  for each from the Amadeus flight dates API, one call per route, at
+  background priority so it never delays chat traffic;
+- each calendar is a dense `array('f')` of the cheapest price per departure
+  day (NaN where there is no fare), stored as a blob, so answering a query is
+  one indexed row read and a slice.
+
+Calendars older than `max_age` are treated as missing, and uncovered routes
+fall back to one flight dates call (then a short live batch search) in
+`TravelAgentService`.
+"""
+
+import os
+import math
+import time
+import array
+import asyncio
+import logging
+import sqlite3
+import tempfile
+import threading
+import contextlib
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # Windows: refresh in every process.
+    fcntl = None
+
+from services.rate_limiter import (
+    RetryableUpstreamError,
+    UpstreamUnavailableError,
+    background_priority,
+)
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+RouteKey = Tuple[str, str, int]
+
+
+def trip_length(departure_date: Optional[str], return_date: Optional[str]) -> Optional[int]:
+    """Days between departure and return; 0 for one-way, None if unparseable."""
+    try:
+        departure = date.fromisoformat(departure_date)
+    except (TypeError, ValueError):
+        return None
+    if not return_date:
+        return 0
+    try:
+        days = (date.fromisoformat(return_date) - departure).days
+    except ValueError:
+        return None
+    return days if days > 0 else None
+
+
+class RouteCalendar:
+    """Cheapest price per departure day for one route and trip length.
+
+    Attributes:
+        start: First departure day covered.
+        prices: One float per day from `start`; NaN where no fare was found.
+        trip_length_days: Days between departure and return, 0 for one-way.
+        refreshed_at: Unix time the calendar was fetched.
+    """
+
+    def __init__(
+        self,
+        origin: str,
+        destination: str,
+        trip_length_days: int,
+        start: date,
+        prices: array.array,
+        currency: str,
+        refreshed_at: float,
+    ):
+        self.origin = origin
+        self.destination = destination
+        self.trip_length_days = trip_length_days
+        self.start = start
+        self.prices = prices
+        self.currency = currency
+        self.refreshed_at = refreshed_at
+
+    @property
+    def end(self) -> date:
+        """Last departure day covered."""
+        return self.start + timedelta(days=len(self.prices) - 1)
+
+    @classmethod
+    def from_flight_dates(
+        cls,
+        origin: str,
+        destination: str,
+        trip_length_days: int,
+        start: date,
+        days: int,
+        payload: Dict[str, Any],
+    ) -> "RouteCalendar":
+        """Build from an Amadeus flight dates response covering `days` days from `start`."""
+        prices = array.array("f", [math.nan]) * days
+        for offer in payload.get("data", []):
+            try:
+                offset = (date.fromisoformat(offer["departureDate"]) - start).days
+                price = float(offer["price"]["total"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= offset < days and (math.isnan(prices[offset]) or price < prices[offset]):
+                prices[offset] = price
+        currency = payload.get("meta", {}).get("currency") or next(
+            iter(payload.get("dictionaries", {}).get("currencies", {})), ""
+        )
+        return cls(origin, destination, trip_length_days, start, prices, currency, time.time())
+
+    def window(self, first: date, last: date) -> List[Tuple[date, float]]:
+        """`(day, price)` for the covered days with a fare between `first` and `last`."""
+        lo = max((first - self.start).days, 0)
+        hi = min((last - self.start).days + 1, len(self.prices))
+        return [
+            (self.start + timedelta(days=offset), self.prices[offset])
+            for offset in range(lo, hi)
+            if not math.isnan(self.prices[offset])
+        ]
+
+
+class PriceCalendarStore:
+    """SQLite file holding route observations and calendars, shared by workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Searches per route and day, so rankings only count the observation window.
+        self._conn.execute("DROP TABLE IF EXISTS route_observations")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS route_searches ("
+            "origin TEXT NOT NULL, destination TEXT NOT NULL, trip_length INTEGER NOT NULL, "
+            "day INTEGER NOT NULL, searches INTEGER NOT NULL, "
+            "PRIMARY KEY (origin, destination, trip_length, day))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS price_calendar ("
+            "origin TEXT NOT NULL, destination TEXT NOT NULL, trip_length INTEGER NOT NULL, "
+            "start_day INTEGER NOT NULL, currency TEXT NOT NULL, prices BLOB NOT NULL, "
+            "refreshed_at REAL NOT NULL, PRIMARY KEY (origin, destination, trip_length))"
+        )
+        self._conn.commit()
+
+    def record(self, observations: Dict[RouteKey, int], seen_at: float, forget_before: float):
+        """Add `observations` to the day of `seen_at`, dropping days before `forget_before`."""
+        day = int(seen_at // DAY)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO route_searches VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (origin, destination, trip_length, day) DO UPDATE SET "
+                "searches = searches + excluded.searches",
+                [(*key, day, count) for key, count in observations.items()],
+            )
+            self._conn.execute(
+                "DELETE FROM route_searches WHERE day < ?", (int(forget_before // DAY),)
+            )
+            self._conn.commit()
+
+    def due_routes(self, limit: int, min_searches: int, seen_since: float, refreshed_before: float) -> List[RouteKey]:
+        """Routes most searched since `seen_since` (at least `min_searches` times)
+        whose calendar is missing or older than `refreshed_before`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT o.origin, o.destination, o.trip_length FROM route_searches o "
+                "LEFT JOIN price_calendar c USING (origin, destination, trip_length) "
+                "WHERE o.day >= ? AND (c.refreshed_at IS NULL OR c.refreshed_at < ?) "
+                "GROUP BY o.origin, o.destination, o.trip_length "
+                "HAVING SUM(o.searches) >= ? ORDER BY SUM(o.searches) DESC LIMIT ?",
+                (int(seen_since // DAY), refreshed_before, min_searches, limit),
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def save(self, calendar: RouteCalendar):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO price_calendar VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    calendar.origin,
+                    calendar.destination,
+                    calendar.trip_length_days,
+                    calendar.start.toordinal(),
+                    calendar.currency,
+                    calendar.prices.tobytes(),
+                    calendar.refreshed_at,
+                ),
+            )
+            self._conn.commit()
+
+    def load(self, origin: str, destination: str, trip_length_days: int) -> Optional[RouteCalendar]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start_day, currency, prices, refreshed_at FROM price_calendar "
+                "WHERE origin = ? AND destination = ? AND trip_length = ?",
+                (origin, destination, trip_length_days),
+            ).fetchone()
+        if row is None:
+            return None
+        prices = array.array("f")
+        prices.frombytes(row[2])
+        return RouteCalendar(
+            origin, destination, trip_length_days, date.fromordinal(row[0]), prices, row[1], row[3]
+        )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            routes = self._conn.execute(
+                "SELECT COUNT(*) FROM (SELECT DISTINCT origin, destination, trip_length FROM route_searches)"
+            ).fetchone()[0]
+            calendars = self._conn.execute("SELECT COUNT(*) FROM price_calendar").fetchone()[0]
+        return {"observed_routes": routes, "calendars": calendars}
+
+    @contextlib.contextmanager
+    def try_locked(self):
+        """Yield True if this process holds the refresh lock on `<path>.lock`."""
+        if fcntl is None:
+            yield True
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class PriceCalendar:
+    """Route observation, background refresh and lookups of price calendars.
+
+    Attributes:
+        days: Departure days covered by each calendar, starting tomorrow.
+        top_routes: Routes refreshed per cycle, most searched first.
+        min_searches: Searches a route needs before it gets a calendar.
+        refresh_interval: Seconds before a calendar is refreshed again.
+        max_age: Seconds after which a calendar is no longer served.
+        observation_window: Routes not searched for this long are not refreshed.
+        refresh_enabled: Whether `run` fetches calendars or only flushes observations.
+    """
+
+    def __init__(
+        self,
+        store: PriceCalendarStore,
+        days: int = 60,
+        top_routes: int = 20,
+        min_searches: int = 2,
+        refresh_interval: float = 6 * HOUR,
+        max_age: float = 48 * HOUR,
+        observation_window: float = 7 * 24 * HOUR,
+        refresh_enabled: bool = True,
+    ):
+        self.store = store
+        self.days = days
+        self.top_routes = top_routes
+        self.min_searches = min_searches
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.observation_window = observation_window
+        self.refresh_enabled = refresh_enabled
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._stats = {"hits": 0, "misses": 0, "refreshed": 0, "refresh_failures": 0}
+
+    @classmethod
+    def from_env(cls) -> "PriceCalendar":
+        """Build from PRICE_CALENDAR (refresh on/off), PRICE_CALENDAR_PATH,
+        PRICE_CALENDAR_DAYS, PRICE_CALENDAR_TOP_ROUTES, PRICE_CALENDAR_MIN_SEARCHES,
+        PRICE_CALENDAR_REFRESH_INTERVAL and PRICE_CALENDAR_MAX_AGE."""
+        path = os.getenv("PRICE_CALENDAR_PATH") or os.path.join(
+            tempfile.gettempdir(), "smart_trip_price_calendar.sqlite3"
+        )
+        return cls(
+            PriceCalendarStore(path),
+            days=int(os.getenv("PRICE_CALENDAR_DAYS", "60")),
+            top_routes=int(os.getenv("PRICE_CALENDAR_TOP_ROUTES", "20")),
+            min_searches=int(os.getenv("PRICE_CALENDAR_MIN_SEARCHES", "2")),
+            refresh_interval=float(os.getenv("PRICE_CALENDAR_REFRESH_INTERVAL", str(6 * HOUR))),
+            max_age=float(os.getenv("PRICE_CALENDAR_MAX_AGE", str(48 * HOUR))),
+            refresh_enabled=os.getenv("PRICE_CALENDAR", "true").lower() == "true",
+        )
+
+    def observe(self, origin: Optional[str], destination: Optional[str], departure_date: Optional[str], return_date: Optional[str] = None):
+        """Count a search of `origin`-`destination`; cheap enough for the request path."""
+        length = trip_length(departure_date, return_date)
+        if length is None or not origin or not destination:
+            return
+        key = (origin.strip().upper(), destination.strip().upper(), length)
+        if len(key[0]) != 3 or len(key[1]) != 3:
+            return
+        with self._lock:
+            self._pending[key] += 1
+
+    def flush_observations(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if pending:
+            now = time.time()
+            try:
+                self.store.record(pending, now, now - self.observation_window)
+            except sqlite3.Error as e:
+                logger.error(f"Could not record route observations: {e}")
+
+    def lookup(self, origin: str, destination: str, trip_length_days: int) -> Optional[RouteCalendar]:
+        """The route's calendar if one exists and is younger than `max_age`."""
+        calendar = self.store.load(origin, destination, trip_length_days)
+        fresh = calendar is not None and time.time() - calendar.refreshed_at <= self.max_age
+        with self._lock:
+            self._stats["hits" if fresh else "misses"] += 1
+        return calendar if fresh else None
+
+    def freshness(self, calendar: RouteCalendar) -> Dict[str, Any]:
+        age = time.time() - calendar.refreshed_at
+        return {
+            "refreshed_at": datetime.fromtimestamp(calendar.refreshed_at, timezone.utc).isoformat(timespec="seconds"),
+            "age_hours": round(age / HOUR, 1),
+            "stale": age > self.refresh_interval * 2,
+        }
+
+    def flight_dates_params(self, key: RouteKey, start: date, days: Optional[int] = None) -> Dict[str, Any]:
+        """Flight dates API parameters for `days` departure days (default `self.days`) from `start`."""
+        origin, destination, length = key
+        end = start + timedelta(days=(days or self.days) - 1)
+        params = {
+            "origin": origin,
+            "destination": destination,
+            "departureDate": f"{start.isoformat()},{end.isoformat()}",
+            "oneWay": "true" if length == 0 else "false",
+            "viewBy": "DATE",
+        }
+        if length:
+            params["duration"] = str(length)
+        return params
+
+    async def refresh(self, fetch: Callable[..., Awaitable[Dict[str, Any]]]) -> int:
+        """Refresh due routes with `fetch(**params)` (the flight dates API); returns the count."""
+        now = time.time()
+        due = self.store.due_routes(
+            self.top_routes,
+            self.min_searches,
+            now - self.observation_window,
+            now - self.refresh_interval,
+        )
+        refreshed = 0
+        start = date.today() + timedelta(days=1)
+        for key in due:
+            try:
+                with background_priority():
+                    payload = await fetch(**self.flight_dates_params(key, start))
+            except (RetryableUpstreamError, UpstreamUnavailableError) as e:
+                # Upstream is throttling or down: leave the rest for the next cycle.
+                logger.warning(f"Price calendar refresh paused at {key[0]}-{key[1]}: {e}")
+                with self._lock:
+                    self._stats["refresh_failures"] += 1
+                break
+            except Exception as e:
+                # No fares for this route; store an empty calendar so it is not
+                # retried before the next refresh interval.
+                logger.warning(f"Price calendar refresh failed for {key[0]}-{key[1]}: {e}")
+                with self._lock:
+                    self._stats["refresh_failures"] += 1
+                payload = {}
+            self.store.save(RouteCalendar.from_flight_dates(*key, start, self.days, payload))
+            refreshed += 1
+        if refreshed:
+            logger.info(f"Refreshed {refreshed} price calendars")
+        with self._lock:
+            self._stats["refreshed"] += refreshed
+        return refreshed
+
+    async def run(self, fetch: Callable[..., Awaitable[Dict[str, Any]]], tick: float = 60.0):
+        """Flush observations every `tick` seconds and refresh due calendars.
+
+        Runs in every MCP worker; only the one holding the store's refresh
+        lock fetches calendars in a given cycle.
+        """
+        while True:
+            try:
+                self.flush_observations()
+                if self.refresh_enabled:
+                    with self.store.try_locked() as holder:
+                        if holder:
+                            await self.refresh(fetch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Price calendar cycle failed: {e}")
+            await asyncio.sleep(tick)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending_observations"] = sum(self._pending.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        try:
+            stats.update(self.store.counts())
+        except sqlite3.Error:
+            pass
+        return stats
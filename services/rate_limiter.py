@@ -0,0 +1,417 @@
+"""Client-side rate limiting, retries and circuit breaking for Amadeus calls.
+
+Every upstream request (REST clients and SDK calls alike) goes through the
+module-level `amadeus_guard`:
+
+- a token bucket per endpoint family keeps request rates under the Amadeus
+  quota instead of discovering it through 429s;
+- requests made while `background_priority()` is active (prefetch, warm-up)
+  only take a token when no interactive request is waiting for one;
+- 429, 5xx and network failures are retried with jittered exponential
+  backoff, or after the `Retry-After` the server asked for;
+- a circuit breaker per family fails fast while upstream is down (5xx and
+  network failures; 429s are throttling, not an outage), so callers get a
+  clear "unavailable, retry later" error instead of a timeout.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+BACKGROUND = 1
+LANES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Statuses worth retrying: throttling and transient server errors.
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Amadeus REST paths and the quota family each one is limited under.
+ENDPOINT_FAMILIES = {
+    "/v1/reference-data/locations": "locations",
+    "/v2/shopping/flight-offers": "flight_offers",
+    "/v1/shopping/flight-destinations": "flight_destinations",
+    "/v1/shopping/flight-dates": "flight_dates",
+    "/v1/travel/predictions/trip-purpose": "trip_purpose",
+}
+
+_priority = contextvars.ContextVar("amadeus_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background_priority():
+    """Mark Amadeus calls made inside the block as background work."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Quota family of a REST path; unknown paths are limited on their own."""
+    return ENDPOINT_FAMILIES.get(endpoint, endpoint)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryableUpstreamError(Exception):
+    """A throttled, failed or unreachable upstream request that may succeed later."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised without calling upstream while the family's circuit is open."""
+
+    def __init__(self, family: str, retry_in: float):
+        super().__init__(
+            f"Amadeus {family} API is temporarily unavailable after repeated failures; "
+            f"try again in {retry_in:.0f}s"
+        )
+        self.family = family
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by the sync and async code paths.
+
+    Attributes:
+        rate: Tokens added per second.
+        burst: Bucket capacity.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._waiting = {lane: 0 for lane in LANES}
+        self._stats = {
+            lane: {"acquired": 0, "throttled": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+            for lane in LANES
+        }
+
+    def _try_acquire(self, priority: int) -> float:
+        """Take a token and return 0, or return how long to sleep before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            yields = priority == BACKGROUND and self._waiting[INTERACTIVE] > 0
+            if self._tokens >= 1 and not yields:
+                self._tokens -= 1
+                return 0.0
+            return max((1 - self._tokens) / self.rate, 0.001)
+
+    def _enter(self, priority: int):
+        with self._lock:
+            self._waiting[priority] += 1
+
+    def _leave(self, priority: int, waited: float):
+        with self._lock:
+            self._waiting[priority] -= 1
+            stats = self._stats[priority]
+            stats["acquired"] += 1
+            if waited > 0:
+                stats["throttled"] += 1
+                stats["wait_s"] += waited
+                stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+
+    def acquire_sync(self, priority: int = INTERACTIVE) -> float:
+        """Block until a token is available; returns the seconds waited."""
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                delay = self._try_acquire(priority)
+                if not delay:
+                    break
+                time.sleep(delay)
+        finally:
+            waited = time.monotonic() - started
+            self._leave(priority, waited if waited > 0.001 else 0.0)
+        return waited
+
+    async def acquire(self, priority: int = INTERACTIVE) -> float:
+        """Wait without blocking the event loop; returns the seconds waited."""
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                delay = self._try_acquire(priority)
+                if not delay:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            waited = time.monotonic() - started
+            self._leave(priority, waited if waited > 0.001 else 0.0)
+        return waited
+
+    def stats(self) -> dict:
+        with self._lock:
+            lanes = {}
+            for lane, name in LANES.items():
+                stats = self._stats[lane]
+                lanes[name] = {
+                    "queue_depth": self._waiting[lane],
+                    "acquired": stats["acquired"],
+                    "throttled": stats["throttled"],
+                    "avg_wait_ms": (
+                        stats["wait_s"] / stats["acquired"] * 1000 if stats["acquired"] else 0.0
+                    ),
+                    "max_wait_ms": stats["max_wait_s"] * 1000,
+                }
+            return {"rate_per_s": self.rate, "tokens": round(self._tokens, 2), "lanes": lanes}
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open
+    after `reset_timeout` seconds, where one probe request decides whether to
+    close again or stay open."""
+
+    def __init__(self, family: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.family = family
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise `UpstreamUnavailableError` if the call must not go upstream."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and (
+                not self._probing or time.monotonic() - self._probe_started > self.reset_timeout
+            ):
+                # One probe at a time; a probe that never reported back is replaced.
+                self._probing = True
+                self._probe_started = time.monotonic()
+                return
+            self._rejected += 1
+            raise UpstreamUnavailableError(self.family, max(remaining, 1.0))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Amadeus {self.family} circuit closed")
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(
+                        f"Amadeus {self.family} circuit opened after {self._failures} failures"
+                    )
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "rejected": self._rejected,
+            }
+
+
+class AmadeusGuard:
+    """Rate limiter, retry scheduler and circuit breakers for Amadeus families.
+
+    Attributes:
+        rates: Requests per second allowed per family (`default` for the rest).
+        max_retries: Retries after the first attempt for retryable failures.
+        backoff_base: First backoff ceiling in seconds; doubles per attempt.
+        backoff_cap: Largest backoff (and largest honoured `Retry-After`).
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 10.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.rates = {"default": 10.0, **(rates or {})}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._retries: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "AmadeusGuard":
+        """Build from AMADEUS_RATE_LIMIT (requests/s for every family),
+        AMADEUS_RATE_LIMITS (JSON per-family overrides), AMADEUS_MAX_RETRIES,
+        AMADEUS_BACKOFF_BASE, AMADEUS_BACKOFF_CAP, AMADEUS_CIRCUIT_FAILURES and
+        AMADEUS_CIRCUIT_RESET."""
+        rates = {"default": float(os.getenv("AMADEUS_RATE_LIMIT", "10"))}
+        overrides = os.getenv("AMADEUS_RATE_LIMITS")
+        if overrides:
+            try:
+                rates.update({k: float(v) for k, v in json.loads(overrides).items()})
+            except (ValueError, AttributeError) as e:
+                logger.error(f"Ignoring invalid AMADEUS_RATE_LIMITS: {e}")
+        return cls(
+            rates=rates,
+            max_retries=int(os.getenv("AMADEUS_MAX_RETRIES", "3")),
+            backoff_base=float(os.getenv("AMADEUS_BACKOFF_BASE", "0.5")),
+            backoff_cap=float(os.getenv("AMADEUS_BACKOFF_CAP", "10")),
+            failure_threshold=int(os.getenv("AMADEUS_CIRCUIT_FAILURES", "5")),
+            reset_timeout=float(os.getenv("AMADEUS_CIRCUIT_RESET", "30")),
+        )
+
+    def _family(self, family: str):
+        with self._lock:
+            bucket = self._buckets.get(family)
+            if bucket is None:
+                rate = self.rates.get(family, self.rates["default"])
+                bucket = self._buckets[family] = TokenBucket(rate)
+                self._breakers[family] = CircuitBreaker(
+                    family, self.failure_threshold, self.reset_timeout
+                )
+            return bucket, self._breakers[family]
+
+    def _backoff(self, family: str, attempt: int, error: RetryableUpstreamError) -> Optional[float]:
+        """Delay before the next attempt, or None when retries are exhausted."""
+        if attempt >= self.max_retries:
+            return None
+        if error.retry_after is not None:
+            delay = min(error.retry_after, self.backoff_cap)
+        else:
+            # Full jitter spreads retries from concurrent callers apart.
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+        with self._lock:
+            self._retries[family] = self._retries.get(family, 0) + 1
+        logger.warning(
+            f"Amadeus {family} request failed ({error}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    @staticmethod
+    def _record_retryable(breaker: "CircuitBreaker", error: RetryableUpstreamError):
+        """Count 5xx and network failures against the circuit. A 429 means upstream
+        is up but throttling: it is backed off and retried, not counted."""
+        if error.status == 429:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    async def call(self, family: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fetch()` under the family's limit, retrying retryable failures."""
+        bucket, breaker = self._family(family)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            await bucket.acquire(_priority.get())
+            try:
+                result = await fetch()
+            except RetryableUpstreamError as e:
+                self._record_retryable(breaker, e)
+                delay = self._backoff(family, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except Exception:
+                # Upstream answered (e.g. 400 for bad parameters): it is up.
+                breaker.record_success()
+                raise
+            breaker.record_success()
+            return result
+
+    def call_sync(self, family: str, fetch: Callable[[], Any]) -> Any:
+        """Blocking variant of `call`."""
+        bucket, breaker = self._family(family)
+        attempt = 0
+        while True:
+            breaker.before_call()
+            bucket.acquire_sync(_priority.get())
+            try:
+                result = fetch()
+            except RetryableUpstreamError as e:
+                self._record_retryable(breaker, e)
+                delay = self._backoff(family, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except Exception:
+                breaker.record_success()
+                raise
+            breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        """Queue depth and waits per priority lane, retries and circuit state per family."""
+        with self._lock:
+            families = list(self._buckets)
+            retries = dict(self._retries)
+        return {
+            family: {
+                **self._buckets[family].stats(),
+                "retries": retries.get(family, 0),
+                "circuit": self._breakers[family].stats(),
+            }
+            for family in families
+        }
+
+
+amadeus_guard = AmadeusGuard.from_env()
@@ -0,0 +1,316 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+# (ttl, stale window) in seconds per Amadeus endpoint family. Within the stale
+# window an expired entry is still served while a refresh runs in the background.
+DEFAULT_TTLS: Dict[str, Tuple[float, float]] = {
+    "locations": (7 * DAY, DAY),
+    "trip_purpose": (7 * DAY, DAY),
+    "flight_destinations": (DAY, 6 * 60 * 60),
+    "flight_offers": (5 * 60, 2 * 60),
+}
+FALLBACK_TTL = (5 * 60, 0)
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def normalize_arguments(params: Optional[Dict[str, Any]]) -> str:
+    """Serialize request arguments into a canonical cache-key fragment.
+
+    Keys are sorted, empty values dropped and scalars compared
+    case-insensitively, so `{"keyword": " jfk"}` and `{"keyword": "JFK"}`
+    share a cache entry.
+    """
+    normalized = {}
+    for key, value in (params or {}).items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, (list, tuple)):
+            value = [str(v).strip().upper() for v in value]
+        else:
+            value = str(value).strip().upper()
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+
+
+def is_cacheable(result: Any) -> bool:
+    """Only successful Amadeus payloads are worth caching."""
+    return isinstance(result, dict) and "data" in result and "error" not in result
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU store of `(value, expires_at, stale_until)` entries."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, expires_at: float, stale_until: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at, stale_until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk store that keeps cached responses across restarts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, stale_until REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, stale_until FROM response_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key: str, value: Any, expires_at: float, stale_until: float):
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, stale_until),
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM response_cache WHERE stale_until < ?", (time.time(),)
+            )
+            self.evictions += cursor.rowcount
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """TTL cache for raw Amadeus responses with stale-while-revalidate.
+
+    Lookups go to a bounded in-memory LRU first and, if configured, to a
+    persistent backend second (a disk hit is promoted back into memory).
+    Entries are keyed on the endpoint family plus normalized request
+    arguments; see `DEFAULT_TTLS` for per-endpoint lifetimes.
+
+    Attributes:
+        memory: In-process LRU backend.
+        persistent: Optional on-disk backend (e.g. `SQLiteCacheBackend`).
+        ttls: Mapping of endpoint family to `(ttl, stale_window)` seconds.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[MemoryCacheBackend] = None,
+        persistent: Optional[SQLiteCacheBackend] = None,
+        ttls: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        self.memory = memory if memory is not None else MemoryCacheBackend()
+        self.persistent = persistent
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: set = set()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache from RESPONSE_CACHE_MAX_ENTRIES / RESPONSE_CACHE_PATH."""
+        memory = MemoryCacheBackend(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+        )
+        path = os.getenv("RESPONSE_CACHE_PATH")
+        persistent = SQLiteCacheBackend(path) if path else None
+        return cls(memory=memory, persistent=persistent)
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        return f"{endpoint}:{normalize_arguments(params)}"
+
+    def _count(self, endpoint: str, counter: str):
+        with self._stats_lock:
+            counters = self._stats.setdefault(
+                endpoint, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+            )
+            counters[counter] += 1
+
+    def lookup(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[str, Any]:
+        """Return `(FRESH|STALE|MISS, value)` without fetching anything."""
+        key = self.make_key(endpoint, params)
+        entry = self.memory.get(key)
+        if entry is None and self.persistent is not None:
+            entry = self.persistent.get(key)
+            if entry is not None:
+                self.memory.set(key, *entry)
+        now = time.time()
+        if entry is None or now >= entry[2]:
+            return MISS, None
+        if now < entry[1]:
+            return FRESH, entry[0]
+        return STALE, entry[0]
+
+    def store(self, endpoint: str, params: Optional[Dict[str, Any]], value: Any):
+        if not is_cacheable(value):
+            return
+        ttl, stale_window = self.ttls.get(endpoint, FALLBACK_TTL)
+        expires_at = time.time() + ttl
+        stale_until = expires_at + stale_window
+        key = self.make_key(endpoint, params)
+        self.memory.set(key, value, expires_at, stale_until)
+        if self.persistent is not None:
+            try:
+                self.persistent.set(key, value, expires_at, stale_until)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to persist cache entry {key}: {e}")
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str):
+        with self._refresh_lock:
+            self._refreshing.discard(key)
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        fetch: Callable[[], Any],
+    ) -> Any:
+        """Return a cached response, calling `fetch()` on a miss."""
+        state, value = self.lookup(endpoint, params)
+        if state == FRESH:
+            self._count(endpoint, "hits")
+            return value
+        if state == STALE:
+            self._count(endpoint, "stale_hits")
+            key = self.make_key(endpoint, params)
+            if self._claim_refresh(key):
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=2, thread_name_prefix="cache-refresh"
+                    )
+                self._executor.submit(self._refresh, endpoint, params, fetch, key)
+            return value
+        self._count(endpoint, "misses")
+        value = fetch()
+        self.store(endpoint, params, value)
+        return value
+
+    def _refresh(self, endpoint, params, fetch, key):
+        try:
+            self.store(endpoint, params, fetch())
+            self._count(endpoint, "refreshes")
+        except Exception as e:
+            logger.error(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+    async def aget_or_fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Async variant of `get_or_fetch`; `fetch` returns an awaitable."""
+        state, value = self.lookup(endpoint, params)
+        if state == FRESH:
+            self._count(endpoint, "hits")
+            return value
+        if state == STALE:
+            self._count(endpoint, "stale_hits")
+            key = self.make_key(endpoint, params)
+            if self._claim_refresh(key):
+                task = asyncio.create_task(self._arefresh(endpoint, params, fetch, key))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+        self._count(endpoint, "misses")
+        value = await fetch()
+        self.store(endpoint, params, value)
+        return value
+
+    async def _arefresh(self, endpoint, params, fetch, key):
+        try:
+            self.store(endpoint, params, await fetch())
+            self._count(endpoint, "refreshes")
+        except Exception as e:
+            logger.error(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters per endpoint plus backend sizes."""
+        with self._stats_lock:
+            endpoints = {name: dict(c) for name, c in self._stats.items()}
+        for counters in endpoints.values():
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            counters["hit_rate"] = (
+                (counters["hits"] + counters["stale_hits"]) / lookups if lookups else 0.0
+            )
+        return {
+            "endpoints": endpoints,
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "persistent_entries": (
+                len(self.persistent) if self.persistent is not None else None
+            ),
+        }
@@ -1,15 +1,37 @@
 from typing import List, Dict, Optional, Any, Tuple
+import os
+import asyncio
 import logging
+import contextlib
+from datetime import date, timedelta
 from amadeus import Client, ResponseError
-from utils.custom_formatter import format_flight_results
 import mcp.types as types
 from mcp.shared.exceptions import McpError
 from mcp.types import ErrorData, INTERNAL_ERROR, INVALID_PARAMS
+from pydantic import ValidationError
+from models.schemas import PriceCalendarRequest
 from services.amadeus_api_client import AmadeusAPI
+from services.airport_index import AirportIndex
+from services.async_amadeus_api_client import AsyncAmadeusAPI
+from services.prefetcher import Prefetcher
+from services.price_calendar import PriceCalendar, RouteCalendar
+from services.response_cache import FRESH, ResponseCache
+from services.rate_limiter import (
+    RETRYABLE_STATUSES,
+    RetryableUpstreamError,
+    amadeus_guard,
+    parse_retry_after,
+)
+from services.single_flight import SingleFlight
+from utils.offer_engine import OfferFilters
+from utils.telemetry import AMADEUS_RESPONSES, Sample, span
 from utils.custom_formatter import (
     format_airport_info_response,
+    format_batch_flight_results,
     format_flight_results,
     format_inspiration_flights_response,
+    format_live_calendar_response,
+    format_price_calendar_response,
     format_trip_purpose_response,
 )
 
@@ -18,6 +40,17 @@ from utils.custom_formatter import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on the number of distinct searches one batch request may fan out to.
+MAX_BATCH_SEARCHES = int(os.getenv("FLIGHT_BATCH_MAX_SEARCHES", "30"))
+# Number of batch sub-searches allowed in flight against Amadeus at once.
+BATCH_CONCURRENCY = int(os.getenv("FLIGHT_BATCH_CONCURRENCY", "4"))
+# Offers requested per flight search; all are ranked and the best few returned.
+MAX_OFFERS = int(os.getenv("FLIGHT_SEARCH_MAX_OFFERS", "100"))
+# Departure days covered by a price calendar query without `departure_date_to`.
+CALENDAR_DEFAULT_DAYS = 30
+# Days searched live when a route has neither a calendar nor cheapest-date fares.
+CALENDAR_LIVE_SEARCH_DAYS = int(os.getenv("PRICE_CALENDAR_LIVE_SEARCH_DAYS", "3"))
+
 
 class TravelAgentService:
     """Service class for orchestrating travel-related operations using Amadeus APIs.
@@ -32,6 +65,17 @@ class TravelAgentService:
         logger: Logger instance for logging service activity.
         amadeus_api: Instance for interacting with Amadeus REST API endpoints.
         amadeus_client: Amadeus SDK client for advanced flight search operations.
+        async_amadeus_api: Pooled asyncio client used by the `*_async` methods.
+        response_cache: TTL/LRU cache of raw Amadeus responses keyed on normalized
+            request arguments. Pass a custom `ResponseCache` to change backends.
+        airport_index: Local IATA airport/city index that answers airport lookups
+            without a network call; the API is only queried on a miss.
+        single_flight: Coalesces identical concurrent upstream calls (from any
+            MCP mount) into one request whose result all callers share.
+        price_calendar: Observed search routes and their precomputed price
+            calendars, refreshed by `start_background_jobs`.
+        prefetcher: Budgeted background warming of the response cache with
+            the calls likely to follow an inspiration or flight search result.
 
     Methods:
         get_airport_info(name, arguments):
@@ -49,13 +93,297 @@ class TravelAgentService:
         get_inspiration_service(name, arguments):
             Fetches inspirational flight destinations from a specified origin airport.
 
+        get_airport_info_async, search_flights_async, get_trip_purpose_async,
+        get_travel_inspiration_async:
+            Awaitable variants of the methods above that do not block the event loop.
+
+        search_flights_batch_async(name, arguments):
+            Fans a flexible-date / multi-route search out concurrently and returns
+            one merged, price-sorted result.
+
+        get_price_calendar_async(name, arguments):
+            Answers cheapest-date questions from a precomputed price calendar,
+            falling back to a live batch search for uncovered routes.
+
     Exceptions:
         Raises McpError for invalid parameters or internal errors."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        response_cache: Optional[ResponseCache] = None,
+        airport_index: Optional[AirportIndex] = None,
+        price_calendar: Optional[PriceCalendar] = None,
+        prefetcher: Optional[Prefetcher] = None,
+    ):
         self.logger = logging.getLogger(__name__)
         self.amadeus_api = AmadeusAPI()
         self.amadeus_client = Client()
+        self.async_amadeus_api = AsyncAmadeusAPI()
+        self.response_cache = response_cache or ResponseCache.from_env()
+        self.airport_index = (
+            airport_index if airport_index is not None else AirportIndex.load()
+        )
+        self.single_flight = SingleFlight()
+        self.price_calendar = (
+            price_calendar if price_calendar is not None else PriceCalendar.from_env()
+        )
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher.from_env()
+        self._background_tasks: List[asyncio.Task] = []
+
+    def _cached_fetch(self, endpoint: str, params: Dict[str, Any], fetch):
+        """Cached, coalesced blocking fetch of `endpoint` with `params`."""
+        key = self.response_cache.make_key(endpoint, params)
+        self.prefetcher.record_use(key)
+        return self.response_cache.get_or_fetch(
+            endpoint,
+            params,
+            lambda: self.single_flight.do_sync(endpoint, key, fetch),
+        )
+
+    async def _cached_fetch_async(self, endpoint: str, params: Dict[str, Any], fetch):
+        """Cached, coalesced awaitable fetch; `fetch` returns an awaitable."""
+        key = self.response_cache.make_key(endpoint, params)
+        self.prefetcher.record_use(key)
+        return await self.response_cache.aget_or_fetch(
+            endpoint,
+            params,
+            lambda: self.single_flight.do(endpoint, key, fetch),
+        )
+
+    def _prefetch(self, endpoint: str, params: Dict[str, Any], fetch) -> bool:
+        """Warm the cache entry `_cached_fetch_async(endpoint, params, fetch)`
+        would read. Returns False once the prefetch budget is spent."""
+        if self.response_cache.lookup(endpoint, params)[0] == FRESH:
+            return True
+        key = self.response_cache.make_key(endpoint, params)
+        return self.prefetcher.schedule(
+            endpoint,
+            key,
+            lambda: self.response_cache.aget_or_fetch(
+                endpoint,
+                params,
+                lambda: self.single_flight.do(endpoint, key, fetch),
+            ),
+        )
+
+    def _prefetch_location(self, code: Optional[str]) -> bool:
+        """Prefetch the airport lookup for `code` unless the local index has it."""
+        code = (code or "").strip().upper()
+        if len(code) != 3 or self.airport_index.lookup(code):
+            return True
+        params = {"keyword": code, "subType": "AIRPORT,CITY"}
+        return self._prefetch(
+            "locations", params, lambda: self.async_amadeus_api.get_locations(**params)
+        )
+
+    def _prefetch_after_inspiration(self, origin: str, result: Any):
+        """Prefetch flights to the cheapest inspiration destinations on the dates shown."""
+        if not self.prefetcher.enabled or not isinstance(result, dict):
+            return
+        picks = []
+        for item in result.get("data") or []:
+            try:
+                price = float(item["price"]["total"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if item.get("destination") and item.get("departureDate"):
+                picks.append((price, item))
+        picks.sort(key=lambda pick: pick[0])
+        for _, item in picks[: self.prefetcher.max_per_result]:
+            params = self.prepare_flight_search_params(
+                origin, item["destination"], item["departureDate"], item.get("returnDate")
+            )
+            if not self._prefetch(
+                "flight_offers",
+                params,
+                lambda params=params: self.async_amadeus_api.get_flight_offers(**params),
+            ):
+                return
+        for _, item in picks[: self.prefetcher.max_per_result]:
+            if not self._prefetch_location(item["destination"]):
+                return
+
+    def _prefetch_after_search(self, arguments: dict[str, Any]):
+        """Prefetch the trip purpose and destination airport of a flight search."""
+        if not self.prefetcher.enabled:
+            return
+        if arguments.get("return_date"):
+            params = self._trip_purpose_params(arguments)
+            if not self._prefetch(
+                "trip_purpose",
+                params,
+                lambda: self.async_amadeus_api.get_trip_purpose(**params),
+            ):
+                return
+        self._prefetch_location(arguments.get("destination"))
+
+    def _sdk_get(self, family: str, resource, params: Dict[str, Any]):
+        """`resource.get(**params).result` through the rate limiter, with
+        throttling, 5xx and network errors turned into retryable ones."""
+
+        def attempt():
+            try:
+                with span("amadeus.http", family):
+                    result = resource.get(**params).result
+                AMADEUS_RESPONSES.inc(family=family, status=200)
+                return result
+            except ResponseError as e:
+                status = getattr(e.response, "status_code", None)
+                AMADEUS_RESPONSES.inc(
+                    family=family, status="error" if e.code == "NetworkError" else status
+                )
+                if e.code != "NetworkError" and status not in RETRYABLE_STATUSES:
+                    raise
+                headers = getattr(e.response, "headers", None) or {}
+                raise RetryableUpstreamError(
+                    str(e),
+                    status=status,
+                    retry_after=parse_retry_after(headers.get("Retry-After")),
+                ) from e
+
+        return amadeus_guard.call_sync(family, attempt)
+
+    def stats(self) -> dict:
+        """Response cache, request coalescing, prefetch and upstream rate limit counters."""
+        return {
+            "response_cache": self.response_cache.stats(),
+            "single_flight": self.single_flight.stats(),
+            "rate_limiter": amadeus_guard.stats(),
+            "price_calendar": self.price_calendar.stats(),
+            "prefetch": self.prefetcher.stats(),
+        }
+
+    def metric_samples(self):
+        """`stats()` as Prometheus samples for `utils.telemetry.registry`."""
+        stats = self.stats()
+        cache = stats["response_cache"]
+        for endpoint, counters in cache["endpoints"].items():
+            for result in ("hits", "stale_hits", "misses", "refreshes"):
+                yield Sample(
+                    "smart_trip_response_cache_lookups_total", "counter",
+                    "Response cache lookups by endpoint and result.",
+                    {"endpoint": endpoint, "result": result}, counters[result],
+                )
+        yield Sample(
+            "smart_trip_response_cache_entries", "gauge",
+            "Entries in the in-memory response cache.", {}, cache["memory_entries"],
+        )
+        for endpoint, counters in stats["single_flight"]["endpoints"].items():
+            for result in ("upstream", "coalesced"):
+                yield Sample(
+                    "smart_trip_single_flight_calls_total", "counter",
+                    "Amadeus calls that went upstream or joined an identical call in flight.",
+                    {"endpoint": endpoint, "result": result}, counters[result],
+                )
+        for family, limiter in stats["rate_limiter"].items():
+            for lane, counters in limiter["lanes"].items():
+                labels = {"family": family, "lane": lane}
+                yield Sample(
+                    "smart_trip_amadeus_queue_depth", "gauge",
+                    "Calls waiting for a rate limit token.", labels, counters["queue_depth"],
+                )
+                yield Sample(
+                    "smart_trip_amadeus_throttled_total", "counter",
+                    "Calls that had to wait for a rate limit token.", labels, counters["throttled"],
+                )
+            yield Sample(
+                "smart_trip_amadeus_retries_total", "counter",
+                "Retried Amadeus calls.", {"family": family}, limiter["retries"],
+            )
+            yield Sample(
+                "smart_trip_amadeus_circuit_open", "gauge",
+                "1 while the family's circuit breaker is open or half-open.",
+                {"family": family}, int(limiter["circuit"]["state"] != "closed"),
+            )
+        for endpoint, counters in stats["prefetch"]["endpoints"].items():
+            for result in ("scheduled", "hits", "wasted"):
+                yield Sample(
+                    "smart_trip_prefetch_total", "counter",
+                    "Speculative prefetches started, used by a real request, or expired unused.",
+                    {"endpoint": endpoint, "result": result}, counters[result],
+                )
+        for result in ("hits", "misses"):
+            yield Sample(
+                "smart_trip_price_calendar_lookups_total", "counter",
+                "Price calendar lookups answered from a fresh calendar or not.",
+                {"result": result}, stats["price_calendar"][result],
+            )
+
+    def start_background_jobs(self):
+        """Start the price calendar job on the running loop (once per process)."""
+        if self._background_tasks:
+            return
+        self._background_tasks.append(
+            asyncio.get_running_loop().create_task(
+                self.price_calendar.run(self.async_amadeus_api.get_flight_dates)
+            )
+        )
+
+    async def aclose(self):
+        """Stop background jobs and release pooled async connections."""
+        for task in self._background_tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._background_tasks = []
+        await self.prefetcher.aclose()
+        self.price_calendar.flush_observations()
+        await self.async_amadeus_api.aclose()
+
+    def _validate_airport_code(self, airport_code: Optional[str]) -> str:
+        if not airport_code or len(airport_code.strip()) != 3:
+            raise McpError(
+                ErrorData(
+                    code=INVALID_PARAMS,
+                    message="Valid 3-letter airport code is required (e.g., LAX, JFK)",
+                )
+            )
+        return airport_code.strip().upper()
+
+    def _learn_locations(self, result: Any):
+        """Add locations from an API fallback to the local airport index."""
+        if isinstance(result, dict) and result.get("data"):
+            added = self.airport_index.add_locations(result["data"])
+            if added:
+                self.logger.info(f"Added {added} locations to the airport index")
+
+    def _flight_search_params(self, arguments: dict[str, Any]) -> Dict[str, Any]:
+        origin = arguments.get("origin")
+        destination = arguments.get("destination")
+        departure_date = arguments.get("departure_date")
+        return_date = arguments.get("return_date", "")
+        self.logger.info(
+            f"Searching flights: {origin} to {destination}, dates: {departure_date} - {return_date}"
+        )
+        params = self.prepare_flight_search_params(
+            origin, destination, departure_date, return_date
+        )
+        params.update(self._offer_filters(arguments).upstream_params())
+        return params
+
+    def _offer_filters(self, arguments: dict[str, Any]) -> OfferFilters:
+        try:
+            return OfferFilters.from_arguments(arguments)
+        except ValueError as e:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+
+    def _observe_search(self, arguments: dict[str, Any]):
+        """Count the searched route towards its price calendar."""
+        self.price_calendar.observe(
+            arguments.get("origin"),
+            arguments.get("destination"),
+            arguments.get("departure_date"),
+            arguments.get("return_date"),
+        )
+
+    def _trip_purpose_params(self, arguments: dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "originLocationCode": arguments.get("origin"),
+            "destinationLocationCode": arguments.get("destination"),
+            "departureDate": arguments.get("departure_date"),
+            "returnDate": arguments.get("return_date"),
+            "adults": str(arguments.get("adults", 1)),
+        }
 
     def get_airport_info(
         self, name: str, arguments: dict[str, Any]
@@ -63,16 +391,19 @@ class TravelAgentService:
         try:
             airport_code = arguments.get("airport_code")
             self.logger.info(f"Getting airport info for: {airport_code}")
-            if not airport_code or len(airport_code.strip()) != 3:
-                raise McpError(
-                    ErrorData(
-                        code=INVALID_PARAMS,
-                        message="Valid 3-letter airport code is required (e.g., LAX, JFK)",
-                    )
-                )
-            airport_code = airport_code.strip().upper()
+            airport_code = self._validate_airport_code(airport_code)
+            locations = self.airport_index.lookup(airport_code)
+            if locations:
+                return format_airport_info_response({"data": locations}, airport_code)
             params = {"keyword": airport_code, "subType": "AIRPORT,CITY"}
-            result = self.amadeus_client.reference_data.locations.get(**params).result
+            result = self._cached_fetch(
+                "locations",
+                params,
+                lambda: self._sdk_get(
+                    "locations", self.amadeus_client.reference_data.locations, params
+                ),
+            )
+            self._learn_locations(result)
             return format_airport_info_response(result, airport_code)
         except McpError:
             raise
@@ -88,24 +419,24 @@ class TravelAgentService:
     def search_flights(
         self, name: str, arguments: dict[str, Any]
     ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
-        origin = arguments.get("origin")
-        destination = arguments.get("destination")
-        departure_date = arguments.get("departure_date")
-        return_date = arguments.get("return_date", "")
-        self.logger.info(
-            f"Searching flights: {origin} to {destination}, dates: {departure_date} - {return_date}"
-        )
-        params = self.prepare_flight_search_params(
-            origin, destination, departure_date, return_date
-        )
+        params = self._flight_search_params(arguments)
+        self._observe_search(arguments)
         self.logger.info("Executing Amadeus API search...")
-        search_results = self.amadeus_client.shopping.flight_offers_search.get(
-            **params
-        ).result
+        search_results = self._cached_fetch(
+            "flight_offers",
+            params,
+            lambda: self._sdk_get(
+                "flight_offers", self.amadeus_client.shopping.flight_offers_search, params
+            ),
+        )
         if "error" in search_results:
             self.logger.error(f"Amadeus API search error: {search_results['error']}")
             return [{"error": search_results["error"]}]
-        return format_flight_results(search_results)
+        return format_flight_results(
+            search_results,
+            self._offer_filters(arguments),
+            int(arguments.get("max_results") or 5),
+        )
 
     def prepare_flight_search_params(
         self,
@@ -123,7 +454,7 @@ class TravelAgentService:
             "adults": passengers,
             "travelClass": class_preference.upper(),
             "nonStop": "false",
-            "max": 5,
+            "max": MAX_OFFERS,
         }
         if return_date:
             params["returnDate"] = return_date
@@ -143,23 +474,15 @@ class TravelAgentService:
             A dictionary containing the predicted trip purpose.
         """
         try:
-            origin = arguments.get("origin")
-            destination = arguments.get("destination")
-            departure_date = arguments.get("departure_date")
-            return_date = arguments.get("return_date")
-            adults = arguments.get("adults", 1)
-
-            params = {
-                "originLocationCode": origin,
-                "destinationLocationCode": destination,
-                "departureDate": departure_date,
-                "returnDate": return_date,
-                "adults": str(adults),
-            }
+            params = self._trip_purpose_params(arguments)
             # Make the API call to Amadeus
             self.logger.info("Executing Amadeus API...")
-            trip_purpose_response = (
-                self.amadeus_client.travel.predictions.trip_purpose.get(**params).result
+            trip_purpose_response = self._cached_fetch(
+                "trip_purpose",
+                params,
+                lambda: self._sdk_get(
+                    "trip_purpose", self.amadeus_client.travel.predictions.trip_purpose, params
+                ),
             )
             return format_trip_purpose_response(trip_purpose_response, arguments)
 
@@ -176,20 +499,17 @@ class TravelAgentService:
             # Validate input
             origin_airport_code = arguments.get("origin_airport_code")
             logger.info(f"Getting inspiration for: {origin_airport_code}")
-            if not origin_airport_code or len(origin_airport_code.strip()) != 3:
-                raise McpError(
-                    ErrorData(
-                        code=INVALID_PARAMS,
-                        message="Valid 3-letter airport code is required (e.g., LAX, JFK)",
-                    )
-                )
-
-            origin_airport_code = origin_airport_code.strip().upper()
+            origin_airport_code = self._validate_airport_code(origin_airport_code)
             logger.info(f"Getting inspiration for: {origin_airport_code}")
 
-            result = self.amadeus_client.shopping.flight_destinations.get(
-                origin=origin_airport_code
-            ).result
+            params = {"origin": origin_airport_code}
+            result = self._cached_fetch(
+                "flight_destinations",
+                params,
+                lambda: self._sdk_get(
+                    "flight_destinations", self.amadeus_client.shopping.flight_destinations, params
+                ),
+            )
 
             return format_inspiration_flights_response(result, origin_airport_code)
 
@@ -204,3 +524,331 @@ class TravelAgentService:
                     message=f"Failed to fetch inspiration: {str(e)}",
                 )
             ) from e
+
+    async def get_airport_info_async(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
+        try:
+            airport_code = arguments.get("airport_code")
+            self.logger.info(f"Getting airport info for: {airport_code}")
+            airport_code = self._validate_airport_code(airport_code)
+            locations = self.airport_index.lookup(airport_code)
+            if locations:
+                return format_airport_info_response({"data": locations}, airport_code)
+            params = {"keyword": airport_code, "subType": "AIRPORT,CITY"}
+            result = await self._cached_fetch_async(
+                "locations",
+                params,
+                lambda: self.async_amadeus_api.get_locations(**params),
+            )
+            self._learn_locations(result)
+            return format_airport_info_response(result, airport_code)
+        except McpError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Unexpected error getting airport info: {str(e)}")
+            raise McpError(
+                ErrorData(
+                    code=INTERNAL_ERROR,
+                    message=f"Failed to get airport information: {str(e)}",
+                )
+            ) from e
+
+    async def search_flights_async(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
+        params = self._flight_search_params(arguments)
+        self._observe_search(arguments)
+        self.logger.info("Executing Amadeus API search...")
+        search_results = await self._cached_fetch_async(
+            "flight_offers",
+            params,
+            lambda: self.async_amadeus_api.get_flight_offers(**params),
+        )
+        if "error" in search_results:
+            self.logger.error(f"Amadeus API search error: {search_results['error']}")
+            return [{"error": search_results["error"]}]
+        response = format_flight_results(
+            search_results,
+            self._offer_filters(arguments),
+            int(arguments.get("max_results") or 5),
+        )
+        if search_results.get("data"):
+            self._prefetch_after_search(arguments)
+        return response
+
+    async def get_trip_purpose_async(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Dict[str, Any]:
+        try:
+            params = self._trip_purpose_params(arguments)
+            self.logger.info("Executing Amadeus API...")
+            trip_purpose_response = await self._cached_fetch_async(
+                "trip_purpose",
+                params,
+                lambda: self.async_amadeus_api.get_trip_purpose(**params),
+            )
+            return format_trip_purpose_response(trip_purpose_response, arguments)
+        except Exception as e:
+            return {"error": f"An unexpected error occurred: {str(e)}"}
+
+    async def get_travel_inspiration_async(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
+        try:
+            origin_airport_code = arguments.get("origin_airport_code")
+            logger.info(f"Getting inspiration for: {origin_airport_code}")
+            origin_airport_code = self._validate_airport_code(origin_airport_code)
+            params = {"origin": origin_airport_code}
+            result = await self._cached_fetch_async(
+                "flight_destinations",
+                params,
+                lambda: self.async_amadeus_api.get_flight_destinations(**params),
+            )
+            response = format_inspiration_flights_response(result, origin_airport_code)
+            self._prefetch_after_inspiration(origin_airport_code, result)
+            return response
+        except McpError:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error for inspiration: {str(e)}")
+            raise McpError(
+                ErrorData(
+                    code=INTERNAL_ERROR,
+                    message=f"Failed to fetch inspiration: {str(e)}",
+                )
+            ) from e
+
+    def _parse_date(self, value: Optional[str], field: str) -> date:
+        try:
+            return date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise McpError(
+                ErrorData(
+                    code=INVALID_PARAMS,
+                    message=f"{field} must be a date in YYYY-MM-DD format",
+                )
+            )
+
+    def _batch_flight_searches(self, arguments: dict[str, Any]) -> List[Dict[str, Any]]:
+        """Expand batch arguments into distinct per-route, per-date searches."""
+        origins = [self._validate_airport_code(o) for o in arguments.get("origins") or []]
+        destinations = [
+            self._validate_airport_code(d) for d in arguments.get("destinations") or []
+        ]
+        if not origins or not destinations:
+            raise McpError(
+                ErrorData(
+                    code=INVALID_PARAMS,
+                    message="At least one origin and one destination are required",
+                )
+            )
+        first_date = self._parse_date(
+            arguments.get("departure_date_from"), "departure_date_from"
+        )
+        last_date = self._parse_date(
+            arguments.get("departure_date_to") or arguments.get("departure_date_from"),
+            "departure_date_to",
+        )
+        if last_date < first_date:
+            raise McpError(
+                ErrorData(
+                    code=INVALID_PARAMS,
+                    message="departure_date_to must not be before departure_date_from",
+                )
+            )
+        return_date = arguments.get("return_date")
+        if return_date:
+            self._parse_date(return_date, "return_date")
+        trip_length = arguments.get("trip_length_days")
+        upstream_filters = self._offer_filters(arguments).upstream_params()
+
+        searches = {}
+        day = first_date
+        while day <= last_date:
+            if trip_length:
+                search_return = (day + timedelta(days=int(trip_length))).isoformat()
+            else:
+                search_return = return_date or ""
+            for origin in origins:
+                for destination in destinations:
+                    if origin == destination:
+                        continue
+                    params = self.prepare_flight_search_params(
+                        origin, destination, day.isoformat(), search_return
+                    )
+                    params.update(upstream_filters)
+                    # Identical sub-queries (e.g. repeated codes) collapse into one.
+                    key = self.response_cache.make_key("flight_offers", params)
+                    searches.setdefault(
+                        key,
+                        {
+                            "origin": origin,
+                            "destination": destination,
+                            "departure_date": day.isoformat(),
+                            "return_date": search_return,
+                            "params": params,
+                        },
+                    )
+            day += timedelta(days=1)
+
+        if len(searches) > MAX_BATCH_SEARCHES:
+            raise McpError(
+                ErrorData(
+                    code=INVALID_PARAMS,
+                    message=f"Batch expands to {len(searches)} searches; the limit is {MAX_BATCH_SEARCHES}. Narrow the date range or route lists.",
+                )
+            )
+        return list(searches.values())
+
+    async def search_flights_batch_async(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
+        searches = self._batch_flight_searches(arguments)
+        max_results = int(arguments.get("max_results") or 10)
+        self.logger.info(f"Running {len(searches)} flight searches in batch")
+        # One observation per route: a flexible-date batch is one question.
+        observed = set()
+        for search in searches:
+            route = (search["origin"], search["destination"])
+            if route not in observed:
+                observed.add(route)
+                self._observe_search(search)
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def run(search: Dict[str, Any]) -> Dict[str, Any]:
+            params = search["params"]
+            async with semaphore:
+                search["flight_data"] = await self._cached_fetch_async(
+                    "flight_offers",
+                    params,
+                    lambda: self.async_amadeus_api.get_flight_offers(**params),
+                )
+            return search
+
+        outcomes = await asyncio.gather(
+            *(run(search) for search in searches), return_exceptions=True
+        )
+        results, failed = [], []
+        for search, outcome in zip(searches, outcomes):
+            if isinstance(outcome, Exception) or "error" in outcome["flight_data"]:
+                error = (
+                    str(outcome)
+                    if isinstance(outcome, Exception)
+                    else outcome["flight_data"]["error"]
+                )
+                self.logger.error(
+                    f"Batch search {search['origin']}-{search['destination']} on {search['departure_date']} failed: {error}"
+                )
+                failed.append(
+                    {
+                        "route": f"{search['origin']}-{search['destination']}",
+                        "departure_date": search["departure_date"],
+                        "error": error,
+                    }
+                )
+            else:
+                results.append(outcome)
+        if not results and failed:
+            raise McpError(
+                ErrorData(
+                    code=INTERNAL_ERROR,
+                    message=f"All {len(failed)} flight searches failed: {failed[0]['error']}",
+                )
+            )
+        return format_batch_flight_results(
+            results, failed, max_results, self._offer_filters(arguments)
+        )
+
+    async def get_price_calendar_async(
+        self, name: str, arguments: dict[str, Any]
+    ) -> Tuple[list[types.ContentBlock], dict[str, Any]]:
+        origin = self._validate_airport_code(arguments.get("origin"))
+        destination = self._validate_airport_code(arguments.get("destination"))
+        first_date = self._parse_date(
+            arguments.get("departure_date_from"), "departure_date_from"
+        )
+        if arguments.get("departure_date_to"):
+            last_date = self._parse_date(
+                arguments.get("departure_date_to"), "departure_date_to"
+            )
+        else:
+            last_date = first_date + timedelta(days=CALENDAR_DEFAULT_DAYS - 1)
+        if last_date < first_date:
+            raise McpError(
+                ErrorData(
+                    code=INVALID_PARAMS,
+                    message="departure_date_to must not be before departure_date_from",
+                )
+            )
+        try:
+            request = PriceCalendarRequest.model_validate(arguments)
+        except ValidationError as e:
+            raise McpError(
+                ErrorData(code=INVALID_PARAMS, message=f"Invalid price calendar arguments: {e}")
+            )
+        trip_length = request.trip_length_days or 0
+        max_results = request.max_results or 5
+
+        calendar = self.price_calendar.lookup(origin, destination, trip_length)
+        days = calendar.window(first_date, last_date) if calendar else []
+        if days:
+            return format_price_calendar_response(
+                calendar, days, max_results, self.price_calendar.freshness(calendar)
+            )
+
+        # Not covered: answer from one flight dates call for the window, and
+        # count the route so it gets a calendar.
+        days_requested = (last_date - first_date).days + 1
+        params = self.price_calendar.flight_dates_params(
+            (origin, destination, trip_length), first_date, days_requested
+        )
+        try:
+            payload = await self._cached_fetch_async(
+                "flight_dates",
+                params,
+                lambda: self.async_amadeus_api.get_flight_dates(**params),
+            )
+        except Exception as e:
+            self.logger.warning(f"Flight dates lookup for {origin}-{destination} failed: {e}")
+            payload = {}
+        live = RouteCalendar.from_flight_dates(
+            origin, destination, trip_length, first_date, days_requested, payload
+        )
+        days = live.window(first_date, last_date)
+        if days:
+            self._observe_search(
+                {
+                    "origin": origin,
+                    "destination": destination,
+                    "departure_date": first_date.isoformat(),
+                    "return_date": (
+                        (first_date + timedelta(days=trip_length)).isoformat()
+                        if trip_length
+                        else None
+                    ),
+                }
+            )
+            return format_price_calendar_response(
+                live, days, max_results, self.price_calendar.freshness(live)
+            )
+
+        # No cheapest-date fares: search only the first few days live (the
+        # batch search counts the route).
+        live_last_date = min(last_date, first_date + timedelta(days=CALENDAR_LIVE_SEARCH_DAYS - 1))
+        self.logger.info(
+            f"No price calendar or cheapest-date fares for {origin}-{destination}, searching {first_date} to {live_last_date} live"
+        )
+        response = await self.search_flights_batch_async(
+            name,
+            {
+                "origins": [origin],
+                "destinations": [destination],
+                "departure_date_from": first_date.isoformat(),
+                "departure_date_to": live_last_date.isoformat(),
+                "trip_length_days": trip_length or None,
+                "max_results": max_results,
+            },
+        )
+        message = f"No precomputed price calendar or cheapest-date fares cover {origin}-{destination} for these dates; searched departures {first_date} to {live_last_date} live."
+        return format_live_calendar_response(response, message)
@@ -0,0 +1,111 @@
+"""Request coalescing for identical concurrent Amadeus calls.
+
+When several callers ask for the same data at the same time (a trending
+route searched from many sessions), only the first call goes upstream; the
+others wait for it and share its result or exception. Keys are the response
+cache keys, so "identical" means same endpoint and normalized parameters.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Per-key deduplication of in-flight calls, for coroutines and threads.
+
+    Coalescing only spans one process; each MCP worker has its own.
+    """
+
+    def __init__(self):
+        self._async_calls: Dict[str, Dict[str, Any]] = {}
+        self._sync_calls: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, endpoint: str, counter: str):
+        with self._lock:
+            counters = self._stats.setdefault(endpoint, {"calls": 0, "upstream": 0, "coalesced": 0})
+            counters["calls"] += 1
+            counters[counter] += 1
+
+    async def do(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fetch()`, or the identical call already in flight for `key`.
+
+        The call runs as its own task, which every caller awaits shielded: a
+        cancelled caller (e.g. a client that went away) does not cancel the
+        call for the others. It is only cancelled when no caller is left.
+        """
+        call = self._async_calls.get(key)
+        if call is None:
+            self._count(endpoint, "upstream")
+            task = asyncio.ensure_future(fetch())
+            call = self._async_calls[key] = {"task": task, "waiters": 0}
+            task.add_done_callback(lambda done: self._finish(key, call))
+        else:
+            self._count(endpoint, "coalesced")
+        call["waiters"] += 1
+        try:
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+            if call["waiters"] == 0 and not call["task"].done():
+                # Forget the call now: a caller arriving before the task has
+                # finished cancelling starts a fresh fetch instead of joining it.
+                if self._async_calls.get(key) is call:
+                    del self._async_calls[key]
+                call["task"].cancel()
+
+    def _finish(self, key: str, call: Dict[str, Any]):
+        if self._async_calls.get(key) is call:
+            del self._async_calls[key]
+        task = call["task"]
+        if not task.cancelled():
+            # Mark retrieved so an exception nobody else waited for is not logged.
+            task.exception()
+
+    def do_sync(self, endpoint: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Thread-based variant of `do` for the blocking code paths."""
+        with self._lock:
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._sync_calls[key] = {"done": threading.Event()}
+        if not leader:
+            self._count(endpoint, "coalesced")
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["result"]
+
+        self._count(endpoint, "upstream")
+        try:
+            call["result"] = fetch()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._sync_calls.pop(key, None)
+            call["done"].set()
+
+    def stats(self) -> dict:
+        """Per-endpoint call counts and the share of calls served by another's request."""
+        with self._lock:
+            endpoints = {
+                endpoint: {
+                    **counters,
+                    "coalescing_ratio": (
+                        counters["coalesced"] / counters["calls"] if counters["calls"] else 0.0
+                    ),
+                }
+                for endpoint, counters in self._stats.items()
+            }
+        calls = sum(c["calls"] for c in endpoints.values())
+        coalesced = sum(c["coalesced"] for c in endpoints.values())
+        return {
+            "endpoints": endpoints,
+            "in_flight": len(self._async_calls) + len(self._sync_calls),
+            "coalescing_ratio": coalesced / calls if calls else 0.0,
+        }
@@ -0,0 +1,256 @@
+"""MCP tool definitions shared by the HTTP server and the in-process toolset.
+
+`server.py` serves these tools over Streamable HTTP; the sub-agents can also
+call them in-process through `smart_trip_agent.tools.InProcessToolset`. Both
+paths use the same `types.Tool` schemas and dispatch through `call_tool`, so
+the model sees identical declarations and results whichever transport is used.
+
+Tools are declared once in `TOOL_SPECS`, with their arguments and structured
+output described by the pydantic models in `models/schemas.py`. At import,
+`ToolRegistry` turns the models into plain JSON schemas (no `$ref`, titles or
+`null` branches, which the model's function declarations do not need),
+serializes each mount's `tools/list` result once and derives an ETag from
+it, and keeps each input model as the argument validator. The stateless MCP
+server answers every `tools/list` request from those bytes, and a tool call
+is validated by pydantic's compiled validator instead of
+`jsonschema.validate`, which rebuilds its validator on every call.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import mcp.types as types
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from models.schemas import (
+    AirportInfoRequest,
+    CompactFlightSearchResult,
+    FlightSearchBatchRequest,
+    FlightSearchRequest,
+    FlightSearchResult,
+    InspirationRequest,
+    PriceCalendarRequest,
+    TripPurposeRequest,
+)
+from utils.compact_formatter import compact_output_enabled
+from utils.telemetry import span
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Declaration of one MCP tool.
+
+    Attributes:
+        name: Tool name.
+        mount: MCP server mount serving it (`airport`, `flights`, ...).
+        handler: `TravelAgentService` coroutine method handling it.
+        description: Description shown to the model.
+        input_model: Pydantic model of the arguments.
+        output_type: Type of the structured output (a model or e.g. a list
+            of models); its schema becomes the tool's `outputSchema`.
+        compact_output_type: Type of the structured output in
+            TOOL_OUTPUT_MODE=compact, if the compact formatter returns one.
+    """
+
+    name: str
+    mount: str
+    handler: str
+    description: str
+    input_model: Type[BaseModel]
+    output_type: Optional[Any] = None
+    compact_output_type: Optional[Any] = None
+
+    def output_schema_type(self) -> Optional[Any]:
+        """Structured output type for the current TOOL_OUTPUT_MODE."""
+        if compact_output_enabled():
+            return self.compact_output_type
+        return self.output_type
+
+
+def _plain_schema(node, defs: Dict[str, Any]):
+    """Pydantic JSON schema without `$ref`s, titles, `null` branches and `None` defaults."""
+    if isinstance(node, list):
+        return [_plain_schema(item, defs) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if "$ref" in node:
+        resolved = dict(defs[node["$ref"].rsplit("/", 1)[-1]])
+        resolved.update({k: v for k, v in node.items() if k != "$ref"})
+        return _plain_schema(resolved, defs)
+    branches = [b for b in node.get("anyOf", []) if b != {"type": "null"}]
+    if "anyOf" in node and len(branches) == 1:
+        merged = {**branches[0], **{k: v for k, v in node.items() if k != "anyOf"}}
+        return _plain_schema(merged, defs)
+    schema = {}
+    for key, value in node.items():
+        if key in ("title", "$defs") or (key == "default" and value is None):
+            continue
+        if key == "properties":
+            schema[key] = {name: _plain_schema(prop, defs) for name, prop in value.items()}
+        else:
+            schema[key] = _plain_schema(value, defs)
+    return schema
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+
+
+def json_schema(type_) -> Dict[str, Any]:
+    """Plain JSON schema of a pydantic model or type, for MCP tool declarations."""
+    schema = TypeAdapter(type_).json_schema()
+    return _plain_schema(schema, schema.get("$defs", {}))
+
+
+class ToolRegistry:
+    """Tool declarations, cached `tools/list` results and argument validators.
+
+    Attributes:
+        specs: Tool name -> `ToolSpec`.
+        tools: Tool name -> `types.Tool`, built once.
+        version: ETag of the list of every tool.
+    """
+
+    def __init__(self, specs: List[ToolSpec]):
+        self.specs: Dict[str, ToolSpec] = {spec.name: spec for spec in specs}
+        self.tools: Dict[str, types.Tool] = {
+            spec.name: types.Tool(
+                name=spec.name,
+                description=spec.description,
+                inputSchema=json_schema(spec.input_model),
+                outputSchema=(
+                    json_schema(spec.output_schema_type())
+                    if spec.output_schema_type() is not None
+                    else None
+                ),
+            )
+            for spec in specs
+        }
+        self.mount_tools: Dict[str, List[types.Tool]] = {}
+        for spec in specs:
+            self.mount_tools.setdefault(spec.mount, []).append(self.tools[spec.name])
+        # mount (None: every tool) -> (serialized ListToolsResult, ETag)
+        self._list_results: Dict[Optional[str], Tuple[bytes, str]] = {}
+        for mount, tools in [*self.mount_tools.items(), (None, list(self.tools.values()))]:
+            # Serialized the way the MCP session serializes results.
+            body = types.ListToolsResult(tools=tools).model_dump_json(
+                by_alias=True, exclude_none=True
+            ).encode("utf-8")
+            self._list_results[mount] = (body, _etag(body))
+        self.version = self._list_results[None][1]
+
+    def tools_for(self, mount: Optional[str]) -> List[types.Tool]:
+        """Tools served under `mount`, or every tool for None."""
+        if mount is None:
+            return list(self.tools.values())
+        return self.mount_tools[mount]
+
+    def list_tools_result(self, mount: Optional[str]) -> Tuple[bytes, str]:
+        """`(JSON bytes of the ListToolsResult, ETag)` for `mount` (None: every tool)."""
+        return self._list_results[mount]
+
+    def validate(self, name: str, arguments: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Arguments of tool `name` checked and coerced by its input model.
+
+        Returns only the arguments that were given (unknown keys are dropped);
+        raises ValueError, which the MCP server and the in-process toolset
+        report as an error result.
+        """
+        spec = self.specs.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown tool: {name}")
+        try:
+            parsed = spec.input_model.model_validate(arguments or {})
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(p) for p in error['loc']) or 'arguments'}: {error['msg']}"
+                for error in e.errors()
+            )
+            raise ValueError(f"Input validation error: {problems}") from None
+        return parsed.model_dump(exclude_unset=True)
+
+
+TOOL_SPECS = [
+    ToolSpec(
+        name="get_airport_info",
+        mount="airport",
+        handler="get_airport_info_async",
+        description="Get information about an airport using Amadeus API.",
+        input_model=AirportInfoRequest,
+    ),
+    ToolSpec(
+        name="flight_search_assistant",
+        mount="flights",
+        handler="search_flights_async",
+        description="An intelligent agent that helps travelers find and recommend flights based on their itinerary, including origin, destination, and travel dates.",
+        input_model=FlightSearchRequest,
+        output_type=FlightSearchResult,
+        compact_output_type=CompactFlightSearchResult,
+    ),
+    ToolSpec(
+        name="flight_search_batch",
+        mount="flights",
+        handler="search_flights_batch_async",
+        description="Search many routes and departure dates in one call (e.g. the cheapest day next week, or several nearby airports) and return the cheapest offers across all of them, sorted by price. Prefer this over repeated single searches for flexible-date questions.",
+        input_model=FlightSearchBatchRequest,
+    ),
+    ToolSpec(
+        name="flight_price_calendar",
+        mount="flights",
+        handler="get_price_calendar_async",
+        description="Cheapest fare per departure date for one route over a date range (e.g. the cheapest time to fly MAD to JFK in November), answered instantly from precomputed calendars of popular routes. Reports how fresh the prices are, and falls back to a live search for routes without a calendar. Prefer this for 'cheapest day/time to fly' questions; confirm the chosen date with flight_search_assistant.",
+        input_model=PriceCalendarRequest,
+    ),
+    ToolSpec(
+        name="get_inspiration",
+        mount="inspiration",
+        handler="get_travel_inspiration_async",
+        description="Help travelers discover their next destination by finding the cheapest flight destinations from a specific city",
+        input_model=InspirationRequest,
+        # No outputSchema: MCP requires an object schema, and the structured
+        # result is the Amadeus response rather than a list of `InspirationFlight`s.
+    ),
+    ToolSpec(
+        name="get_trip_purpose",
+        mount="trip-purpose",
+        handler="get_trip_purpose_async",
+        description="Predict the purpose of a trip (business or leisure)",
+        input_model=TripPurposeRequest,
+    ),
+]
+
+TOOL_REGISTRY = ToolRegistry(TOOL_SPECS)
+
+# Tools served under each MCP server mount (`/airport`, `/flights`, ...).
+MOUNT_TOOLS: Dict[str, List[types.Tool]] = TOOL_REGISTRY.mount_tools
+AIRPORT_TOOLS = MOUNT_TOOLS["airport"]
+FLIGHT_TOOLS = MOUNT_TOOLS["flights"]
+INSPIRATION_TOOLS = MOUNT_TOOLS["inspiration"]
+TRIP_PURPOSE_TOOLS = MOUNT_TOOLS["trip-purpose"]
+
+# Tool name -> `TravelAgentService` coroutine method handling it.
+TOOL_HANDLERS = {spec.name: spec.handler for spec in TOOL_SPECS}
+
+
+async def call_tool(service, name: str, arguments: Dict[str, Any]):
+    """Validate the arguments, run tool `name` on `service` and return the formatter's output."""
+    arguments = TOOL_REGISTRY.validate(name, arguments)
+    with span("mcp.tool", name):
+        return await getattr(service, TOOL_HANDLERS[name])(name, arguments)
+
+
+def to_call_tool_result(result) -> types.CallToolResult:
+    """Convert a handler's return value the way the MCP lowlevel server does.
+
+    Handlers return either a content list or a `(content, structured)` tuple.
+    """
+    if isinstance(result, tuple):
+        content, structured = result
+        return types.CallToolResult(content=list(content), structuredContent=structured)
+    return types.CallToolResult(content=list(result))
+
+
+def error_result(error: Exception) -> types.CallToolResult:
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=str(error))], isError=True
+    )
@@ -1,16 +1,29 @@
 from google.adk import Agent
-from google.adk.runners import InMemoryRunner
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
 from google.genai import types
 from dotenv import load_dotenv
+import os
 import uuid
 
 load_dotenv()
 
 from smart_trip_agent import prompt
+from smart_trip_agent.answer_cache import AnswerCache, session_context
+from smart_trip_agent.callbacks import with_callback
+from smart_trip_agent.router import IntentRouter
+from smart_trip_agent.history import HistoryCompactor, install_history_compactor
+from smart_trip_agent.instrumentation import AgentInstrumentation, install_instrumentation
+from smart_trip_agent.planner import ParallelPlanner
+from smart_trip_agent.session_service import build_session_service
 from smart_trip_agent.sub_agents.airport import airport_agent
 from smart_trip_agent.sub_agents.flight_search import flight_search_agent
 from smart_trip_agent.sub_agents.inspiration import inspiration_agent
 from smart_trip_agent.sub_agents.trip_purpose import trip_purpose_agent
+from utils.telemetry import Sample, registry, span
 
 root_agent = Agent(
     model="gemini-2.5-flash",
@@ -27,20 +40,182 @@ root_agent = Agent(
 
 class SmartTripAgent:
     def __init__(self):
-        self.agent = root_agent
-        # The runner should be initialized once and reused.
-        self.runner = InMemoryRunner(agent=self.agent, app_name="smart-trip-planner")
+        # Callbacks are added to a copy of the agent tree, so building the
+        # agent twice does not install them twice on the module-level agents.
+        self.agent = root_agent.clone()
+        # The runner should be initialized once and reused. Sessions go to the
+        # backend chosen by SESSION_BACKEND so they survive restarts and can be
+        # shared by several workers.
+        self.session_service = build_session_service()
+        # Opt-in (INTENT_ROUTER=true) routing of clear requests to a sub-agent
+        # without the root model call.
+        self.router = None
+        if os.getenv("INTENT_ROUTER", "false").lower() == "true":
+            self.router = IntentRouter.from_env()
+            self.agent.before_model_callback = with_callback(
+                self.agent.before_model_callback, self.router.before_model
+            )
+            self.agent.after_model_callback = with_callback(
+                self.agent.after_model_callback, self.router.after_model
+            )
+        # Opt-in (ANSWER_CACHE=true) reuse of answers to repeated questions.
+        self.answer_cache = AnswerCache.from_env()
+        # Bound what each model call re-sends as conversations grow.
+        self.history = HistoryCompactor.from_env()
+        install_history_compactor(self.agent, self.history)
+        # Agent/model latencies, transfers and token usage for /metrics.
+        instrumentation = AgentInstrumentation(self.agent.name)
+        install_instrumentation(self.agent, instrumentation)
+        registry.add_collector(self.metric_samples)
+        # Opt-in (PLANNER=true) concurrent sub-agents for multi-intent requests.
+        self.planner = ParallelPlanner.from_env(self.agent, self.router)
+        if self.planner is not None:
+            install_instrumentation(self.planner.synthesizer, instrumentation)
+        self.runner = Runner(
+            agent=self.agent,
+            app_name="smart-trip-planner",
+            session_service=self.session_service,
+            artifact_service=InMemoryArtifactService(),
+            memory_service=InMemoryMemoryService(),
+        )
 
-    async def get_response(self, message: str, session_id: str | None = None):
-        """Get a response from the travel planner agent asynchronously."""
+    async def _flush_session(self):
+        """Persist the turn's events before answering (write-behind backends)."""
+        if hasattr(self.session_service, "flush"):
+            await self.session_service.flush()
+
+    async def _cache_context(self, user_id: str, session_id: str):
+        """Session context (previous route and dates) keying the answer cache."""
+        if self.answer_cache is None:
+            return None
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id=user_id, session_id=session_id
+        )
+        return session_context(session)
+
+    async def _answer_from_cache(self, message: str, user_id: str, session_id: str, context):
+        """Return a cached answer for `message` and record the turn in the session."""
+        if self.answer_cache is None:
+            return None
+        cached = self.answer_cache.lookup(message, context)
+        if cached is None:
+            return None
+        await self._record_turn(user_id, session_id, message, cached["agent"], cached["response"], "cache")
+        return cached
+
+    async def _record_turn(self, user_id: str, session_id: str, message: str, agent: str, response: str, source: str):
+        """Append a user message and an answer produced outside the runner to the session."""
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id=user_id, session_id=session_id
+        )
+        invocation_id = f"{source}-{uuid.uuid4()}"
+        for author, role, text in (
+            ("user", "user", message),
+            (agent, "model", response),
+        ):
+            await self.runner.session_service.append_event(
+                session,
+                Event(
+                    invocation_id=invocation_id,
+                    author=author,
+                    content=types.Content(role=role, parts=[types.Part.from_text(text=text)]),
+                ),
+            )
+        await self._flush_session()
+
+    async def _recent_history(self, user_id: str, session_id: str, turns: int = 6) -> str:
+        """The last `turns` text messages of the session, as context for planner tasks."""
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id=user_id, session_id=session_id
+        )
+        lines = []
+        for event in reversed(session.events if session else []):
+            if event.content and event.content.parts and not event.partial:
+                text = "".join(part.text for part in event.content.parts if part.text)
+                if text:
+                    lines.append(f"{event.author}: {text}")
+                    if len(lines) == turns:
+                        break
+        return "\n".join(reversed(lines))
+
+    async def _planned_response(self, message: str, user_id: str, session_id: str, context=None, stream: bool = False):
+        """Yield planner events for a multi-intent `message`; nothing if it has one intent."""
+        tasks = self.planner.plan(message) if self.planner is not None else []
+        if not tasks:
+            return
+        yield {
+            "type": "plan",
+            "tasks": [{"agent": task.agent, "request": task.request, "dependent": task.dependent} for task in tasks],
+        }
+        history = await self._recent_history(user_id, session_id)
+        answer = []
+        async for event in self.planner.run(message, tasks, history, stream=stream):
+            if event["type"] == "text":
+                answer.append(event["text"])
+                event = {"type": "text", "agent": self.agent.name, "text": event["text"]}
+            yield event
+        response = "".join(answer)
+        await self._record_turn(user_id, session_id, message, self.agent.name, response, "planner")
+        self._store_answer(message, response, self.agent.name, context)
+
+    def _store_answer(self, message: str, response: str, agent: str | None, context=None):
+        if self.answer_cache is not None and agent and agent != "user":
+            self.answer_cache.store(message, response, agent, context)
+
+    def answer_cache_stats(self):
+        """Answer cache counters, or None when it is disabled."""
+        return self.answer_cache.stats() if self.answer_cache else None
+
+    def router_stats(self):
+        """Intent router hit/fallback counts, or None when it is disabled."""
+        return self.router.stats() if self.router else None
+
+    def metric_samples(self):
+        """Router and answer cache counters as Prometheus samples."""
+        if self.router is not None:
+            stats = self.router.stats()
+            for agent, routed in stats["routed_by_agent"].items():
+                yield Sample(
+                    "smart_trip_router_decisions_total", "counter",
+                    "Intent router decisions: routed to a sub-agent or fell back to the model.",
+                    {"result": "routed", "agent": agent}, routed,
+                )
+            yield Sample(
+                "smart_trip_router_decisions_total", "counter",
+                "Intent router decisions: routed to a sub-agent or fell back to the model.",
+                {"result": "fallback", "agent": ""}, stats["fallbacks"],
+            )
+        if self.answer_cache is not None:
+            stats = self.answer_cache.stats()
+            for result in ("hits", "misses", "stores", "uncacheable"):
+                yield Sample(
+                    "smart_trip_answer_cache_total", "counter",
+                    "Answer cache lookups (hits, misses) and stores (stores, uncacheable).",
+                    {"result": result}, stats[result],
+                )
+            yield Sample(
+                "smart_trip_answer_cache_entries", "gauge",
+                "Answers held by the answer cache.", {}, stats["entries"],
+            )
+
+    def token_stats(self, session_id: str):
+        """Per-session request token counts before/after history compaction."""
+        return self.history.stats(session_id)
+
+    async def close(self):
+        if hasattr(self.session_service, "close"):
+            await self.session_service.close()
+
+    async def _ensure_session(self, session_id: str | None) -> tuple[str, str]:
+        """Return `(user_id, session_id)`, creating the session if needed."""
         # If no session_id is provided, create a new one for a new conversation.
         if not session_id:
             session_id = str(uuid.uuid4())
 
         user_id = session_id  # For simplicity, use the same ID for the user.
 
-        # Ensure the session exists. This is important for in-memory services
-        # that might lose state on server restart.
+        # Ensure the session exists. Sessions can expire or, with the
+        # in-memory backend, be lost on restart.
         session = await self.runner.session_service.get_session(
             app_name=self.runner.app_name,
             user_id=user_id,
@@ -52,23 +227,145 @@ class SmartTripAgent:
                 user_id=user_id,
                 session_id=session_id,
             )
+        return user_id, session_id
+
+    async def get_response(self, message: str, session_id: str | None = None):
+        """Get a response from the travel planner agent asynchronously."""
+        with span("agent.response", "get_response"):
+            return await self._get_response(message, session_id)
+
+    async def _get_response(self, message: str, session_id: str | None):
+        user_id, session_id = await self._ensure_session(session_id)
+
+        context = await self._cache_context(user_id, session_id)
+        cached = await self._answer_from_cache(message, user_id, session_id, context)
+        if cached is not None:
+            return {"response": cached["response"], "session_id": session_id, "cached": True}
+
+        plan, planned = None, []
+        async for event in self._planned_response(message, user_id, session_id, context):
+            if event["type"] == "plan":
+                plan = event["tasks"]
+            elif event["type"] == "text":
+                planned.append(event["text"])
+        if plan is not None:
+            return {
+                "response": "".join(planned) or "I'm sorry, I couldn't process that request.",
+                "session_id": session_id,
+                "cached": False,
+                "plan": plan,
+            }
 
         # Create the message content for the ADK.
         content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
 
         response_parts = []
+        answering_agent = None
         # The runner's run_async method is an async generator that yields events.
         async for event in self.runner.run_async(
             user_id=user_id, session_id=session_id, new_message=content
         ):
             # We collect the text from the content parts of each event.
             if event.content and event.content.parts:
-                response_parts.extend(
-                    part.text for part in event.content.parts if part.text
-                )
+                texts = [part.text for part in event.content.parts if part.text]
+                if texts:
+                    response_parts.extend(texts)
+                    answering_agent = event.author
 
+        await self._flush_session()
         full_response = "".join(response_parts)
+        self._store_answer(message, full_response, answering_agent, context)
         return {
             "response": full_response or "I'm sorry, I couldn't process that request.",
             "session_id": session_id,
+            "cached": False,
         }
+
+    async def stream_response(self, message: str, session_id: str | None = None):
+        """Yield chat events as the runner produces them.
+
+        Events are plain dicts with a `type` of `session`, `text` (a chunk of
+        the answer), `tool_call`, `tool_result`, `transfer` or `done`, so the
+        caller can forward them to the browser without waiting for the whole
+        agent tree to finish. In planner mode a multi-intent message yields
+        `plan`, one `task_done` per finished sub-agent, then the merged text.
+        """
+        with span("agent.response", "stream_response"):
+            async for event in self._stream_response(message, session_id):
+                yield event
+
+    async def _stream_response(self, message: str, session_id: str | None):
+        user_id, session_id = await self._ensure_session(session_id)
+        yield {"type": "session", "session_id": session_id}
+
+        context = await self._cache_context(user_id, session_id)
+        cached = await self._answer_from_cache(message, user_id, session_id, context)
+        if cached is not None:
+            yield {"type": "text", "agent": cached["agent"], "text": cached["response"], "cached": True}
+            yield {"type": "done", "session_id": session_id, "cached": True}
+            return
+
+        planned = False
+        async for event in self._planned_response(message, user_id, session_id, context, stream=True):
+            planned = True
+            yield event
+        if planned:
+            yield {"type": "done", "session_id": session_id, "cached": False}
+            return
+
+        content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
+        # In SSE mode the model's text arrives as partial chunks followed by one
+        # aggregated event repeating it; only the chunks are forwarded.
+        streamed_partial = False
+        answer_parts = []
+        answering_agent = None
+        async for event in self.runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+            run_config=run_config,
+        ):
+            if not event.partial:
+                for call in event.get_function_calls():
+                    if call.name != "transfer_to_agent":
+                        yield {
+                            "type": "tool_call",
+                            "agent": event.author,
+                            "name": call.name,
+                            "args": call.args,
+                        }
+                for response in event.get_function_responses():
+                    if response.name != "transfer_to_agent":
+                        yield {
+                            "type": "tool_result",
+                            "agent": event.author,
+                            "name": response.name,
+                        }
+                if event.actions and event.actions.transfer_to_agent:
+                    yield {
+                        "type": "transfer",
+                        "from": event.author,
+                        "agent": event.actions.transfer_to_agent,
+                    }
+
+            text = ""
+            if event.content and event.content.parts:
+                text = "".join(part.text for part in event.content.parts if part.text)
+            if not text:
+                continue
+            if event.partial:
+                streamed_partial = True
+                yield {"type": "text", "agent": event.author, "text": text}
+            elif streamed_partial:
+                streamed_partial = False
+            else:
+                yield {"type": "text", "agent": event.author, "text": text}
+            if not event.partial:
+                answer_parts.append(text)
+                answering_agent = event.author
+
+        await self._flush_session()
+        self._store_answer(message, "".join(answer_parts), answering_agent, context)
+        yield {"type": "done", "session_id": session_id, "cached": False}
@@ -0,0 +1,361 @@
+"""Opt-in cache of chat answers for repeated questions.
+
+Near-identical messages ("airport info for JFK", "tell me about the JFK
+airport") re-run the whole agent tree. `AnswerCache` keys answers on the
+message's intent and the entities that change the answer exactly: places
+(IATA codes in any case, city and airport names resolved through the
+airport index, other place names as written) and dates (ISO or relative
+ones such as "tomorrow", resolved to the calendar), plus the session's
+previous route and dates when the message leaves them out. The intent is
+the matching keyword rule of the intent router (or its classifier's top
+intent), without the router's agreement gate. Only the remaining wording,
+minus filler such as "tell me about", is matched by cosine similarity of
+word and character n-gram vectors, so messages naming different places or
+dates never share an answer. Entries expire according to the data behind them: flight prices
+quickly, airport details slowly.
+"""
+
+import os
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.airport_index import AirportIndex
+from smart_trip_agent.router import (
+    AIRPORT_AGENT,
+    FLIGHT_SEARCH_AGENT,
+    INSPIRATION_AGENT,
+    TRIP_PURPOSE_AGENT,
+    IntentRouter,
+    stem,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds an answer stays valid, per intent (mirrors the response cache TTLs).
+INTENT_TTLS = {
+    AIRPORT_AGENT: 7 * 24 * 3600,
+    TRIP_PURPOSE_AGENT: 24 * 3600,
+    INSPIRATION_AGENT: 6 * 3600,
+    FLIGHT_SEARCH_AGENT: 5 * 60,
+}
+
+DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+# Words after which an unresolved word is taken to be a place name.
+PLACE_PREPOSITIONS = {"from", "to", "in", "at", "near", "via", "into", "between", "about", "for", "of", "visit", "visiting"}
+# Words that are never taken as IATA codes or place names.
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "not", "no", "yes", "for", "from", "to", "in", "at",
+    "on", "of", "by", "via", "into", "near", "with", "about", "between", "me", "my", "i", "you",
+    "your", "we", "our", "us", "it", "its", "is", "are", "was", "be", "can", "could", "would",
+    "should", "will", "do", "does", "did", "how", "what", "which", "who", "why", "when", "where",
+    "there", "this", "that", "these", "those", "any", "all", "some", "one", "two", "get", "got",
+    "has", "had", "have", "her", "him", "his", "she", "too", "let", "say", "see", "use", "way",
+    "day", "days", "new", "now", "old", "out", "per", "off", "top", "low", "cheap", "cheapest",
+    "best", "fly", "flying", "flight", "flights", "go", "going", "travel", "trip", "trips",
+    "find", "search", "show", "tell", "give", "book", "booking", "want", "need", "like", "please",
+    "airport", "airports", "info", "information", "details", "city", "code", "purpose",
+    "business", "leisure", "inspire", "inspiration", "ideas", "destination", "destinations",
+    "ticket", "tickets", "fare", "fares", "price", "prices", "return", "returning", "leave",
+    "leaving", "depart", "departing", "week", "weekend", "month", "year", "next", "this",
+    "today", "tonight", "tomorrow", "visit", "visiting", "somewhere", "place", "places",
+    "round", "way", "nonstop", "direct", "economy", "class", "adult", "adults", "also",
+    *WEEKDAYS, *MONTHS,
+}
+
+# Wording that never changes the answer once intent, places and dates are
+# fixed ("tell me about", "please", "info for"); dropped before matching.
+FILLER_WORDS = {
+    "a", "an", "the", "and", "me", "my", "i", "you", "your", "we", "us", "our", "it", "is",
+    "are", "be", "can", "could", "would", "will", "do", "does", "please", "tell", "show",
+    "give", "find", "get", "search", "look", "up", "let", "know", "want", "need", "like",
+    "what", "which", "where", "about", "for", "of", "on", "at", "in", "from", "to", "some",
+    "any", "info", "information", "detail", "details", "trip", "travel", "there", "this",
+    "that", "with", "code",
+}
+
+
+def _relative_dates(words: List[str], today: date) -> Tuple[List[str], set]:
+    """Absolute dates (or weeks/months) for relative expressions in the lowercased
+    `words`, and the positions they used."""
+    dates, used = [], set()
+    for i, word in enumerate(words):
+        previous = words[i - 1] if i else ""
+        following = words[i + 1] if i + 1 < len(words) else ""
+        if word in ("today", "tonight"):
+            dates.append(today.isoformat())
+        elif word == "tomorrow":
+            dates.append((today + timedelta(days=1)).isoformat())
+        elif word in WEEKDAYS or word == "weekend":
+            weekday = WEEKDAYS.index(word) if word in WEEKDAYS else 5
+            ahead = (weekday - today.weekday()) % 7 or 7
+            if previous == "next":
+                ahead += 7
+            dates.append((today + timedelta(days=ahead)).isoformat())
+        elif word in ("week", "month", "year") and previous in ("this", "next"):
+            shift = 1 if previous == "next" else 0
+            if word == "week":
+                year, week, _ = (today + timedelta(weeks=shift)).isocalendar()
+                dates.append(f"{year}-W{week:02d}")
+            elif word == "month":
+                month = today.month + shift
+                dates.append(f"{today.year + (month - 1) // 12}-{(month - 1) % 12 + 1:02d}")
+            else:
+                dates.append(str(today.year + shift))
+        elif word in MONTHS:
+            month = MONTHS.index(word) + 1
+            year = today.year + (month < today.month)
+            if following.isdigit() and 1 <= int(following) <= 31:
+                dates.append(f"{year}-{month:02d}-{int(following):02d}")
+                used.add(i + 1)
+            else:
+                dates.append(f"{year}-{month:02d}")
+        elif word.isdigit() and following in ("day", "days", "week", "weeks") and previous == "in":
+            days = int(word) * (7 if following.startswith("week") else 1)
+            dates.append((today + timedelta(days=days)).isoformat())
+            used.add(i + 1)
+        else:
+            continue
+        used.add(i)
+    return dates, used
+
+
+def extract_entities(
+    message: str, airport_index: AirportIndex, today: Optional[date] = None
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], str]:
+    """`(places, dates, rest)` of `message`, case-insensitively.
+
+    Places are IATA codes, city and airport names resolved to codes through
+    `airport_index`, and unresolved words that follow a place preposition or
+    are capitalized ("to Berlin"), kept as `~word`. Dates include ISO dates,
+    relative dates resolved against `today` ("tomorrow", "next week", "May
+    3") and bare numbers. `rest` is the remaining wording, lowercased and
+    stemmed like the router's tokens, without `FILLER_WORDS`.
+    """
+    today = today or date.today()
+    dates = DATE_PATTERN.findall(message)
+    tokens = TOKEN_PATTERN.findall(DATE_PATTERN.sub(" ", message))
+    words = [token.lower() for token in tokens]
+    used = set()
+    places = []
+    for start, end, code in airport_index.find_places(tokens):
+        places.append(code)
+        used.update(range(start, end))
+    relative, relative_used = _relative_dates(words, today)
+    dates.extend(relative)
+    used |= relative_used
+    for i, (token, word) in enumerate(zip(tokens, words)):
+        if i in used:
+            continue
+        if word.isdigit():
+            dates.append(word)
+        elif len(word) == 3 and (token.isupper() or word.upper() in airport_index or word not in STOPWORDS):
+            places.append(word.upper())
+        elif word not in STOPWORDS and (
+            (i and words[i - 1] in PLACE_PREPOSITIONS) or (i and token[0].isupper())
+        ):
+            places.append(f"~{word}")
+        else:
+            continue
+        used.add(i)
+    rest = " ".join(
+        stem(word)
+        for i, word in enumerate(words)
+        if i not in used and not word.isdigit() and word not in FILLER_WORDS
+    )
+    return tuple(sorted(set(places))), tuple(sorted(set(dates))), rest
+
+
+def session_context(session) -> Dict[str, str]:
+    """Origin, destination and dates of the session's most recent tool call that had any."""
+    for event in reversed(getattr(session, "events", None) or []):
+        for call in reversed(event.get_function_calls()):
+            args = call.args or {}
+            context = {
+                name: str(args[key])
+                for name, key in (
+                    ("origin", "origin"),
+                    ("origin", "origin_airport_code"),
+                    ("destination", "destination"),
+                    ("destination", "airport_code"),
+                    ("departure_date", "departure_date"),
+                    ("return_date", "return_date"),
+                )
+                if args.get(key)
+            }
+            if context:
+                return context
+    return {}
+
+
+def embed(text: str) -> Tuple[Dict[str, float], float]:
+    """Sparse word + character trigram vector of `text` and its norm."""
+    words = text.split()
+    features = Counter(words)
+    padded = f" {text} "
+    features.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    return dict(features), norm
+
+
+def cosine(a: Tuple[Dict[str, float], float], b: Tuple[Dict[str, float], float]) -> float:
+    (va, na), (vb, nb) = a, b
+    if not na or not nb:
+        # Nothing left besides intent and entities on both sides: same question.
+        return 1.0 if not na and not nb else 0.0
+    if len(va) > len(vb):
+        va, vb = vb, va
+    return sum(weight * vb.get(feature, 0.0) for feature, weight in va.items()) / (na * nb)
+
+
+class AnswerCache:
+    """Similarity cache of `(answer, answering agent)` per intent and entities.
+
+    Only self-contained questions are cached: a follow-up such as "what about
+    the day after" depends on the conversation and is never served from cache.
+
+    Attributes:
+        threshold: Minimum cosine similarity for a hit.
+        max_entries: Entries kept across all keys (least recently used go first).
+        ttls: Seconds an answer stays valid, per intent.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 2048,
+        ttls: Optional[Dict[str, float]] = None,
+        router: Optional[IntentRouter] = None,
+        airport_index: Optional[AirportIndex] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttls = {**INTENT_TTLS, **(ttls or {})}
+        self.router = router or IntentRouter()
+        self.airport_index = airport_index if airport_index is not None else AirportIndex.load()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "uncacheable": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["AnswerCache"]:
+        """An `AnswerCache` if ANSWER_CACHE=true, configured by ANSWER_CACHE_THRESHOLD
+        and ANSWER_CACHE_MAX_ENTRIES; None otherwise."""
+        if os.getenv("ANSWER_CACHE", "false").lower() != "true":
+            return None
+        return cls(
+            threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.9")),
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2048")),
+        )
+
+    def intent(self, message: str, has_entities: bool) -> Optional[str]:
+        """Intent of `message` for keying, or None if it is not self-contained.
+
+        Unlike routing, no classifier agreement is needed: a single matching
+        keyword rule is the intent, and otherwise the classifier's top intent
+        (which must be among the matching rules, if several match). A message
+        with no rule match, place or date ("what about the day after") is a
+        follow-up and is not cached.
+        """
+        matched = self.router.matching_rules(message)
+        if len(matched) == 1:
+            return matched[0]
+        if not matched and not has_entities:
+            return None
+        probabilities = self.router.classifier.predict(message)
+        best = max(probabilities, key=probabilities.get)
+        return best if not matched or best in matched else None
+
+    def key(self, message: str, context: Optional[Dict[str, str]] = None) -> Tuple[Optional[Tuple], str]:
+        """`((intent, places, dates, context), rest)` for a self-contained
+        question, or `(None, rest)`.
+
+        Answers are only shared between messages with the same intent and
+        exactly the same places and dates. `context` (see `session_context`)
+        fills in what the message leaves out: the session's previous route
+        when it names no place, its previous dates when it names none.
+        """
+        places, dates, rest = extract_entities(message, self.airport_index)
+        intent = self.intent(message, places or dates)
+        if intent is None:
+            return None, rest
+        context = context or {}
+        relevant = []
+        if not places:
+            relevant += [(name, context[name]) for name in ("origin", "destination") if name in context]
+        if not dates:
+            relevant += [(name, context[name]) for name in ("departure_date", "return_date") if name in context]
+        return (intent, places, dates, tuple(relevant)), rest
+
+    def lookup(self, message: str, context: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """Return the cached `{"response", "agent"}` for `message`, or None."""
+        key, rest = self.key(message, context)
+        if key is None:
+            with self._lock:
+                self._stats["uncacheable"] += 1
+            return None
+        vector = embed(rest)
+        now = time.time()
+        with self._lock:
+            entries = self._entries.get(key, [])
+            live = [entry for entry in entries if entry["expires_at"] > now]
+            if len(live) != len(entries):
+                self._size -= len(entries) - len(live)
+                if live:
+                    self._entries[key] = live
+                else:
+                    self._entries.pop(key, None)
+            best, best_score = None, self.threshold
+            for entry in live:
+                score = cosine(vector, entry["vector"])
+                if score >= best_score:
+                    best, best_score = entry, score
+            if best is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return {"response": best["response"], "agent": best["agent"], "similarity": best_score}
+
+    def store(self, message: str, response: str, agent: str, context: Optional[Dict[str, str]] = None):
+        """Cache `response`; `context` is the session context the question was asked in."""
+        key, rest = self.key(message, context)
+        if key is None or not response:
+            return
+        entry = {
+            "vector": embed(rest),
+            "response": response,
+            "agent": agent,
+            "expires_at": time.time() + self.ttls.get(key[0], 0),
+        }
+        with self._lock:
+            self._entries.setdefault(key, []).append(entry)
+            self._entries.move_to_end(key)
+            self._size += 1
+            self._stats["stores"] += 1
+            while self._size > self.max_entries and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": self._size,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,15 @@
+"""Helpers for adding ADK agent callbacks without replacing existing ones."""
+
+from typing import Any, Callable, List
+
+
+def with_callback(existing: Any, callback: Callable) -> List[Callable]:
+    """`existing` callback(s) as a list with `callback` appended once.
+
+    ADK agents accept one callable or a list for each callback field and run
+    a list in order until one returns a value.
+    """
+    if existing is None:
+        return [callback]
+    callbacks = list(existing) if isinstance(existing, list) else [existing]
+    return callbacks if callback in callbacks else callbacks + [callback]
@@ -0,0 +1,199 @@
+"""Conversation history compaction for the model requests.
+
+Sessions keep the full event history, but every model call only needs the
+recent turns verbatim. `HistoryCompactor` is installed as a
+`before_model_callback` on every agent and rewrites the outgoing request:
+
+- only the last `max_turns` user turns are sent, older ones are dropped;
+- tool results from earlier turns (already answered by the model) are
+  replaced with a short summary, since formatter payloads are by far the
+  largest part of the history.
+
+It also records per-session token counts: an estimate of each request before
+and after compaction, and the prompt tokens the model reports back.
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from google.genai import types
+
+from smart_trip_agent.callbacks import with_callback
+from utils.compact_formatter import dumps, estimate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPACTED_NOTE = "Earlier tool result, compacted. Call the tool again for full details."
+
+
+def _content_tokens(contents: List[types.Content]) -> int:
+    return sum(
+        estimate_tokens(content.model_dump_json(exclude_none=True))
+        for content in contents
+    )
+
+
+def _is_user_turn(content: types.Content) -> bool:
+    """A user message (as opposed to function responses, which also use role=user)."""
+    return content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def summarize_tool_response(response: Dict[str, Any], max_chars: int = 300) -> Dict[str, Any]:
+    """Compact stand-in for a tool result the model has already used."""
+    texts = [
+        block.get("text", "")
+        for block in response.get("content", [])
+        if isinstance(block, dict)
+    ]
+    text = "\n".join(texts) if texts else json.dumps(response, default=str)
+    try:
+        # Formatter output is JSON; minify it before truncating.
+        text = dumps(json.loads(text))
+    except ValueError:
+        pass
+    summary = {"compacted": True, "note": COMPACTED_NOTE, "summary": text[:max_chars]}
+    if len(text) > max_chars:
+        summary["omitted_chars"] = len(text) - max_chars
+    return summary
+
+
+class HistoryCompactor:
+    """`before_model_callback` / `after_model_callback` pair bounding request size.
+
+    Attributes:
+        max_turns: Number of most recent user turns sent to the model.
+        summary_chars: Characters kept from each compacted tool result.
+        max_tracked_sessions: Sessions whose token counts are kept.
+    """
+
+    def __init__(self, max_turns: int = 6, summary_chars: int = 300, max_tracked_sessions: int = 1024):
+        self.max_turns = max_turns
+        self.summary_chars = summary_chars
+        self.max_tracked_sessions = max_tracked_sessions
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "HistoryCompactor":
+        """Build from HISTORY_MAX_TURNS and HISTORY_SUMMARY_CHARS."""
+        return cls(
+            max_turns=int(os.getenv("HISTORY_MAX_TURNS", "6")),
+            summary_chars=int(os.getenv("HISTORY_SUMMARY_CHARS", "300")),
+        )
+
+    def compact(self, contents: List[types.Content]) -> List[types.Content]:
+        """Return the request contents with old turns dropped and old tool results summarized."""
+        turn_starts = [i for i, content in enumerate(contents) if _is_user_turn(content)]
+        if not turn_starts:
+            return contents
+        if self.max_turns and len(turn_starts) > self.max_turns:
+            start = turn_starts[-self.max_turns]
+            contents = contents[start:]
+            turn_starts = [i - start for i in turn_starts if i >= start]
+
+        # Results from before the current turn have been answered already.
+        current_turn = turn_starts[-1]
+        compacted = []
+        for i, content in enumerate(contents):
+            parts = content.parts or []
+            if i >= current_turn or not any(part.function_response for part in parts):
+                compacted.append(content)
+                continue
+            new_parts = []
+            for part in parts:
+                response = part.function_response
+                if response is None or (response.response or {}).get("compacted"):
+                    new_parts.append(part)
+                    continue
+                new_parts.append(
+                    types.Part(
+                        function_response=types.FunctionResponse(
+                            id=response.id,
+                            name=response.name,
+                            response=summarize_tool_response(
+                                response.response or {}, self.summary_chars
+                            ),
+                        )
+                    )
+                )
+            compacted.append(types.Content(role=content.role, parts=new_parts))
+        return compacted
+
+    def _session_stats(self, session_id: str) -> Dict[str, Any]:
+        stats = self._sessions.get(session_id)
+        if stats is None:
+            stats = self._sessions[session_id] = {
+                "model_calls": 0,
+                "estimated_tokens_before": 0,
+                "estimated_tokens_after": 0,
+                "last_request_tokens": 0,
+                "prompt_tokens": 0,
+                "last_prompt_tokens": None,
+            }
+            while len(self._sessions) > self.max_tracked_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        return stats
+
+    def before_model(self, callback_context, llm_request) -> None:
+        before = _content_tokens(llm_request.contents)
+        llm_request.contents = self.compact(llm_request.contents)
+        after = _content_tokens(llm_request.contents)
+        session_id = callback_context.session.id
+        with self._lock:
+            stats = self._session_stats(session_id)
+            stats["model_calls"] += 1
+            stats["estimated_tokens_before"] += before
+            stats["estimated_tokens_after"] += after
+            stats["last_request_tokens"] = after
+        if after < before:
+            logger.info(
+                f"Compacted history for {callback_context.agent_name}: ~{before} -> ~{after} tokens"
+            )
+        return None
+
+    def after_model(self, callback_context, llm_response) -> None:
+        usage = llm_response.usage_metadata
+        if usage is None or usage.prompt_token_count is None:
+            return None
+        session_id = callback_context.session.id
+        with self._lock:
+            stats = self._session_stats(session_id)
+            stats["prompt_tokens"] += usage.prompt_token_count
+            stats["last_prompt_tokens"] = usage.prompt_token_count
+        return None
+
+    def stats(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Token counts for `session_id`, or None if it made no model calls here."""
+        with self._lock:
+            stats = self._sessions.get(session_id)
+            if stats is None:
+                return None
+            before = stats["estimated_tokens_before"]
+            return {
+                **stats,
+                "estimated_savings": (
+                    1 - stats["estimated_tokens_after"] / before if before else 0.0
+                ),
+            }
+
+
+def install_history_compactor(agent, compactor: HistoryCompactor):
+    """Add the compactor callbacks to `agent` and every LLM agent below it."""
+    if hasattr(agent, "before_model_callback"):
+        agent.before_model_callback = with_callback(
+            agent.before_model_callback, compactor.before_model
+        )
+        agent.after_model_callback = with_callback(
+            agent.after_model_callback, compactor.after_model
+        )
+    for tool in getattr(agent, "tools", []) or []:
+        if hasattr(tool, "agent"):
+            install_history_compactor(tool.agent, compactor)
+    for sub_agent in agent.sub_agents:
+        install_history_compactor(sub_agent, compactor)
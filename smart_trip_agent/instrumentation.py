@@ -0,0 +1,103 @@
+"""Agent, model and token metrics collected from ADK callbacks.
+
+`AgentInstrumentation` is installed on the root agent and every sub-agent.
+Its callbacks time each agent run (`agent.run`, which for a sub-agent starts
+at the transfer) and each model request (`llm.call`) into the span
+histogram of `utils.telemetry`, count transfers per sub-agent, and add the
+token usage the model reports to `smart_trip_llm_tokens_total`.
+
+The callbacks are appended after any existing ones, so a model call answered
+by the intent router's `before_model_callback` is not timed as an LLM call.
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from smart_trip_agent.callbacks import with_callback
+from utils.telemetry import AGENT_TRANSFERS, LLM_TOKENS, record_span
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AgentInstrumentation:
+    """ADK callbacks recording agent/model latencies, transfers and token usage.
+
+    Attributes:
+        root_agent_name: Runs of any other agent count as transfers.
+        max_pending: Started timers kept at most (runs that never finish,
+            e.g. cancelled ones, are dropped oldest first).
+    """
+
+    def __init__(self, root_agent_name: str, max_pending: int = 4096):
+        self.root_agent_name = root_agent_name
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._started: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+
+    def _start(self, kind: str, callback_context):
+        key = (kind, callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            self._started[key] = time.perf_counter()
+            while len(self._started) > self.max_pending:
+                self._started.popitem(last=False)
+
+    def _stop(self, kind: str, callback_context):
+        key = (kind, callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            started = self._started.pop(key, None)
+        if started is not None:
+            record_span(kind, callback_context.agent_name, time.perf_counter() - started)
+
+    def before_agent(self, callback_context) -> None:
+        if callback_context.agent_name != self.root_agent_name:
+            AGENT_TRANSFERS.inc(agent=callback_context.agent_name)
+        self._start("agent.run", callback_context)
+
+    def after_agent(self, callback_context) -> None:
+        self._stop("agent.run", callback_context)
+
+    def before_model(self, callback_context, llm_request) -> None:
+        self._start("llm.call", callback_context)
+
+    def after_model(self, callback_context, llm_response) -> None:
+        # In SSE mode partial chunks come first; the final response carries usage.
+        if llm_response.partial:
+            return
+        self._stop("llm.call", callback_context)
+        usage = llm_response.usage_metadata
+        if usage is None:
+            return
+        agent = callback_context.agent_name
+        for kind, count in (
+            ("prompt", usage.prompt_token_count),
+            ("completion", usage.candidates_token_count),
+            ("cached", usage.cached_content_token_count),
+        ):
+            if count:
+                LLM_TOKENS.inc(count, agent=agent, kind=kind)
+
+
+def install_instrumentation(agent, instrumentation: AgentInstrumentation):
+    """Add the instrumentation callbacks to `agent` and every agent below it."""
+    agent.before_agent_callback = with_callback(
+        agent.before_agent_callback, instrumentation.before_agent
+    )
+    agent.after_agent_callback = with_callback(
+        agent.after_agent_callback, instrumentation.after_agent
+    )
+    if hasattr(agent, "before_model_callback"):
+        agent.before_model_callback = with_callback(
+            agent.before_model_callback, instrumentation.before_model
+        )
+        agent.after_model_callback = with_callback(
+            agent.after_model_callback, instrumentation.after_model
+        )
+    for tool in getattr(agent, "tools", []) or []:
+        if hasattr(tool, "agent"):
+            install_instrumentation(tool.agent, instrumentation)
+    for sub_agent in agent.sub_agents:
+        install_instrumentation(sub_agent, instrumentation)
@@ -0,0 +1,236 @@
+"""Parallel planner mode for multi-intent requests.
+
+With the root agent, "inspire me from MAD in May, then find flights MAD-LIS
+on 2026-05-02 and tell me the airport in Lisbon" is handled one transfer at a
+time, so the latency is the sum of every sub-agent's run. `ParallelPlanner`
+instead:
+
+1. splits the message into clauses and classifies each one with the
+   `IntentRouter` (no model call); with fewer than two distinct sub-agents
+   the request goes to the root agent as usual;
+2. runs one clone of each involved sub-agent concurrently, each in its own
+   throwaway session, asked to handle only its part of the request. Parts
+   that refer back to another part's results ("flights there") wait for the
+   independent ones and get their answers as context;
+3. merges the answers in one synthesis model call.
+
+End-to-end latency is then roughly the slowest branch (per stage) plus the
+synthesis call.
+"""
+
+import os
+import re
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from smart_trip_agent import prompt
+from smart_trip_agent.router import IntentRouter
+from utils.telemetry import span
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+APP_NAME = "smart-trip-planner-branches"
+
+# Clause boundaries: sentence ends, semicolons and coordinating "and"/"then".
+CLAUSE_SPLIT = re.compile(
+    r"\s*(?:[;!?]|\.(?=\s)|,?\s+(?:and\s+then|and\s+also|then|also|plus|and)\b)\s*",
+    re.IGNORECASE,
+)
+# A clause using another part's results cannot start before that part ends.
+DEPENDENT_CLAUSE = re.compile(
+    r"\b(there|those|these|them|th(at|e same|e chosen|e cheapest|e best) "
+    r"(one|destination|place|city|flight|trip)s?)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class PlannedTask:
+    """One sub-agent's share of a request."""
+
+    agent: str
+    request: str
+    dependent: bool = False
+
+
+def _text(event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text)
+
+
+class ParallelPlanner:
+    """Splits multi-intent requests and runs the sub-agents concurrently.
+
+    Attributes:
+        router: Classifies each clause of a message to a sub-agent.
+        max_tasks: Requests splitting into more parts go to the root agent.
+        synthesizer: Model-only agent merging the branch answers.
+    """
+
+    def __init__(self, sub_agents: List[Any], router: IntentRouter, max_tasks: int = 4):
+        self.router = router
+        self.max_tasks = max_tasks
+        self.session_service = InMemorySessionService()
+        # Clones run without a parent, so a branch can't transfer away from its part.
+        self._runners: Dict[str, Runner] = {
+            agent.name: Runner(
+                agent=agent.clone(
+                    update={"disallow_transfer_to_parent": True, "disallow_transfer_to_peers": True}
+                ),
+                app_name=APP_NAME,
+                session_service=self.session_service,
+            )
+            for agent in sub_agents
+        }
+        self.synthesizer = LlmAgent(
+            model="gemini-2.5-flash",
+            name="trip_planner_synthesizer",
+            instruction=prompt.PLANNER_SYNTHESIS_PROMPT_V1,
+        )
+        self._synthesis_runner = Runner(
+            agent=self.synthesizer, app_name=APP_NAME, session_service=self.session_service
+        )
+
+    @classmethod
+    def from_env(cls, root_agent, router: Optional[IntentRouter] = None) -> Optional["ParallelPlanner"]:
+        """A planner over `root_agent`'s sub-agents if PLANNER=true, else None."""
+        if os.getenv("PLANNER", "false").lower() != "true":
+            return None
+        return cls(
+            root_agent.sub_agents,
+            router or IntentRouter.from_env(),
+            max_tasks=int(os.getenv("PLANNER_MAX_TASKS", "4")),
+        )
+
+    def plan(self, message: str) -> List[PlannedTask]:
+        """Sub-tasks of `message`, or [] when it is not a multi-intent request."""
+        tasks: List[PlannedTask] = []
+        leading = []
+        for clause in CLAUSE_SPLIT.split(message or ""):
+            clause = clause.strip()
+            if not clause:
+                continue
+            agent, _ = self.router.classify(clause)
+            if agent is None or agent not in self._runners:
+                # Unclassified clauses ("in May", "from MAD") belong to their neighbour.
+                if tasks:
+                    tasks[-1].request = f"{tasks[-1].request} and {clause}"
+                else:
+                    leading.append(clause)
+                continue
+            same_agent = [task for task in tasks if task.agent == agent]
+            if same_agent:
+                # References inside one agent's part ("flights there too") stay local.
+                same_agent[0].request = f"{same_agent[0].request} and {clause}"
+                continue
+            dependent = bool(tasks) and bool(DEPENDENT_CLAUSE.search(clause))
+            if leading:
+                clause = " ".join(leading + [clause])
+                leading = []
+            tasks.append(PlannedTask(agent, clause, dependent))
+        if len(tasks) < 2 or len(tasks) > self.max_tasks:
+            return []
+        if all(task.dependent for task in tasks[1:]):
+            # Nothing would run concurrently; the root agent handles chains as well.
+            return []
+        return tasks
+
+    def _branch_message(self, message: str, task: PlannedTask, history: str, context: str) -> str:
+        parts = []
+        if history:
+            parts.append(f"Conversation so far:\n{history}")
+        parts.append(f"The user's full request: {message}")
+        parts.append(f"Handle only this part of it: {task.request}")
+        if context:
+            parts.append(f"Results of the other parts:\n{context}")
+        parts.append(
+            "Other agents handle the remaining parts. Use your tools and make reasonable "
+            "assumptions rather than asking follow-up questions."
+        )
+        return "\n\n".join(parts)
+
+    async def _run(self, runner: Runner, text: str, run_config: Optional[RunConfig] = None) -> AsyncIterator[Any]:
+        """Run `runner` on `text` in a throwaway session and yield its events."""
+        session = await self.session_service.create_session(
+            app_name=APP_NAME, user_id="planner", session_id=str(uuid.uuid4())
+        )
+        try:
+            async for event in runner.run_async(
+                user_id="planner",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part.from_text(text=text)]),
+                run_config=run_config,
+            ):
+                yield event
+        finally:
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id="planner", session_id=session.id
+            )
+
+    async def _run_task(self, index: int, task: PlannedTask, text: str) -> Tuple[int, str, bool]:
+        try:
+            with span("planner.task", task.agent):
+                answer = []
+                async for event in self._run(self._runners[task.agent], text):
+                    if not event.partial:
+                        answer.append(_text(event))
+            return index, "".join(answer) or "(no answer)", True
+        except Exception as e:
+            logger.error(f"Planner task for {task.agent} failed: {e}")
+            return index, f"Failed: {e}", False
+
+    async def run(self, message: str, tasks: List[PlannedTask], history: str = "", stream: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Run `tasks` and yield `task_done` events, then the synthesized `text`."""
+        answers: Dict[int, str] = {}
+        stages = [
+            [i for i, task in enumerate(tasks) if not task.dependent],
+            [i for i, task in enumerate(tasks) if task.dependent],
+        ]
+        for stage in stages:
+            if not stage:
+                continue
+            context = "\n".join(f"- {tasks[i].agent}: {answers[i]}" for i in sorted(answers))
+            pending = [
+                asyncio.create_task(
+                    self._run_task(i, tasks[i], self._branch_message(message, tasks[i], history, context))
+                )
+                for i in stage
+            ]
+            try:
+                for finished in asyncio.as_completed(pending):
+                    index, answer, ok = await finished
+                    answers[index] = answer
+                    yield {"type": "task_done", "agent": tasks[index].agent, "ok": ok}
+            finally:
+                for task in pending:
+                    task.cancel()
+
+        synthesis = "\n\n".join(
+            [f"User request: {message}"]
+            + [f"Answer of {tasks[i].agent} (part: {tasks[i].request}):\n{answers[i]}" for i in range(len(tasks))]
+        )
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE) if stream else None
+        streamed_partial = False
+        with span("planner.synthesis", self.synthesizer.name):
+            async for event in self._run(self._synthesis_runner, synthesis, run_config):
+                text = _text(event)
+                if not text:
+                    continue
+                if event.partial:
+                    streamed_partial = True
+                    yield {"type": "text", "text": text, "partial": True}
+                elif not streamed_partial:
+                    yield {"type": "text", "text": text, "partial": False}
+                else:
+                    streamed_partial = False
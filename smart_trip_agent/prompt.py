@@ -12,4 +12,11 @@ ROOT_AGENT_PROMPT_V1 = """
 - If the user asks about airports, transfer to the agent `airport_agent`
 - If the user asks to search or book flights or trip, transfer to the agent `flight_search_agent`
 - Please use the context info below for any user preferences
-"""
\ No newline at end of file
+"""
+PLANNER_SYNTHESIS_PROMPT_V1 = """
+- You write the final answer of a travel planner that handled the parts of one user request in parallel
+- You receive the user's request and the answer of each specialist agent to its part
+- Merge them into one short, well organized answer that follows the order of the user's request
+- Keep concrete details (airports, dates, prices, airlines, trip purpose) exactly as the agents gave them; never invent new ones
+- If a part failed or an agent needs more information, say so briefly and ask the user for it
+"""
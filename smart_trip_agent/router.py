@@ -0,0 +1,293 @@
+"""Deterministic intent router for the root agent.
+
+The root agent's model call only decides which sub-agent handles the
+message. `IntentRouter` makes that decision locally when it is confident:
+it runs as the root agent's `before_model_callback` and answers with a
+`transfer_to_agent` function call, so ADK transfers straight away without
+calling the model. Unclear messages fall through to the LLM router.
+
+Confidence comes from two signals: the keyword rules of
+`ROOT_AGENT_PROMPT_V1`, and a small naive Bayes classifier trained on
+example requests, with the sub-agent that handled the previous turn as a
+prior for follow-up messages. A keyword match only routes when the
+classifier agrees on the same sub-agent. The router is opt-in
+(INTENT_ROUTER=true).
+"""
+
+import os
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AIRPORT_AGENT = "airport_agent"
+FLIGHT_SEARCH_AGENT = "flight_search_agent"
+INSPIRATION_AGENT = "inspiration_agent"
+TRIP_PURPOSE_AGENT = "trip_purpose_agent"
+
+# Keyword rules from ROOT_AGENT_PROMPT_V1, in the prompt's order.
+RULES: List[Tuple[str, re.Pattern]] = [
+    (
+        TRIP_PURPOSE_AGENT,
+        re.compile(r"\b(purpose|business or leisure|leisure or business|business trip)\b"),
+    ),
+    (
+        INSPIRATION_AGENT,
+        re.compile(
+            r"\b(inspir\w*|ideas?|suggest\w*|recommend\w* (a )?destinations?|"
+            r"where (should|can|could) i (go|travel)|things to do|what to do|"
+            r"vacation ideas|holiday ideas|cheapest destinations?)\b"
+        ),
+    ),
+    (AIRPORT_AGENT, re.compile(r"\b(airports?|terminal|iata code)\b")),
+    (
+        FLIGHT_SEARCH_AGENT,
+        re.compile(r"\b(flights?|fly|flying|book\w*|tickets?|fares?|one[- ]way|round[- ]trip)\b"),
+    ),
+]
+
+TRAINING_EXAMPLES: Dict[str, List[str]] = {
+    AIRPORT_AGENT: [
+        "tell me about the airport JFK",
+        "what airport is LHR",
+        "which city is the airport CDG in",
+        "information about Madrid airport",
+        "what is the IATA code for Lisbon airport",
+        "where is OPO airport located",
+        "details of the airport in Nice",
+    ],
+    FLIGHT_SEARCH_AGENT: [
+        "search flights from MAD to JFK on 2026-03-01",
+        "find me a flight from London to Paris next week",
+        "book a round trip from BCN to LIS",
+        "cheapest flights to New York in march",
+        "I want to fly from Madrid to Rome on friday",
+        "show me one way tickets from NYC to LAX",
+        "flights departing tomorrow returning sunday",
+        "what about the day after",
+    ],
+    INSPIRATION_AGENT: [
+        "inspire me for a trip from MAD",
+        "inspiration from MAD",
+        "travel inspiration from Barcelona",
+        "inspiration for a city break from Madrid",
+        "give me some inspiration for my next holiday",
+        "holiday ideas from London",
+        "suggestions for where I could travel",
+        "where should I go on vacation",
+        "suggest some destinations from Paris",
+        "ideas for a weekend getaway",
+        "what are things to do in Lisbon",
+        "recommend a place to visit in summer",
+        "cheapest destinations from Barcelona",
+        "I want to discover somewhere new",
+    ],
+    TRIP_PURPOSE_AGENT: [
+        "what is the trip purpose for MAD to NYC",
+        "is this trip business or leisure",
+        "predict the purpose of travel from LON to PAR",
+        "purpose of my trip to Rome from 2026-03-01 to 2026-03-05",
+        "would this be a business trip",
+        "what kind of trip is Madrid to Berlin",
+    ],
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+
+# Word families the keyword rules match by prefix (`inspir\w*`, `suggest\w*`),
+# folded to one token so every form counts as the same evidence.
+STEMS = ("inspir", "suggest", "recommend")
+
+
+def stem(token: str) -> str:
+    for prefix in STEMS:
+        if token.startswith(prefix):
+            return prefix
+    return token.rstrip("s") if len(token) > 3 else token
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes over message words with add-one smoothing."""
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        self.labels = list(examples)
+        self.word_counts = {label: Counter() for label in self.labels}
+        for label, texts in examples.items():
+            for text in texts:
+                self.word_counts[label].update(tokenize(text))
+        self.vocabulary = set().union(*self.word_counts.values())
+        self.totals = {label: sum(counts.values()) for label, counts in self.word_counts.items()}
+
+    def predict(self, text: str, prior: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Return label probabilities; words never seen in training are ignored."""
+        tokens = [token for token in tokenize(text) if token in self.vocabulary]
+        scores = {}
+        for label in self.labels:
+            denominator = self.totals[label] + len(self.vocabulary)
+            score = math.log((prior or {}).get(label, 1.0 / len(self.labels)))
+            for token in tokens:
+                score += math.log((self.word_counts[label][token] + 1) / denominator)
+            scores[label] = score
+        top = max(scores.values())
+        exp = {label: math.exp(score - top) for label, score in scores.items()}
+        norm = sum(exp.values())
+        return {label: value / norm for label, value in exp.items()}
+
+
+class IntentRouter:
+    """Routes confident messages to a sub-agent without the routing model call.
+
+    Attributes:
+        threshold: Minimum classifier probability to route without a rule match,
+            or to pick between several matching rules.
+        agreement: Minimum classifier probability for the intent of a single
+            matching rule, which must also be the classifier's top intent.
+        followup_prior: Prior weight given to the agent of the previous turn.
+    """
+
+    def __init__(self, threshold: float = 0.85, agreement: float = 0.6, followup_prior: float = 0.5):
+        self.threshold = threshold
+        self.agreement = agreement
+        self.followup_prior = followup_prior
+        self.classifier = NaiveBayesClassifier(TRAINING_EXAMPLES)
+        self._lock = threading.Lock()
+        self._llm_started: Dict[str, float] = {}
+        self._stats = {
+            "routed": Counter(),
+            "fallbacks": 0,
+            "router_time_s": 0.0,
+            "llm_route_calls": 0,
+            "llm_route_time_s": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "IntentRouter":
+        return cls(
+            threshold=float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.85")),
+            agreement=float(os.getenv("INTENT_ROUTER_AGREEMENT", "0.6")),
+        )
+
+    @staticmethod
+    def matching_rules(message: str) -> List[str]:
+        """Sub-agents whose keyword rule matches `message`, in rule order."""
+        lowered = message.lower()
+        return [agent for agent, pattern in RULES if pattern.search(lowered)]
+
+    def classify(self, message: str, previous_agent: Optional[str] = None) -> Tuple[Optional[str], float]:
+        """Return `(agent name, confidence)`, or `(None, confidence)` to fall back."""
+        matched = self.matching_rules(message)
+        prior = None
+        if previous_agent in self.classifier.labels:
+            others = (1 - self.followup_prior) / (len(self.classifier.labels) - 1)
+            prior = {label: others for label in self.classifier.labels}
+            prior[previous_agent] = self.followup_prior
+        probabilities = self.classifier.predict(message, prior)
+        best = max(probabilities, key=probabilities.get)
+
+        if len(matched) == 1:
+            agent = matched[0]
+            confident = best == agent and probabilities[agent] >= self.agreement
+            return (agent if confident else None), probabilities[agent]
+        if len(matched) > 1 and best not in matched:
+            return None, probabilities[best]
+        confident = probabilities[best] >= self.threshold
+        return (best if confident else None), probabilities[best]
+
+    @staticmethod
+    def _user_message(llm_request) -> Optional[str]:
+        """Text of the request's last content if it is a fresh user message."""
+        if not llm_request.contents:
+            return None
+        last = llm_request.contents[-1]
+        if last.role != "user":
+            return None
+        texts = [part.text for part in last.parts or [] if part.text]
+        if not texts or any(part.function_response for part in last.parts or []):
+            return None
+        return " ".join(texts)
+
+    @staticmethod
+    def _previous_agent(callback_context) -> Optional[str]:
+        session = callback_context.session
+        for event in reversed(session.events):
+            if event.author not in ("user", callback_context.agent_name):
+                return event.author
+        return None
+
+    def before_model(self, callback_context, llm_request) -> Optional[LlmResponse]:
+        message = self._user_message(llm_request)
+        if message is None or "transfer_to_agent" not in llm_request.tools_dict:
+            return None
+        started = time.perf_counter()
+        agent, confidence = self.classify(message, self._previous_agent(callback_context))
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["router_time_s"] += elapsed
+            if agent is None:
+                self._stats["fallbacks"] += 1
+                self._llm_started[callback_context.invocation_id] = time.perf_counter()
+            else:
+                self._stats["routed"][agent] += 1
+        if agent is None:
+            logger.info(f"Intent router fell back to the LLM (confidence {confidence:.2f})")
+            return None
+        logger.info(f"Intent router sent message to {agent} (confidence {confidence:.2f})")
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[
+                    types.Part.from_function_call(
+                        name="transfer_to_agent", args={"agent_name": agent}
+                    )
+                ],
+            )
+        )
+
+    def after_model(self, callback_context, llm_response) -> None:
+        """Time the LLM routing calls the router fell back to."""
+        if llm_response.partial:
+            return None
+        with self._lock:
+            started = self._llm_started.pop(callback_context.invocation_id, None)
+            if started is not None:
+                self._stats["llm_route_calls"] += 1
+                self._stats["llm_route_time_s"] += time.perf_counter() - started
+        return None
+
+    def stats(self) -> dict:
+        """Hit/fallback counts and the latency saved by skipping routing calls."""
+        with self._lock:
+            routed = sum(self._stats["routed"].values())
+            decisions = routed + self._stats["fallbacks"]
+            llm_calls = self._stats["llm_route_calls"]
+            avg_llm_ms = (
+                self._stats["llm_route_time_s"] / llm_calls * 1000 if llm_calls else None
+            )
+            avg_router_ms = (
+                self._stats["router_time_s"] / decisions * 1000 if decisions else 0.0
+            )
+            return {
+                "routed": routed,
+                "routed_by_agent": dict(self._stats["routed"]),
+                "fallbacks": self._stats["fallbacks"],
+                "hit_rate": routed / decisions if decisions else 0.0,
+                "avg_router_ms": avg_router_ms,
+                "avg_llm_route_ms": avg_llm_ms,
+                "estimated_saved_ms": (
+                    routed * (avg_llm_ms - avg_router_ms) if avg_llm_ms is not None else None
+                ),
+            }
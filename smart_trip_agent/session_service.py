@@ -0,0 +1,420 @@
+"""Session storage for `SmartTripAgent`.
+
+`build_session_service()` picks the backend from SESSION_BACKEND:
+`memory` keeps ADK's `InMemorySessionService`, `sqlite` (the default) uses
+`SQLiteSessionService`, which keeps conversations across restarts and lets
+several chatbot workers share them.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEMP_PREFIX = "temp:"
+
+SessionKey = Tuple[str, str, str]
+
+
+def _persisted_state(state: Dict[str, Any]) -> str:
+    return json.dumps(
+        {key: value for key, value in state.items() if not key.startswith(TEMP_PREFIX)}
+    )
+
+
+class SQLiteSessionService(BaseSessionService):
+    """SQLite-backed ADK session service with an LRU of live sessions.
+
+    - Write-behind: appended events and state changes are queued and written
+      in one transaction per batch, either every `flush_interval` seconds,
+      once `flush_batch_size` events are pending, or on `flush()` (which
+      `SmartTripAgent` calls at the end of each turn).
+    - At most `max_cached_sessions` sessions are kept in memory; the least
+      recently used one is dropped and rehydrated from SQLite on next access.
+    - Sessions idle for longer than `ttl_seconds` expire and are purged.
+
+    Each session's state (minus `temp:` keys) is stored with the session, so
+    `app:` / `user:` keys are not shared between sessions. A cached session is
+    re-read when another worker has updated it since it was cached.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_cached_sessions: int = 256,
+        ttl_seconds: float = 7 * 24 * 3600,
+        flush_interval: float = 0.5,
+        flush_batch_size: int = 64,
+        purge_interval: float = 300.0,
+    ):
+        self.path = path
+        self.max_cached_sessions = max_cached_sessions
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self.purge_interval = purge_interval
+        self._cache: "OrderedDict[SessionKey, Session]" = OrderedDict()
+        self._pending_sessions: Dict[SessionKey, Tuple[str, float]] = {}
+        self._pending_events: List[Tuple[str, str, str, str, float, str]] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_wakeup: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_purge = 0.0
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "app_name TEXT NOT NULL, user_id TEXT NOT NULL, id TEXT NOT NULL, "
+            "state TEXT NOT NULL, last_update_time REAL NOT NULL, "
+            "PRIMARY KEY (app_name, user_id, id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, app_name TEXT NOT NULL, "
+            "user_id TEXT NOT NULL, session_id TEXT NOT NULL, "
+            "event_id TEXT NOT NULL, timestamp REAL NOT NULL, event TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS events_by_session "
+            "ON events (app_name, user_id, session_id, seq)"
+        )
+        self._conn.commit()
+        self._stats = {
+            "cache_hits": 0,
+            "rehydrations": 0,
+            "evictions": 0,
+            "expired": 0,
+            "flushes": 0,
+            "events_written": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "SQLiteSessionService":
+        """Build from SESSION_DB_PATH, SESSION_MAX_CACHED, SESSION_TTL_SECONDS
+        and SESSION_FLUSH_INTERVAL."""
+        return cls(
+            path=os.getenv("SESSION_DB_PATH", "smart_trip_sessions.sqlite3"),
+            max_cached_sessions=int(os.getenv("SESSION_MAX_CACHED", "256")),
+            ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600))),
+            flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "0.5")),
+        )
+
+    # -- SQLite access (run off the event loop) --------------------------------
+
+    def _read_session(self, key: SessionKey) -> Optional[Session]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT state, last_update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            events = self._conn.execute(
+                "SELECT event FROM events WHERE app_name = ? AND user_id = ? "
+                "AND session_id = ? ORDER BY seq",
+                key,
+            ).fetchall()
+        app_name, user_id, session_id = key
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=json.loads(row[0]),
+            events=[Event.model_validate_json(event) for (event,) in events],
+            last_update_time=row[1],
+        )
+
+    def _read_last_update(self, key: SessionKey) -> Optional[float]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT last_update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                key,
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write_batch(self, sessions: Dict[SessionKey, Tuple[str, float]], events: list):
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (app_name, user_id, id) DO UPDATE SET "
+                "state = excluded.state, last_update_time = excluded.last_update_time",
+                [(*key, state, updated) for key, (state, updated) in sessions.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO events (app_name, user_id, session_id, event_id, timestamp, event) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                events,
+            )
+            self._conn.commit()
+
+    def _delete(self, key: SessionKey):
+        with self._db_lock:
+            self._conn.execute(
+                "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key,
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+            )
+            self._conn.commit()
+
+    def _purge_expired(self, cutoff: float) -> int:
+        with self._db_lock:
+            self._conn.execute(
+                "DELETE FROM events WHERE (app_name, user_id, session_id) IN ("
+                "SELECT app_name, user_id, id FROM sessions WHERE last_update_time < ?)",
+                (cutoff,),
+            )
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE last_update_time < ?", (cutoff,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _list(self, app_name: str, user_id: Optional[str]) -> list:
+        query = "SELECT user_id, id, last_update_time FROM sessions WHERE app_name = ?"
+        params: list = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        with self._db_lock:
+            return self._conn.execute(
+                query + " ORDER BY last_update_time", params
+            ).fetchall()
+
+    # -- In-memory LRU ------------------------------------------------------------
+
+    def _remember(self, key: SessionKey, session: Session):
+        self._cache[key] = session
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_cached_sessions:
+            # Evicted sessions are rehydrated on demand; queued writes for
+            # them stay in the write-behind queue until the next flush.
+            self._cache.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _expired(self, last_update_time: float) -> bool:
+        return time.time() - last_update_time > self.ttl_seconds
+
+    # -- Write-behind -------------------------------------------------------------
+
+    def _ensure_flusher(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_lock = asyncio.Lock()
+            self._flush_wakeup = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            try:
+                await self.flush()
+                if time.time() - self._last_purge > self.purge_interval:
+                    await self.purge_expired()
+            except Exception as e:
+                logger.error(f"Session write-behind flush failed: {e}")
+
+    def _queue(self, key: SessionKey, session: Session, event: Optional[Event] = None):
+        self._pending_sessions[key] = (
+            _persisted_state(session.state),
+            session.last_update_time,
+        )
+        if event is not None:
+            self._pending_events.append(
+                (*key, event.id, event.timestamp, event.model_dump_json(exclude_none=True))
+            )
+        self._ensure_flusher()
+        if len(self._pending_events) >= self.flush_batch_size:
+            self._flush_wakeup.set()
+
+    async def flush(self) -> None:
+        """Write every queued session update and event to SQLite."""
+        if not self._pending_sessions and not self._pending_events:
+            return
+        self._ensure_flusher()
+        async with self._flush_lock:
+            sessions, self._pending_sessions = self._pending_sessions, {}
+            events, self._pending_events = self._pending_events, []
+            if not sessions and not events:
+                return
+            try:
+                await asyncio.to_thread(self._write_batch, sessions, events)
+            except Exception:
+                # Put the batch back so a later flush retries it.
+                self._pending_sessions = {**sessions, **self._pending_sessions}
+                self._pending_events = events + self._pending_events
+                raise
+            self._stats["flushes"] += 1
+            self._stats["events_written"] += len(events)
+
+    async def purge_expired(self) -> int:
+        """Delete sessions idle for longer than `ttl_seconds`."""
+        self._last_purge = time.time()
+        cutoff = self._last_purge - self.ttl_seconds
+        for key in [k for k, s in self._cache.items() if s.last_update_time < cutoff]:
+            del self._cache[key]
+        purged = await asyncio.to_thread(self._purge_expired, cutoff)
+        self._stats["expired"] += purged
+        if purged:
+            logger.info(f"Purged {purged} expired sessions")
+        return purged
+
+    async def close(self):
+        await self.flush()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+    # -- BaseSessionService ---------------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        key = (app_name, user_id, session_id)
+        if key in self._cache or await asyncio.to_thread(self._read_last_update, key):
+            raise ValueError(f"Session with id {session_id} already exists.")
+        session = Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=dict(state or {}),
+            last_update_time=time.time(),
+        )
+        self._remember(key, session)
+        self._queue(key, session)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        session = self._cache.get(key)
+        if session is not None and key not in self._pending_sessions:
+            # Another worker may have extended this session since we cached it.
+            stored = await asyncio.to_thread(self._read_last_update, key)
+            if stored is None or stored > session.last_update_time:
+                session = None
+        if session is None:
+            if key in self._pending_sessions:
+                await self.flush()
+            session = await asyncio.to_thread(self._read_session, key)
+            if session is None:
+                self._cache.pop(key, None)
+                return None
+            self._stats["rehydrations"] += 1
+        else:
+            self._stats["cache_hits"] += 1
+
+        if self._expired(session.last_update_time):
+            self._stats["expired"] += 1
+            await self.delete_session(
+                app_name=app_name, user_id=user_id, session_id=session_id
+            )
+            return None
+        self._remember(key, session)
+
+        if config is None:
+            return session
+        events = session.events
+        if config.after_timestamp is not None:
+            events = [e for e in events if e.timestamp >= config.after_timestamp]
+        if config.num_recent_events is not None:
+            events = events[-config.num_recent_events :] if config.num_recent_events else []
+        return session.model_copy(update={"events": events})
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        await self.flush()
+        rows = await asyncio.to_thread(self._list, app_name, user_id)
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    id=session_id,
+                    app_name=app_name,
+                    user_id=row_user_id,
+                    state={},
+                    last_update_time=updated,
+                )
+                for row_user_id, session_id, updated in rows
+                if not self._expired(updated)
+            ]
+        )
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        key = (app_name, user_id, session_id)
+        self._cache.pop(key, None)
+        self._pending_sessions.pop(key, None)
+        self._pending_events = [e for e in self._pending_events if e[:3] != key]
+        await asyncio.to_thread(self._delete, key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+        key = (session.app_name, session.user_id, session.id)
+        cached = self._cache.get(key)
+        if cached is not None and cached is not session:
+            # The runner holds a filtered copy; keep the cached session in step.
+            cached.events.append(event)
+            cached.state.update(session.state)
+            cached.last_update_time = event.timestamp
+        self._queue(key, session, event)
+        return event
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "cached_sessions": len(self._cache),
+            "pending_events": len(self._pending_events),
+        }
+
+
+def build_session_service() -> BaseSessionService:
+    """Session service selected by SESSION_BACKEND (`sqlite` or `memory`)."""
+    backend = os.getenv("SESSION_BACKEND", "sqlite").lower()
+    if backend == "memory":
+        return InMemorySessionService()
+    if backend != "sqlite":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    return SQLiteSessionService.from_env()
@@ -21,4 +21,7 @@ You are a helpful flight search assistant. You can search for flights between an
 
 FLIGHT_SEARCH_PROMPT_V1 = """
 Help user to search for flights using available tools based on prompt. If return date not specified, use an empty string for one-way trips.
+For flexible dates (e.g. the cheapest day next week) or several origin/destination airports, call `flight_search_batch` once with the date range and airport lists instead of searching each date separately.
+Pass the user's preferences (nonstop only, departure or return time windows, maximum price or layover, airlines, fastest vs cheapest) as the search tools' filter and `sort_by` arguments; results cover outbound and return legs.
+For "cheapest day / cheapest time to fly" questions on one route over a longer period, call `flight_price_calendar` first; mention how fresh its prices are and confirm the chosen date with `flight_search_assistant`.
 """
\ No newline at end of file
@@ -1,11 +1,9 @@
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StreamableHTTPConnectionParams
 from google.adk import Agent
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
-from dotenv import load_dotenv
-from . import prompt
 
-load_dotenv()
+from . import prompt
+from ...tools import build_toolset
 
 place_agent = LlmAgent(
     model="gemini-2.5-flash",
@@ -14,11 +12,7 @@ place_agent = LlmAgent(
     description="This agent suggests a few destination given some user preferences",
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
-    tools=[MCPToolset(
-        connection_params=StreamableHTTPConnectionParams(
-            url="http://0.0.0.0:8082/inspiration",
-        ),
-    )]
+    tools=[build_toolset("inspiration")]
 )
 
 inspiration_agent = Agent(
@@ -0,0 +1,381 @@
+"""Toolsets giving the sub-agents access to the travel MCP tools.
+
+By default tools are reached over Streamable HTTP on the MCP server
+(`server.py`). When the chatbot and the MCP server run on the same host,
+MCP_TRANSPORT=inprocess calls the `TravelAgentService` handlers directly
+instead, skipping the HTTP request and JSON-RPC framing per tool call. Both
+transports expose the same tool schemas from `services.tool_definitions`.
+
+Over HTTP, every sub-agent's toolset shares one `MCPToolset` on the server's
+consolidated `/mcp` endpoint (MCP_CONSOLIDATED=true, the default), so the
+process keeps one MCP session for all tools; each sub-agent still only sees
+its own mount's tools. Tool lists are cached for MCP_TOOL_LIST_TTL seconds
+instead of being fetched before every model call.
+
+MCP_TRANSPORT=batch also goes over HTTP, but tool calls started together
+(ADK runs the function calls of one model response concurrently, e.g.
+airport lookups for origin and destination) are sent to `/mcp` as one
+JSON-RPC batch, and each call returns as soon as its result is streamed
+back. With MCP_CONSOLIDATED=false batches go to each mount's own endpoint,
+so only calls to the same mount share a request.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import mcp.types as mcp_types
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool.mcp_toolset import (
+    MCPToolset,
+    StreamableHTTPConnectionParams,
+)
+from google.genai import types as genai_types
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from services.tool_definitions import (
+    MOUNT_TOOLS,
+    call_tool,
+    error_result,
+    to_call_tool_result,
+)
+from utils.telemetry import registry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://0.0.0.0:8082")
+MCP_TOOL_LIST_TTL = float(os.getenv("MCP_TOOL_LIST_TTL", "300"))
+
+_travel_agent_service = None
+_shared_mcp_toolset = None
+# Shared MCPToolset -> number of open MountToolsets using it.
+_mcp_toolset_users: Dict[MCPToolset, int] = {}
+_tool_call_batchers: Dict[str, "ToolCallBatcher"] = {}
+
+
+def get_travel_agent_service():
+    """Process-wide `TravelAgentService` used by the in-process transport.
+
+    Must be called from the event loop, which runs its background jobs.
+    """
+    global _travel_agent_service
+    if _travel_agent_service is None:
+        from services.service_orchestrator import TravelAgentService
+
+        _travel_agent_service = TravelAgentService()
+        registry.add_collector(_travel_agent_service.metric_samples)
+    # Route observations and price calendar refreshes run in this process
+    # when the MCP server is bypassed.
+    _travel_agent_service.start_background_jobs()
+    return _travel_agent_service
+
+
+class InProcessTool(BaseTool):
+    """ADK tool calling a `TravelAgentService` handler without going through MCP.
+
+    The declaration is built from the MCP tool's input schema and the result
+    is the dumped `CallToolResult`, i.e. what `MCPTool` hands to the model.
+    """
+
+    def __init__(self, mcp_tool, service=None):
+        super().__init__(name=mcp_tool.name, description=mcp_tool.description or "")
+        self.mcp_tool = mcp_tool
+        self._service = service
+
+    def _get_declaration(self) -> genai_types.FunctionDeclaration:
+        return genai_types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters_json_schema=self.mcp_tool.inputSchema,
+        )
+
+    async def call(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        service = self._service or get_travel_agent_service()
+        try:
+            result = to_call_tool_result(await call_tool(service, self.name, args))
+        except Exception as e:
+            logger.info(f"In-process tool {self.name} failed due to: {e}")
+            result = error_result(e)
+        return result.model_dump(exclude_none=True, mode="json")
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context) -> Any:
+        return await self.call(args)
+
+
+class InProcessToolset(BaseToolset):
+    """In-process counterpart of `MCPToolset` for one MCP server mount."""
+
+    def __init__(self, mount: str, service=None, tool_filter=None):
+        super().__init__(tool_filter=tool_filter)
+        self.mount = mount
+        self._service = service
+        self.tools = [InProcessTool(tool, service) for tool in MOUNT_TOOLS[mount]]
+
+    async def get_tools(self, readonly_context=None) -> List[BaseTool]:
+        return [
+            tool for tool in self.tools if self._is_tool_selected(tool, readonly_context)
+        ]
+
+    async def warm_up(self) -> None:
+        """Create the shared service (airport index, background jobs) ahead of the first call."""
+        if self._service is None:
+            get_travel_agent_service()
+
+    async def close(self) -> None:
+        pass
+
+
+class ToolCallBatcher:
+    """Sends the tool calls started within `window` seconds as one JSON-RPC batch.
+
+    Attributes:
+        url: MCP endpoint accepting batches (`/mcp`, or a mount's own endpoint).
+        window: Seconds the first call of a batch waits for others.
+        max_batch: Calls per request at most (the server's MCP_MAX_BATCH).
+        client: HTTP client to send batches with; by default one is created
+            on first use and closed by `aclose`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        window: float = 0.002,
+        max_batch: int = 20,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.url = url
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle = None
+        self._sending = set()
+        self._client = client
+        self._owns_client = client is None
+        self._users = 0
+
+    @classmethod
+    def from_env(cls, mount: Optional[str] = None) -> "ToolCallBatcher":
+        """Batcher for `mount`'s tools: on `/mcp` when the server consolidates
+        its mounts, otherwise on the mount's own endpoint."""
+        return cls(
+            f"{MCP_SERVER_URL.rstrip('/')}/{mount_path(mount)}/",
+            window=float(os.getenv("MCP_BATCH_WINDOW_MS", "2")) / 1000,
+            max_batch=int(os.getenv("MCP_MAX_BATCH", "20")),
+        )
+
+    async def call(self, name: str, arguments: Dict[str, Any]) -> mcp_types.CallToolResult:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((name, arguments, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch):
+        futures = {i: future for i, (_, _, future) in enumerate(batch)}
+        requests = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "tools/call",
+                "params": {"name": name, "arguments": arguments},
+            }
+            for i, (name, arguments, _) in enumerate(batch)
+        ]
+
+        def resolve(message: Dict[str, Any]):
+            future = futures.get(message.get("id"))
+            if future is None or future.done():
+                return
+            if "result" in message:
+                future.set_result(mcp_types.CallToolResult.model_validate(message["result"]))
+            else:
+                future.set_exception(
+                    RuntimeError(message.get("error", {}).get("message", "Invalid response"))
+                )
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=120.0)
+        try:
+            async with self._client.stream(
+                "POST",
+                self.url,
+                json=requests,
+                headers={
+                    "Accept": "application/json, text/event-stream",
+                    "Content-Type": "application/json",
+                },
+            ) as response:
+                response.raise_for_status()
+                if response.headers.get("content-type", "").startswith("text/event-stream"):
+                    async for line in response.aiter_lines():
+                        if line.startswith("data:"):
+                            resolve(json.loads(line[5:]))
+                else:
+                    for message in json.loads(await response.aread()):
+                        resolve(message)
+        except Exception as e:
+            logger.info(f"Batch of {len(batch)} tool calls failed due to: {e}")
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("No result for the tool call in the batch response"))
+
+    def acquire(self):
+        """Register a toolset using this batcher; `release` it when closing."""
+        self._users += 1
+
+    async def release(self):
+        """Close the batcher once the last toolset using it has released it."""
+        self._users = max(self._users - 1, 0)
+        if not self._users:
+            await self.aclose()
+
+    async def aclose(self):
+        for task in list(self._sending):
+            task.cancel()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def mount_path(mount: Optional[str]) -> str:
+    """Server path serving `mount`'s tools: `mcp` with MCP_CONSOLIDATED=true
+    (the default), otherwise the mount's own endpoint."""
+    if mount is None or os.getenv("MCP_CONSOLIDATED", "true").lower() == "true":
+        return "mcp"
+    return mount
+
+
+def get_tool_call_batcher(mount: Optional[str] = None) -> ToolCallBatcher:
+    """Process-wide `ToolCallBatcher` for `mount`'s endpoint used by
+    MCP_TRANSPORT=batch; all mounts share one on `/mcp`."""
+    path = mount_path(mount)
+    if path not in _tool_call_batchers:
+        _tool_call_batchers[path] = ToolCallBatcher.from_env(mount)
+    return _tool_call_batchers[path]
+
+
+class BatchedTool(InProcessTool):
+    """ADK tool sending its calls through the shared `ToolCallBatcher`."""
+
+    def __init__(self, mcp_tool, batcher: ToolCallBatcher):
+        super().__init__(mcp_tool)
+        self._batcher = batcher
+
+    async def call(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = await self._batcher.call(self.name, args)
+        except Exception as e:
+            logger.info(f"Batched tool {self.name} failed due to: {e}")
+            result = error_result(e)
+        return result.model_dump(exclude_none=True, mode="json")
+
+
+class BatchedToolset(BaseToolset):
+    """One mount's tools, called over HTTP in JSON-RPC batches."""
+
+    def __init__(self, mount: str, batcher: Optional[ToolCallBatcher] = None, tool_filter=None):
+        super().__init__(tool_filter=tool_filter)
+        self.mount = mount
+        self._batcher = batcher or get_tool_call_batcher(mount)
+        self._batcher.acquire()
+        self._closed = False
+        self.tools = [BatchedTool(tool, self._batcher) for tool in MOUNT_TOOLS[mount]]
+
+    async def get_tools(self, readonly_context=None) -> List[BaseTool]:
+        return [
+            tool for tool in self.tools if self._is_tool_selected(tool, readonly_context)
+        ]
+
+    async def close(self) -> None:
+        # The batcher is shared by every sub-agent's toolset; the last to close ends it.
+        if not self._closed:
+            self._closed = True
+            await self._batcher.release()
+
+
+def _mcp_toolset(path: str) -> MCPToolset:
+    return MCPToolset(
+        connection_params=StreamableHTTPConnectionParams(
+            url=f"{MCP_SERVER_URL.rstrip('/')}/{path}",
+        ),
+        tool_list_cache_ttl_seconds=MCP_TOOL_LIST_TTL,
+    )
+
+
+def get_shared_mcp_toolset() -> MCPToolset:
+    """Process-wide `MCPToolset` on the consolidated `/mcp` endpoint."""
+    global _shared_mcp_toolset
+    if _shared_mcp_toolset is None:
+        _shared_mcp_toolset = _mcp_toolset("mcp")
+    return _shared_mcp_toolset
+
+
+class MountToolset(BaseToolset):
+    """One mount's tools, served through the shared `/mcp` toolset and its session."""
+
+    def __init__(self, mount: str, shared: Optional[MCPToolset] = None):
+        super().__init__(tool_filter=[tool.name for tool in MOUNT_TOOLS[mount]])
+        self.mount = mount
+        self._shared = shared or get_shared_mcp_toolset()
+        _mcp_toolset_users[self._shared] = _mcp_toolset_users.get(self._shared, 0) + 1
+        self._closed = False
+
+    async def get_tools(self, readonly_context=None) -> List[BaseTool]:
+        return [
+            tool
+            for tool in await self._shared.get_tools(readonly_context)
+            if self._is_tool_selected(tool, readonly_context)
+        ]
+
+    async def close(self) -> None:
+        # The shared toolset serves every sub-agent; the last to close ends its session.
+        if self._closed:
+            return
+        self._closed = True
+        users = _mcp_toolset_users.get(self._shared, 1) - 1
+        if users > 0:
+            _mcp_toolset_users[self._shared] = users
+            return
+        _mcp_toolset_users.pop(self._shared, None)
+        await self._shared.close()
+
+
+def build_toolset(mount: str, transport: Optional[str] = None) -> BaseToolset:
+    """Toolset for an MCP server mount (`airport`, `flights`, `inspiration`,
+    `trip-purpose`) over MCP_TRANSPORT (`http`, the default, `batch` or
+    `inprocess`)."""
+    transport = (transport or os.getenv("MCP_TRANSPORT", "http")).lower()
+    if transport == "inprocess":
+        return InProcessToolset(mount)
+    if transport == "batch":
+        return BatchedToolset(mount)
+    if transport != "http":
+        raise ValueError(f"Unknown MCP_TRANSPORT: {transport}")
+    if mount_path(mount) == "mcp":
+        return MountToolset(mount)
+    return _mcp_toolset(mount)
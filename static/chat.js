@@ -90,6 +90,131 @@ document.addEventListener("DOMContentLoaded", function () {
         return msgDiv;
     }
 
+    function updateMessage(msgDiv, message) {
+        const contentDiv = msgDiv.querySelector(".whitespace-pre-wrap");
+        contentDiv.innerHTML = formatAgentResponse(message);
+        chatBox.scrollTop = chatBox.scrollHeight;
+    }
+
+    function setStatus(msgDiv, status) {
+        let statusDiv = msgDiv.querySelector(".agent-status");
+        if (!statusDiv) {
+            statusDiv = document.createElement("div");
+            statusDiv.className = "agent-status text-xs text-gray-500 mt-1";
+            msgDiv.querySelector(".flex-1").appendChild(statusDiv);
+        }
+        statusDiv.textContent = status;
+        if (!status) {
+            statusDiv.remove();
+        }
+    }
+
+    function ensureMessage(state) {
+        // The assistant bubble appears on the first text or status, so progress
+        // shows before the first answer text arrives.
+        if (!state.msgDiv) {
+            typingIndicator.classList.remove("show");
+            state.msgDiv = appendMessage("assistant", "");
+        }
+        return state.msgDiv;
+    }
+
+    function handleStreamEvent(event, state) {
+        switch (event.type) {
+            case "session":
+                currentSessionId = event.session_id;
+                break;
+            case "text":
+                ensureMessage(state);
+                state.text += event.text;
+                updateMessage(state.msgDiv, state.text);
+                break;
+            case "transfer":
+                state.status = `Asking ${event.agent.replace(/_/g, " ")}...`;
+                break;
+            case "tool_call":
+                state.status = `Running ${event.name.replace(/_/g, " ")}...`;
+                break;
+            case "tool_result":
+                state.status = `Finished ${event.name.replace(/_/g, " ")}`;
+                break;
+            case "plan":
+                state.pending = event.tasks.length;
+                state.status = `Asking ${event.tasks.map((task) => task.agent.replace(/_/g, " ")).join(", ")} in parallel...`;
+                break;
+            case "task_done":
+                state.pending -= 1;
+                state.status = state.pending > 0
+                    ? `Finished ${event.agent.replace(/_/g, " ")}, ${state.pending} left...`
+                    : "Putting the answers together...";
+                break;
+            case "error":
+                state.text += (state.text ? "\n" : "") + event.message;
+                ensureMessage(state);
+                updateMessage(state.msgDiv, state.text);
+                break;
+            case "done":
+                state.status = "";
+                break;
+        }
+        if (state.status) {
+            ensureMessage(state);
+        }
+        if (state.msgDiv) {
+            setStatus(state.msgDiv, state.status);
+        }
+    }
+
+    async function streamChat(message) {
+        const response = await fetch("/chat/stream", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json"
+            },
+            body: JSON.stringify({ message, session_id: currentSessionId })
+        });
+        if (!response.ok || !response.body) {
+            return false;
+        }
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const state = { msgDiv: null, text: "", status: "" };
+        let buffer = "";
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let newline;
+            while ((newline = buffer.indexOf("\n")) >= 0) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) {
+                    handleStreamEvent(JSON.parse(line), state);
+                }
+            }
+        }
+        if (!state.text) {
+            setStatus(ensureMessage(state), "");
+            updateMessage(state.msgDiv, "I'm sorry, I couldn't process that request.");
+        }
+        return true;
+    }
+
+    async function postChat(message) {
+        const response = await fetch("/chat/", {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json"
+            },
+            body: JSON.stringify({ message, session_id: currentSessionId })
+        });
+        const data = await response.json();
+        if (data.session_id) {
+            currentSessionId = data.session_id;
+        }
+        appendMessage("assistant", data.response);
+    }
+
     chatForm.addEventListener("submit", async function (e) {
         e.preventDefault();
         const message = userInput.value.trim();
@@ -99,18 +224,10 @@ document.addEventListener("DOMContentLoaded", function () {
         userInput.disabled = true;
         typingIndicator.classList.add("show");
         try {
-            const response = await fetch("/chat/", {
-                method: "POST",
-                headers: {
-                    "Content-Type": "application/json"
-                },
-                body: JSON.stringify({ message, session_id: currentSessionId })
-            });
-            const data = await response.json();
-            if (data.session_id) {
-                currentSessionId = data.session_id;
+            const streamed = window.ReadableStream && window.TextDecoder && await streamChat(message);
+            if (!streamed) {
+                await postChat(message);
             }
-            appendMessage("assistant", data.response);
         } catch (err) {
             appendMessage("assistant", "Error: Could not reach agent.");
         } finally {
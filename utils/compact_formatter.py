@@ -0,0 +1,522 @@
+import os
+import json
+import math
+import random
+import functools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import mcp.types as types
+
+from utils.offer_engine import OfferFilters, OfferTable, format_minutes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Byte budget for the text handed back to the model, per tool. Override with
+# TOOL_OUTPUT_BUDGETS='{"flight_search_assistant": 1500}'.
+DEFAULT_BUDGETS = {
+    "flight_search_assistant": 2000,
+    "flight_search_batch": 3000,
+    "flight_price_calendar": 1500,
+    "get_inspiration": 2500,
+    "get_airport_info": 1500,
+    "get_trip_purpose": 500,
+}
+
+# Abbreviated keys used in compact flight payloads; sent once per response as `k`.
+FLIGHT_KEYS = {
+    "al": "airline",
+    "p": "price",
+    "c": "currency",
+    "d": "duration",
+    "s": "stops",
+    "o": "origin",
+    "ot": "departure time",
+    "a": "destination",
+    "at": "arrival time",
+    "cb": "cabin",
+    "r": "route",
+    "sd": "searched departure date",
+    "sr": "searched return date",
+    "rtd": "return duration",
+    "rts": "return stops",
+    "rto": "return departure time",
+    "rta": "return arrival time",
+}
+INSPIRATION_KEYS = {
+    "a": "destination",
+    "n": "destination name",
+    "dd": "departure date",
+    "rd": "return date",
+    "p": "price",
+}
+
+
+def compact_output_enabled() -> bool:
+    """Whether tool formatters should emit the compact representation."""
+    return os.getenv("TOOL_OUTPUT_MODE", "verbose").lower() == "compact"
+
+
+def savings_sample_rate() -> float:
+    """Share of compact calls that also build the verbose output to measure savings."""
+    return float(os.getenv("TOOL_OUTPUT_SAVINGS_SAMPLE", "0.05"))
+
+
+def output_budget(tool_name: str) -> int:
+    budgets = dict(DEFAULT_BUDGETS)
+    override = os.getenv("TOOL_OUTPUT_BUDGETS")
+    if override:
+        try:
+            budgets.update(json.loads(override))
+        except ValueError:
+            logger.error("Ignoring TOOL_OUTPUT_BUDGETS: not valid JSON")
+    return int(budgets.get(tool_name, 2000))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 bytes per token) used for savings reporting."""
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+def dumps(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass(slots=True)
+class FlightOfferRecord:
+    airline: str
+    price: float
+    currency: str
+    duration: str
+    stops: int
+    origin: str
+    departure_at: str
+    destination: str
+    arrival_at: str
+    cabin: str
+    return_duration: str = ""
+    return_stops: int = -1
+    return_departure_at: str = ""
+    return_arrival_at: str = ""
+    route: str = ""
+    search_departure_date: str = ""
+    search_return_date: str = ""
+
+    @classmethod
+    def from_table(cls, table: OfferTable, row: int) -> "FlightOfferRecord":
+        """Record for offer `row` of a parsed `OfferTable`."""
+        offer = table.offers[row]
+        outbound = offer["itineraries"][0]["segments"]
+        tags = table.tags[row]
+        record = cls(
+            airline=table.carriers.get(outbound[0].get("carrierCode"), outbound[0].get("carrierCode", "")),
+            price=round(float(table.price[row]), 2),
+            currency=table.currency[row],
+            duration=format_minutes(table.duration[row, 0]),
+            stops=int(table.stops[row, 0]),
+            origin=outbound[0]["departure"].get("iataCode", ""),
+            departure_at=outbound[0]["departure"]["at"],
+            destination=outbound[-1]["arrival"].get("iataCode", ""),
+            arrival_at=outbound[-1]["arrival"]["at"],
+            cabin=table.leg_summary(row, 0)["travel_class"],
+            route=tags.get("route", ""),
+            search_departure_date=tags.get("search_departure_date", ""),
+            search_return_date=tags.get("search_return_date", ""),
+        )
+        if table.legs[row] > 1:
+            inbound = offer["itineraries"][1]["segments"]
+            record.return_duration = format_minutes(table.duration[row, 1])
+            record.return_stops = int(table.stops[row, 1])
+            record.return_departure_at = inbound[0]["departure"]["at"]
+            record.return_arrival_at = inbound[-1]["arrival"]["at"]
+        return record
+
+    def to_compact(self) -> Dict[str, Any]:
+        record = {
+            "al": self.airline,
+            "p": self.price,
+            "c": self.currency,
+            "d": self.duration,
+            "s": self.stops,
+            "o": self.origin,
+            "ot": self.departure_at,
+            "a": self.destination,
+            "at": self.arrival_at,
+            "cb": self.cabin,
+        }
+        if self.return_departure_at:
+            record["rtd"] = self.return_duration
+            record["rts"] = self.return_stops
+            record["rto"] = self.return_departure_at
+            record["rta"] = self.return_arrival_at
+        if self.route:
+            record["r"] = self.route
+            record["sd"] = self.search_departure_date
+            if self.search_return_date:
+                record["sr"] = self.search_return_date
+        return record
+
+
+@dataclass(slots=True)
+class InspirationRecord:
+    destination: str
+    destination_name: str
+    departure_date: str
+    return_date: str
+    price: float
+
+    def to_compact(self) -> Dict[str, Any]:
+        return {
+            "a": self.destination,
+            "n": self.destination_name,
+            "dd": self.departure_date,
+            "rd": self.return_date,
+            "p": self.price,
+        }
+
+
+def batch_offer_table(results: List[Dict[str, Any]]) -> OfferTable:
+    """One `OfferTable` over batch sub-search results, tagged with their route and dates."""
+    return OfferTable.concat(
+        [result["flight_data"] for result in results],
+        [
+            {
+                "route": f"{result['origin']}-{result['destination']}",
+                "search_departure_date": result["departure_date"],
+                **({"search_return_date": result["return_date"]} if result.get("return_date") else {}),
+            }
+            for result in results
+        ],
+    )
+
+
+def offer_records(table: OfferTable, rows: Iterable[int]) -> List[FlightOfferRecord]:
+    """Records for the ranked `rows` of `table`."""
+    return [FlightOfferRecord.from_table(table, int(row)) for row in rows]
+
+
+def fit_to_budget(
+    records: List[Any], render: Callable[[List[Any]], str], budget: int
+) -> Tuple[str, int]:
+    """Render as many of the ranked `records` as fit in `budget` bytes.
+
+    Records are assumed to be ranked best first, so the lowest-ranked ones
+    are dropped first. Returns the rendered text and the number dropped; at
+    least one record is always kept.
+    """
+    text = render(records)
+    if len(text.encode("utf-8")) <= budget or len(records) <= 1:
+        return text, 0
+    low, high = 1, len(records) - 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if len(render(records[:middle]).encode("utf-8")) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return render(records[:low]), len(records) - low
+
+
+class OutputSavings:
+    """Running totals of bytes/tokens saved by compact tool output.
+
+    Every compact response is counted; the verbose size is only known for
+    the sampled calls, so savings are measured over `sampled` calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tool_name: str, verbose: Optional[str], compact: str, dropped: int = 0):
+        compact_bytes = len(compact.encode("utf-8"))
+        compact_tokens = estimate_tokens(compact)
+        if verbose is not None:
+            verbose_bytes = len(verbose.encode("utf-8"))
+            verbose_tokens = estimate_tokens(verbose)
+            logger.info(
+                f"{tool_name} output: {compact_bytes} bytes (~{compact_tokens} tokens), "
+                f"saved {verbose_bytes - compact_bytes} bytes (~{verbose_tokens - compact_tokens} tokens), "
+                f"dropped {dropped} records over budget"
+            )
+        with self._lock:
+            totals = self._tools.setdefault(
+                tool_name,
+                {
+                    "calls": 0,
+                    "compact_bytes": 0,
+                    "compact_tokens": 0,
+                    "dropped_records": 0,
+                    "sampled": 0,
+                    "sampled_verbose_bytes": 0,
+                    "sampled_compact_bytes": 0,
+                    "sampled_verbose_tokens": 0,
+                    "sampled_compact_tokens": 0,
+                },
+            )
+            totals["calls"] += 1
+            totals["compact_bytes"] += compact_bytes
+            totals["compact_tokens"] += compact_tokens
+            totals["dropped_records"] += dropped
+            if verbose is not None:
+                totals["sampled"] += 1
+                totals["sampled_verbose_bytes"] += verbose_bytes
+                totals["sampled_compact_bytes"] += compact_bytes
+                totals["sampled_verbose_tokens"] += verbose_tokens
+                totals["sampled_compact_tokens"] += compact_tokens
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            tools = {name: dict(totals) for name, totals in self._tools.items()}
+        for totals in tools.values():
+            totals["saved_bytes"] = totals["sampled_verbose_bytes"] - totals["sampled_compact_bytes"]
+            totals["saved_tokens"] = totals["sampled_verbose_tokens"] - totals["sampled_compact_tokens"]
+        return tools
+
+
+output_savings = OutputSavings()
+
+
+def _compact_response(
+    tool_name: str, payload: Dict[str, Any], verbose: Optional[str], dropped: int = 0
+):
+    text = dumps(payload)
+    output_savings.record(tool_name, verbose, text, dropped)
+    return [types.TextContent(type="text", text=text)], payload
+
+
+def _render_records(header: Dict[str, Any], keys: Dict[str, str]):
+    def render(records: List[Any]) -> str:
+        data = [record.to_compact() for record in records]
+        used = {key for record in data for key in record}
+        legend = {key: label for key, label in keys.items() if key in used}
+        return dumps({**header, "k": legend, "data": data})
+
+    return render
+
+
+def compact_flight_results(
+    flight_data: Dict[str, Any], filters: OfferFilters, max_results: int, verbose: Optional[str]
+):
+    """Compact counterpart of `format_flight_results` (no raw payload)."""
+    tool_name = "flight_search_assistant"
+    if "error" in flight_data:
+        return _compact_response(
+            tool_name, {"status": "error", "message": flight_data["error"]}, verbose
+        )
+    table = OfferTable.from_response(flight_data)
+    records = offer_records(table, table.rank(filters, max_results))
+    if not records:
+        return _compact_response(
+            tool_name,
+            {"status": "not_found", "message": "No flight offers found.", "total": len(table)},
+            verbose,
+        )
+    render = _render_records({"status": "success", "total": len(table)}, FLIGHT_KEYS)
+    text, dropped = fit_to_budget(records, render, output_budget(tool_name))
+    payload = json.loads(text)
+    if dropped:
+        payload["truncated"] = dropped
+    return _compact_response(tool_name, payload, verbose, dropped)
+
+
+def compact_batch_flight_results(
+    results: List[Dict[str, Any]],
+    failed: List[Dict[str, Any]],
+    max_results: int,
+    filters: OfferFilters,
+    verbose: Optional[str],
+):
+    """Compact counterpart of `format_batch_flight_results`."""
+    tool_name = "flight_search_batch"
+    table = batch_offer_table(results)
+    records = offer_records(table, table.rank(filters, max_results))
+    header = {
+        "status": "success" if records else "not_found",
+        "searches": len(results) + len(failed),
+        "failed": [f"{f['route']}@{f['departure_date']}" for f in failed],
+        "total": len(table),
+    }
+    if not records:
+        return _compact_response(tool_name, header, verbose)
+    render = _render_records(header, FLIGHT_KEYS)
+    text, dropped = fit_to_budget(records, render, output_budget(tool_name))
+    payload = json.loads(text)
+    if dropped:
+        payload["truncated"] = dropped
+    return _compact_response(tool_name, payload, verbose, dropped)
+
+
+def compact_inspiration_response(result: Any, origin_airport_code: str, verbose: Optional[str]):
+    """Compact counterpart of `format_inspiration_flights_response`."""
+    tool_name = "get_inspiration"
+    if not isinstance(result, dict) or "data" not in result:
+        return _compact_response(
+            tool_name,
+            {"origin": origin_airport_code, "status": "error"},
+            verbose,
+        )
+    locations = result.get("dictionaries", {}).get("locations", {})
+    records = []
+    for data in result["data"]:
+        try:
+            price = float(data.get("price", {}).get("total", "inf"))
+        except ValueError:
+            price = float("inf")
+        destination = data.get("destination", "")
+        records.append(
+            InspirationRecord(
+                destination=destination,
+                destination_name=locations.get(destination, {}).get("detailedName", ""),
+                departure_date=data.get("departureDate", ""),
+                return_date=data.get("returnDate", ""),
+                price=price,
+            )
+        )
+    if not records:
+        return _compact_response(
+            tool_name,
+            {"origin": origin_airport_code, "status": "not_found"},
+            verbose,
+        )
+    records.sort(key=lambda record: record.price)
+    currency = result.get("meta", {}).get("currency", "")
+    render = _render_records(
+        {"origin": origin_airport_code, "status": "success", "currency": currency},
+        INSPIRATION_KEYS,
+    )
+    text, dropped = fit_to_budget(records, render, output_budget(tool_name))
+    payload = json.loads(text)
+    if dropped:
+        payload["truncated"] = dropped
+    return _compact_response(tool_name, payload, verbose, dropped)
+
+
+def compact_airport_info_response(result: Any, airport_code: str, verbose: Optional[str]):
+    """Compact counterpart of `format_airport_info_response`."""
+    tool_name = "get_airport_info"
+    if not isinstance(result, dict) or "data" not in result:
+        return _compact_response(
+            tool_name, {"airport_code": airport_code, "status": "error"}, verbose
+        )
+    matches = [
+        loc
+        for loc in result.get("data", [])
+        if loc.get("iataCode") == airport_code
+        or airport_code in loc.get("name", "").upper()
+    ]
+    if not matches:
+        return _compact_response(
+            tool_name,
+            {
+                "airport_code": airport_code,
+                "status": "not_found",
+                "message": f"No airport found for code: {airport_code}",
+            },
+            verbose,
+        )
+    data = []
+    for loc in matches:
+        address = loc.get("address", {})
+        record = {
+            "code": loc.get("iataCode"),
+            "type": loc.get("subType"),
+            "name": loc.get("name"),
+            "city": address.get("cityName"),
+            "country": address.get("countryName"),
+        }
+        data.append({key: value for key, value in record.items() if value})
+    return _compact_response(
+        tool_name,
+        {"airport_code": airport_code, "status": "success", "data": data},
+        verbose,
+    )
+
+
+def compact_trip_purpose_response(result: Any, arguments: Dict[str, Any], verbose: Optional[str]):
+    """Compact counterpart of `format_trip_purpose_response`."""
+    tool_name = "get_trip_purpose"
+    payload = {
+        "origin": arguments.get("origin"),
+        "destination": arguments.get("destination"),
+    }
+    if not isinstance(result, dict) or "data" not in result:
+        payload["status"] = "error"
+    elif (result.get("data") or {}).get("result"):
+        payload["trip_purpose"] = result["data"]["result"]
+        payload["status"] = "success"
+    else:
+        payload["status"] = "not_found"
+    return _compact_response(tool_name, payload, verbose)
+
+
+def compact_price_calendar_response(
+    calendar: Any, days: List[Tuple[Any, float]], max_results: int, freshness: Dict[str, Any], verbose: Optional[str]
+):
+    """Compact counterpart of `format_price_calendar_response`.
+
+    Per-day prices are one list aligned to consecutive days from `from`
+    (null where there is no fare), dropped first when over budget.
+    """
+    tool_name = "flight_price_calendar"
+    payload = {
+        "status": "success" if days else "not_found",
+        "src": "calendar",
+        "route": f"{calendar.origin}-{calendar.destination}",
+        "len": calendar.trip_length_days,
+        "cur": calendar.currency,
+        "age_h": freshness["age_hours"],
+        "stale": freshness["stale"],
+    }
+    if days:
+        cheapest = sorted(days, key=lambda day: day[1])[:max_results]
+        payload["cheapest"] = [[day.isoformat(), round(price, 2)] for day, price in cheapest]
+        first = days[0][0]
+        prices = [None] * ((days[-1][0] - first).days + 1)
+        for day, price in days:
+            prices[(day - first).days] = round(price, 2)
+        payload["from"] = first.isoformat()
+        payload["p"] = prices
+    dropped = 0
+    if len(dumps(payload).encode("utf-8")) > output_budget(tool_name) and "p" in payload:
+        dropped = len(payload.pop("p"))
+        payload.pop("from")
+    return _compact_response(tool_name, payload, verbose, dropped)
+
+
+def _verbose_text(response: Any) -> str:
+    """Everything a verbose formatter result would put in the model context."""
+    content, structured = response if isinstance(response, tuple) else (response, None)
+    text = "".join(getattr(block, "text", "") for block in content)
+    if structured is not None:
+        text += json.dumps(structured)
+    return text
+
+
+def compact_variant(compact_formatter: Callable, structured: bool = True):
+    """Route a verbose formatter to `compact_formatter` in compact output mode.
+
+    The compact response keeps the verbose return shape: a `(content,
+    structured)` tuple, or only the content list with `structured=False`.
+    The verbose response is only built for a TOOL_OUTPUT_SAVINGS_SAMPLE share
+    of the calls (default 0.05), to measure the bytes/tokens saved;
+    `compact_formatter` gets its text, or None for the other calls.
+    """
+
+    def decorator(formatter: Callable):
+        @functools.wraps(formatter)
+        def wrapper(*args):
+            if not compact_output_enabled():
+                return formatter(*args)
+            verbose = None
+            if random.random() < savings_sample_rate():
+                verbose = _verbose_text(formatter(*args))
+            content, payload = compact_formatter(*args, verbose)
+            return (content, payload) if structured else content
+
+        return wrapper
+
+    return decorator
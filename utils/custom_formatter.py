@@ -1,13 +1,30 @@
 import mcp.types as types
 import json
-from typing import Any, Dict, List
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 import logging
 
+from utils.compact_formatter import (
+    batch_offer_table,
+    compact_airport_info_response,
+    compact_batch_flight_results,
+    compact_flight_results,
+    compact_inspiration_response,
+    compact_price_calendar_response,
+    compact_trip_purpose_response,
+    compact_variant,
+)
+from utils.offer_engine import OfferFilters, OfferTable
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def format_flight_results(flight_data: Dict[str, Any]) -> List[Dict[str, str]]:
+@compact_variant(compact_flight_results)
+def format_flight_results(
+    flight_data: Dict[str, Any], filters: OfferFilters, max_results: int
+) -> List[Dict[str, str]]:
+    """Rank every offer in `flight_data` with `filters` and describe the top `max_results`."""
     if "error" in flight_data:
         logger.error(f"Flight search error in formatter: {flight_data['error']}")
         return [
@@ -22,7 +39,7 @@ def format_flight_results(flight_data: Dict[str, Any]) -> List[Dict[str, str]]:
                     indent=2,
                 ),
             )
-        ], flight_data
+        ], {"status": "error", "message": str(flight_data["error"])}
 
     if not flight_data.get("data"):
         logger.info("No flight offers found in the Amadeus response.")
@@ -38,53 +55,113 @@ def format_flight_results(flight_data: Dict[str, Any]) -> List[Dict[str, str]]:
                     indent=2,
                 ),
             )
-        ], flight_data
-
-    flight_offers = flight_data.get("data", [])
-    dictionaries = flight_data.get("dictionaries", {})
-    carriers = dictionaries.get("carriers", {})
-
-    formatted_flights = []
-    for offer in flight_offers:
-        try:
-            itinerary = offer["itineraries"][0]
-            first_segment = itinerary["segments"][0]
-            last_segment = itinerary["segments"][-1]
-            carrier_code = first_segment["carrierCode"]
-            airline = carriers.get(carrier_code, "Unknown Airline")
-            price = offer["price"]["total"]
-            currency = offer["price"]["currency"]
-            dep_info = f"{first_segment['departure']['iataCode']} at {first_segment['departure']['at']}"
-            arr_info = f"{last_segment['arrival']['iataCode']} at {last_segment['arrival']['at']}"
-            traveler_pricing = offer["travelerPricings"][0]
-            fare_details = traveler_pricing["fareDetailsBySegment"][0]
-            travel_class = fare_details.get("cabin", "Economy")
-            stops = len(itinerary["segments"]) - 1
-            stops_str = "Nonstop" if stops == 0 else f"{stops} stop(s)"
-            formatted_flights.append(
-                {
-                    "airline": airline,
-                    "price": f"{price} {currency}",
-                    "duration": itinerary["duration"],
-                    "stops": stops_str,
-                    "departure": dep_info,
-                    "arrival": arr_info,
-                    "travel_class": travel_class,
-                }
-            )
-        except (KeyError, IndexError) as e:
-            logger.error(f"Could not parse a flight offer due to missing data: {e}")
-            continue
+        ], {"status": "not_found", "total_offers": 0, "message": "No flight offers found."}
+
+    table = OfferTable.from_response(flight_data)
+    formatted_flights = table.summarize(table.rank(filters, max_results))
+    output = {
+        "status": "success" if formatted_flights else "not_found",
+        "total_offers": len(table),
+        "data": formatted_flights,
+    }
+    if not formatted_flights:
+        output["message"] = f"None of the {len(table)} flight offers match the filters."
 
-    logger.info(f"Returning {len(formatted_flights)} formatted flights")
+    logger.info(f"Returning {len(formatted_flights)} of {len(table)} flights")
+    # The ranked summary, not the raw payload, is the structured result: with
+    # hundreds of offers the raw response would flood the model's context.
     return [
-        types.TextContent(
-            type="text",
-            text=json.dumps({"status": "success", "data": formatted_flights}, indent=2),
-        )
-    ], flight_data
+        types.TextContent(type="text", text=json.dumps(output, indent=2))
+    ], output
+
+
+def summarize_flight_offers(
+    flight_data: Dict[str, Any], filters: Optional[OfferFilters] = None, max_results: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Reduce raw Amadeus flight offers to the fields shown to the user, best first."""
+    table = OfferTable.from_response(flight_data)
+    return table.summarize(table.rank(filters or OfferFilters(), max_results))
+
+
+@compact_variant(compact_batch_flight_results)
+def format_batch_flight_results(
+    results: List[Dict[str, Any]],
+    failed: List[Dict[str, Any]],
+    max_results: int,
+    filters: OfferFilters,
+):
+    """Rank flight offers from several searches together and return the top ones.
+
+    `results` holds one entry per sub-query with its `origin`, `destination`,
+    `departure_date`, `return_date` and raw Amadeus `flight_data`.
+    """
+    table = batch_offer_table(results)
+    merged = table.summarize(table.rank(filters, max_results))
+
+    output = {
+        "status": "success" if merged else "not_found",
+        "searches": len(results) + len(failed),
+        "failed_searches": failed,
+        "total_offers": len(table),
+        "data": merged,
+    }
+    if not merged:
+        output["message"] = "No flight offers found for any of the requested searches."
+    logger.info(
+        f"Returning {len(output['data'])} of {len(table)} offers from {len(results)} searches"
+    )
+    return [
+        types.TextContent(type="text", text=json.dumps(output, indent=2))
+    ], output
+
+
+def _calendar_entry(calendar, day, price: float) -> Dict[str, Any]:
+    entry = {"departure_date": day.isoformat(), "price": f"{price:.2f} {calendar.currency}".strip()}
+    if calendar.trip_length_days:
+        entry["return_date"] = (day + timedelta(days=calendar.trip_length_days)).isoformat()
+    return entry
+
+
+@compact_variant(compact_price_calendar_response)
+def format_price_calendar_response(calendar, days, max_results: int, freshness: Dict[str, Any]):
+    """Format the cheapest dates and per-day prices of a precomputed price calendar.
+
+    `calendar` is a `services.price_calendar.RouteCalendar` and `days` its
+    `(date, price)` pairs inside the requested window.
+    """
+    cheapest = sorted(days, key=lambda day: day[1])[:max_results]
+    output = {
+        "status": "success" if days else "not_found",
+        "source": "price_calendar",
+        "route": f"{calendar.origin}-{calendar.destination}",
+        "trip_type": (
+            f"round trip, {calendar.trip_length_days} days" if calendar.trip_length_days else "one way"
+        ),
+        "currency": calendar.currency,
+        "freshness": freshness,
+        "note": "Cheapest fares found when the calendar was refreshed; confirm with flight_search_assistant before booking.",
+        "cheapest_dates": [_calendar_entry(calendar, day, price) for day, price in cheapest],
+        "calendar": [_calendar_entry(calendar, day, price) for day, price in days],
+    }
+    logger.info(
+        f"Returning price calendar {output['route']} with {len(days)} priced days"
+    )
+    return [
+        types.TextContent(type="text", text=json.dumps(output, indent=2))
+    ], output
+
+
+def format_live_calendar_response(response, message: str):
+    """Mark a live batch search result returned in place of a price calendar."""
+    content, structured = response
+    note = {"source": "live_search", "message": message}
+    return [
+        types.TextContent(type="text", text=json.dumps(note)),
+        *content,
+    ], {**note, **structured}
 
 
+@compact_variant(compact_airport_info_response, structured=False)
 def format_airport_info_response(result, airport_code):
     """Format the response for airport info tool."""
 
@@ -111,7 +188,7 @@ def format_airport_info_response(result, airport_code):
         or airport_code in loc.get("name", "").upper()
     ]
     if airport_info:
-        logger.info(f"Returning airport information {airport_info}")
+        logger.info(f"Returning {len(airport_info)} airport records for {airport_code}")
         return [
             types.TextContent(
                 type="text",
@@ -141,6 +218,7 @@ def format_airport_info_response(result, airport_code):
     ]
 
 
+@compact_variant(compact_inspiration_response)
 def format_inspiration_flights_response(result, origin_airport_code):
     if isinstance(result, dict) and "data" in result:
         locations = result.get("dictionaries", {}).get("locations", {})
@@ -204,6 +282,7 @@ def format_inspiration_flights_response(result, origin_airport_code):
         ], result
 
 
+@compact_variant(compact_trip_purpose_response, structured=False)
 def format_trip_purpose_response(result, arguments):
     """Format the response for trip purpose tool."""
     origin = arguments.get("origin")
@@ -230,7 +309,7 @@ def format_trip_purpose_response(result, arguments):
     data = result.get("data")
     purpose = data.get("result", None)
     if purpose:
-        logger.info(f"Returning trip purpose information {purpose}")
+        logger.info(f"Returning trip purpose {purpose} for {origin}-{destination}")
         return [
             types.TextContent(
                 type="text",
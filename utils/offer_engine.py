@@ -0,0 +1,354 @@
+"""Columnar parsing, filtering and ranking of Amadeus flight offers.
+
+`OfferTable` walks an Amadeus flight offers response once and keeps every
+itinerary (outbound and return legs) as numpy columns shaped
+`(offers, legs)`: duration, stops, departure/arrival times and longest
+layover. Filters (price, stops, duration, layover, departure windows,
+airlines) and sorting are then array operations over all offers, so a
+search can ask Amadeus for hundreds of offers and only the top N are turned
+into strings for the model.
+"""
+
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DURATION_PATTERN = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+TIME_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})$")
+NAT = np.datetime64("NaT", "m")
+
+SORT_KEYS = ("price", "duration", "departure", "best")
+
+# Weights of normalized price, total duration and stops in the "best" score.
+BEST_WEIGHTS = (0.6, 0.3, 0.1)
+
+
+def duration_minutes(value: Optional[str]) -> float:
+    """Minutes in an ISO 8601 duration such as `PT7H35M` or `P1DT2H`; NaN if unparseable."""
+    match = DURATION_PATTERN.fullmatch(value or "")
+    if not match or not any(match.groups()):
+        return np.nan
+    days, hours, minutes = (int(group or 0) for group in match.groups())
+    return float(days * 1440 + hours * 60 + minutes)
+
+
+def minutes_between(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Minutes from `start` to `end` (datetime64[m] arrays); NaN where either is NaT."""
+    delta = end - start
+    return np.where(np.isnat(delta), np.nan, delta.astype(np.float64))
+
+
+def format_minutes(minutes: float) -> str:
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+def parse_time_of_day(value: Optional[str], name: str) -> Optional[int]:
+    """Minutes after midnight of an `HH:MM` string."""
+    if value in (None, ""):
+        return None
+    match = TIME_PATTERN.match(str(value).strip())
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"{name} must be a time in HH:MM format")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def _optional_number(arguments: Dict[str, Any], name: str) -> Optional[float]:
+    value = arguments.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+
+
+@dataclass(frozen=True)
+class OfferFilters:
+    """Filters and sort order applied to an `OfferTable`.
+
+    Time windows are minutes after midnight in the airport's local time and
+    may wrap around midnight (e.g. from 22:00 to 06:00).
+    """
+
+    max_price: Optional[float] = None
+    max_stops: Optional[int] = None
+    max_duration_minutes: Optional[float] = None
+    max_layover_minutes: Optional[float] = None
+    departure_from: Optional[int] = None
+    departure_to: Optional[int] = None
+    return_departure_from: Optional[int] = None
+    return_departure_to: Optional[int] = None
+    airlines: FrozenSet[str] = field(default_factory=frozenset)
+    sort_by: str = "price"
+
+    @classmethod
+    def from_arguments(cls, arguments: Dict[str, Any]) -> "OfferFilters":
+        """Build from tool arguments; raises ValueError for invalid values."""
+        sort_by = (arguments.get("sort_by") or "price").lower()
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_KEYS)}")
+        max_stops = _optional_number(arguments, "max_stops")
+        max_duration = _optional_number(arguments, "max_duration_hours")
+        max_layover = _optional_number(arguments, "max_layover_hours")
+        return cls(
+            max_price=_optional_number(arguments, "max_price"),
+            max_stops=int(max_stops) if max_stops is not None else None,
+            max_duration_minutes=max_duration * 60 if max_duration is not None else None,
+            max_layover_minutes=max_layover * 60 if max_layover is not None else None,
+            departure_from=parse_time_of_day(arguments.get("departure_time_from"), "departure_time_from"),
+            departure_to=parse_time_of_day(arguments.get("departure_time_to"), "departure_time_to"),
+            return_departure_from=parse_time_of_day(
+                arguments.get("return_departure_time_from"), "return_departure_time_from"
+            ),
+            return_departure_to=parse_time_of_day(
+                arguments.get("return_departure_time_to"), "return_departure_time_to"
+            ),
+            airlines=frozenset(code.strip().upper() for code in arguments.get("airlines") or []),
+            sort_by=sort_by,
+        )
+
+    def upstream_params(self) -> Dict[str, Any]:
+        """The subset of filters the flight offers API can apply itself."""
+        params = {}
+        if self.max_stops == 0:
+            params["nonStop"] = "true"
+        if self.max_price is not None:
+            params["maxPrice"] = int(self.max_price)
+        if self.airlines:
+            params["includedAirlineCodes"] = ",".join(sorted(self.airlines))
+        return params
+
+
+class OfferTable:
+    """Flight offers as numpy columns, one row per offer and one column per leg.
+
+    Attributes:
+        offers: The raw offers, read again only for the rows returned.
+        tags: Extra fields merged into each returned offer (e.g. batch route).
+        price: Total price per offer (NaN if missing).
+        legs: Itineraries per offer (1 one-way, 2 round trip).
+        duration, stops, departure, arrival, max_layover: `(offers, max legs)`
+            arrays; missing legs are NaN / NaT.
+    """
+
+    def __init__(self, offers: List[Dict[str, Any]], dictionaries: Dict[str, Any], tags: Optional[List[Dict[str, Any]]] = None):
+        self.offers = offers
+        self.tags = tags if tags is not None else [{}] * len(offers)
+        self.carriers = dictionaries.get("carriers", {})
+        n = len(offers)
+        width = max((len(offer.get("itineraries") or []) for offer in offers), default=1) or 1
+
+        prices = np.full(n, np.nan)
+        currencies = np.empty(n, dtype=object)
+        airlines = np.empty(n, dtype=object)
+        legs = np.zeros(n, dtype=np.int64)
+        duration = np.full((n, width), np.nan)
+        stops = np.full((n, width), -1, dtype=np.int64)
+        # Flat per-segment columns; layovers are derived from them below.
+        seg_leg, seg_departure, seg_arrival = [], [], []
+        first_departure = np.full((n, width), NAT)
+        last_arrival = np.full((n, width), NAT)
+        first_dep_strings, last_arr_strings = [], []
+
+        for row, offer in enumerate(offers):
+            price = offer.get("price") or {}
+            try:
+                prices[row] = float(price.get("grandTotal") or price.get("total"))
+            except (TypeError, ValueError):
+                pass
+            currencies[row] = price.get("currency", "")
+            validating = offer.get("validatingAirlineCodes") or [""]
+            airlines[row] = validating[0]
+            itineraries = offer.get("itineraries") or []
+            legs[row] = len(itineraries)
+            for leg, itinerary in enumerate(itineraries):
+                segments = itinerary.get("segments") or []
+                duration[row, leg] = duration_minutes(itinerary.get("duration"))
+                stops[row, leg] = max(len(segments) - 1, 0) + sum(
+                    segment.get("numberOfStops", 0) for segment in segments
+                )
+                if not airlines[row] and segments:
+                    airlines[row] = segments[0].get("carrierCode", "")
+                flat = row * width + leg
+                for segment in segments:
+                    seg_leg.append(flat)
+                    seg_departure.append(segment.get("departure", {}).get("at") or "NaT")
+                    seg_arrival.append(segment.get("arrival", {}).get("at") or "NaT")
+                if segments:
+                    first_dep_strings.append((flat, seg_departure[-len(segments)]))
+                    last_arr_strings.append((flat, seg_arrival[-1]))
+
+        self.price = prices
+        self.currency = currencies
+        self.airline = airlines
+        self.legs = legs
+        self.duration = duration
+        self.stops = stops
+
+        seg_leg = np.asarray(seg_leg, dtype=np.int64)
+        seg_departure = np.asarray(seg_departure, dtype="datetime64[m]")
+        seg_arrival = np.asarray(seg_arrival, dtype="datetime64[m]")
+        if first_dep_strings:
+            index, values = zip(*first_dep_strings)
+            first_departure.reshape(-1)[list(index)] = np.asarray(values, dtype="datetime64[m]")
+            index, values = zip(*last_arr_strings)
+            last_arrival.reshape(-1)[list(index)] = np.asarray(values, dtype="datetime64[m]")
+        self.departure = first_departure
+        self.arrival = last_arrival
+
+        # Layover = next segment's departure - previous segment's arrival, within a leg.
+        max_layover = np.zeros(n * width)
+        if len(seg_leg) > 1:
+            same_leg = seg_leg[1:] == seg_leg[:-1]
+            gaps = minutes_between(seg_arrival[:-1], seg_departure[1:])
+            gaps = np.where(same_leg & ~np.isnan(gaps), gaps, 0.0)
+            np.maximum.at(max_layover, seg_leg[1:], gaps)
+        self.max_layover = max_layover.reshape(n, width)
+        self.max_layover[np.isnan(self.duration)] = np.nan
+
+        # Fall back to first departure -> last arrival when the duration is missing
+        # (both are local times, so this is only an approximation).
+        span = minutes_between(self.departure, self.arrival)
+        self.duration = np.where(np.isnan(self.duration), span, self.duration)
+
+    @classmethod
+    def from_response(cls, flight_data: Dict[str, Any], tags: Optional[Dict[str, Any]] = None) -> "OfferTable":
+        """Parse an Amadeus flight offers response; `tags` are added to every offer."""
+        offers = flight_data.get("data") or []
+        return cls(offers, flight_data.get("dictionaries") or {}, [tags or {}] * len(offers))
+
+    @classmethod
+    def concat(cls, responses: Sequence[Dict[str, Any]], tags: Sequence[Dict[str, Any]]) -> "OfferTable":
+        """One table over several responses (batch searches), tagging each response's offers."""
+        offers, offer_tags, dictionaries = [], [], {"carriers": {}}
+        for flight_data, tag in zip(responses, tags):
+            data = flight_data.get("data") or []
+            offers.extend(data)
+            offer_tags.extend([tag] * len(data))
+            dictionaries["carriers"].update((flight_data.get("dictionaries") or {}).get("carriers", {}))
+        return cls(offers, dictionaries, offer_tags)
+
+    def __len__(self) -> int:
+        return len(self.offers)
+
+    @staticmethod
+    def _in_window(times: np.ndarray, start: Optional[int], end: Optional[int]) -> np.ndarray:
+        minutes = (times - times.astype("datetime64[D]")).astype(np.int64)
+        start = 0 if start is None else start
+        end = 24 * 60 - 1 if end is None else end
+        inside = (minutes >= start) & (minutes <= end) if start <= end else (minutes >= start) | (minutes <= end)
+        return inside & ~np.isnat(times)
+
+    def mask(self, filters: OfferFilters) -> np.ndarray:
+        """Boolean array of the offers passing `filters` (and parsed correctly)."""
+        # Every itinerary the offer has must have parsed (a first departure).
+        present = np.arange(self.departure.shape[1]) < self.legs[:, None]
+        valid = (
+            ~np.isnan(self.price)
+            & (self.legs > 0)
+            & ~(present & np.isnat(self.departure)).any(axis=1)
+        )
+        if filters.max_price is not None:
+            valid &= self.price <= filters.max_price
+        if filters.max_stops is not None:
+            valid &= self.stops.max(axis=1) <= filters.max_stops
+        if filters.max_duration_minutes is not None:
+            # Every leg must be within the limit; missing legs are NaN and ignored.
+            valid &= ~(self.duration > filters.max_duration_minutes).any(axis=1)
+        if filters.max_layover_minutes is not None:
+            valid &= ~(self.max_layover > filters.max_layover_minutes).any(axis=1)
+        if filters.departure_from is not None or filters.departure_to is not None:
+            valid &= self._in_window(self.departure[:, 0], filters.departure_from, filters.departure_to)
+        if self.departure.shape[1] > 1 and (
+            filters.return_departure_from is not None or filters.return_departure_to is not None
+        ):
+            has_return = self.legs > 1
+            valid &= ~has_return | self._in_window(
+                self.departure[:, 1], filters.return_departure_from, filters.return_departure_to
+            )
+        if filters.airlines:
+            valid &= np.isin(self.airline, list(filters.airlines))
+        return valid
+
+    def rank(self, filters: OfferFilters, limit: Optional[int] = None) -> np.ndarray:
+        """Row indices of the offers passing `filters`, best first, at most `limit`."""
+        rows = np.flatnonzero(self.mask(filters))
+        if not len(rows):
+            return rows
+        price = self.price[rows]
+        total_duration = np.nansum(self.duration[rows], axis=1)
+        if filters.sort_by == "duration":
+            keys = (price, total_duration)
+        elif filters.sort_by == "departure":
+            keys = (price, self.departure[rows, 0].astype(np.int64))
+        elif filters.sort_by == "best":
+            stops = self.stops[rows].clip(min=0).sum(axis=1)
+            score = sum(
+                weight * (values - values.min()) / (np.ptp(values) or 1.0)
+                for weight, values in zip(BEST_WEIGHTS, (price, total_duration, stops))
+            )
+            keys = (total_duration, score)
+        else:
+            keys = (total_duration, price)
+        # np.lexsort sorts by the last key first.
+        if limit is not None and limit < len(rows) and filters.sort_by == "price":
+            candidates = np.argpartition(price, limit - 1)[:limit]
+            cutoff = price[candidates].max()
+            # Keep every offer tied at the cutoff so ordering stays stable.
+            candidates = np.flatnonzero(price <= cutoff)
+            order = candidates[np.lexsort(tuple(key[candidates] for key in keys))]
+        else:
+            order = np.lexsort(keys)
+        return rows[order[:limit] if limit is not None else order]
+
+    def _segment_cabins(self, offer: Dict[str, Any]) -> Dict[str, str]:
+        pricings = offer.get("travelerPricings") or [{}]
+        return {
+            details.get("segmentId"): details.get("cabin", "ECONOMY")
+            for details in pricings[0].get("fareDetailsBySegment", [])
+        }
+
+    def leg_summary(self, row: int, leg: int) -> Dict[str, Any]:
+        """Verbose description of one itinerary of offer `row`."""
+        offer = self.offers[row]
+        itinerary = offer["itineraries"][leg]
+        segments = itinerary.get("segments") or []
+        first, last = segments[0], segments[-1]
+        cabins = self._segment_cabins(offer)
+        carrier_code = first.get("carrierCode", "")
+        stops = int(self.stops[row, leg])
+        summary = {
+            "airline": self.carriers.get(carrier_code, carrier_code or "Unknown Airline"),
+            "duration": itinerary.get("duration") or format_minutes(self.duration[row, leg]),
+            "stops": "Nonstop" if stops == 0 else f"{stops} stop(s)",
+            "departure": f"{first['departure'].get('iataCode', '')} at {first['departure']['at']}",
+            "arrival": f"{last['arrival'].get('iataCode', '')} at {last['arrival']['at']}",
+            "travel_class": cabins.get(first.get("id"), "ECONOMY"),
+        }
+        if len(segments) > 1:
+            summary["layovers"] = [
+                segment["arrival"].get("iataCode", "") for segment in segments[:-1]
+            ]
+            summary["longest_layover"] = format_minutes(self.max_layover[row, leg])
+        return summary
+
+    def summarize(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        """Verbose offers for `rows`: the outbound leg at the top level, as
+        before, and the return leg under `return_flight`."""
+        summaries = []
+        for row in rows:
+            row = int(row)
+            summary = self.leg_summary(row, 0)
+            summary["price"] = f"{self.price[row]:.2f} {self.currency[row]}"
+            if self.legs[row] > 1:
+                summary["return_flight"] = self.leg_summary(row, 1)
+            summary.update(self.tags[row])
+            summaries.append(summary)
+        return summaries
@@ -0,0 +1,194 @@
+"""Deferred imports, warm-up and readiness reporting for the chat app.
+
+Importing `smart_trip_agent.agent` pulls in google-adk, google-genai and the
+agent tree (close to a second and several hundred modules), and the first
+chat request used to pay for opening an MCP session and listing tools on
+every toolset. `Startup` moves that work off the request path:
+
+1. the web app starts without the agent, so `/health` answers immediately;
+2. a background task imports the heavy modules in a worker thread, timing
+   each one, and builds the agent with the given factory;
+3. warm-up walks the agent tree and calls `get_tools()` on every toolset,
+   which opens the MCP sessions and fills ADK's tool list cache; in-process
+   toolsets also create the shared `TravelAgentService` (`warm_up()`).
+
+`/health` reports `starting`, `warming`, `ready`, `degraded` (warm-up failed
+for some toolsets; requests still work and reconnect lazily) or `failed`,
+with per-module import and per-phase timings. Requests arriving before the
+agent exists wait for it instead of failing.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import importlib
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Imported in this order so each entry's time excludes the ones before it.
+HEAVY_MODULES = (
+    "google.genai",
+    "mcp",
+    "google.adk.agents",
+    "google.adk.runners",
+    "smart_trip_agent.agent",
+)
+
+STARTING = "starting"
+WARMING = "warming"
+READY = "ready"
+DEGRADED = "degraded"
+FAILED = "failed"
+
+
+def _toolsets(agent, seen: Optional[set] = None) -> List[Any]:
+    """Toolsets of `agent` and of every agent below it (sub-agents and AgentTools)."""
+    seen = seen if seen is not None else set()
+    if id(agent) in seen:
+        return []
+    seen.add(id(agent))
+    toolsets = []
+    for tool in getattr(agent, "tools", []) or []:
+        if hasattr(tool, "get_tools"):
+            toolsets.append(tool)
+        elif hasattr(tool, "agent"):
+            toolsets.extend(_toolsets(tool.agent, seen))
+    for sub_agent in getattr(agent, "sub_agents", []) or []:
+        toolsets.extend(_toolsets(sub_agent, seen))
+    return toolsets
+
+
+class Startup:
+    """Background import, construction and warm-up of the chat agent.
+
+    Attributes:
+        modules: Modules imported (and timed) before the agent is built.
+        warmup: Whether to open MCP sessions and list tools before `ready`.
+        warmup_timeout: Seconds each toolset gets to warm up.
+        state: One of `starting`, `warming`, `ready`, `degraded`, `failed`.
+        agent: The object built by the factory, once it exists.
+    """
+
+    def __init__(self, modules=HEAVY_MODULES, warmup: bool = True, warmup_timeout: float = 20.0):
+        self.modules = tuple(modules)
+        self.warmup = warmup
+        self.warmup_timeout = warmup_timeout
+        self.state = STARTING
+        self.agent = None
+        self.error: Optional[str] = None
+        self.import_times: Dict[str, Dict[str, Any]] = {}
+        self.phases: Dict[str, float] = {}
+        self.toolsets: List[Dict[str, Any]] = []
+        self._created = time.perf_counter()
+        self._built: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "Startup":
+        """Build from STARTUP_WARMUP (on/off) and STARTUP_WARMUP_TIMEOUT."""
+        return cls(
+            warmup=os.getenv("STARTUP_WARMUP", "true").lower() == "true",
+            warmup_timeout=float(os.getenv("STARTUP_WARMUP_TIMEOUT", "20")),
+        )
+
+    def _import_modules(self):
+        for name in self.modules:
+            started = time.perf_counter()
+            loaded = len(sys.modules)
+            importlib.import_module(name)
+            self.import_times[name] = {
+                "seconds": round(time.perf_counter() - started, 3),
+                "modules_loaded": len(sys.modules) - loaded,
+            }
+            logger.info(f"Imported {name} in {self.import_times[name]['seconds']}s")
+
+    async def _warm_toolset(self, toolset) -> Dict[str, Any]:
+        name = getattr(toolset, "mount", None) or getattr(
+            getattr(toolset, "_connection_params", None), "url", type(toolset).__name__
+        )
+        started = time.perf_counter()
+        try:
+            tools = await asyncio.wait_for(toolset.get_tools(), self.warmup_timeout)
+            if hasattr(toolset, "warm_up"):
+                await asyncio.wait_for(toolset.warm_up(), self.warmup_timeout)
+            return {"toolset": name, "tools": len(tools), "seconds": round(time.perf_counter() - started, 3)}
+        except Exception as e:
+            logger.error(f"Warm-up of toolset {name} failed: {e!r}")
+            return {"toolset": name, "error": repr(e), "seconds": round(time.perf_counter() - started, 3)}
+
+    async def _run(self, factory: Callable[[], Any], root_agent: Callable[[Any], Any]):
+        try:
+            started = time.perf_counter()
+            await asyncio.to_thread(self._import_modules)
+            self.phases["imports"] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            self.agent = factory()
+            self.phases["build"] = round(time.perf_counter() - started, 3)
+            self._built.set()
+
+            if self.warmup:
+                self.state = WARMING
+                started = time.perf_counter()
+                self.toolsets = list(
+                    await asyncio.gather(*(self._warm_toolset(t) for t in _toolsets(root_agent(self.agent))))
+                )
+                self.phases["warmup"] = round(time.perf_counter() - started, 3)
+            failed = [t for t in self.toolsets if "error" in t]
+            self.state = DEGRADED if failed else READY
+            self.phases["total"] = round(time.perf_counter() - self._created, 3)
+            logger.info(f"Chat agent {self.state} after {self.phases['total']}s ({self.phases})")
+        except Exception as e:
+            self.state = FAILED
+            self.error = repr(e)
+            logger.error(f"Chat agent startup failed: {e!r}")
+            self._built.set()
+
+    def start(self, factory: Callable[[], Any], root_agent: Callable[[Any], Any] = lambda agent: agent.agent):
+        """Begin startup on the running loop; `factory()` builds the agent after
+        the imports, and `root_agent(agent)` gives the ADK agent tree to warm."""
+        if self._task is None:
+            self._built = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(factory, root_agent))
+
+    async def get_agent(self, timeout: Optional[float] = None):
+        """The built agent, waiting for startup if a request arrives early."""
+        if self.agent is None:
+            if self._built is None:
+                raise RuntimeError("Startup has not been started")
+            await asyncio.wait_for(self._built.wait(), timeout)
+        if self.agent is None:
+            raise RuntimeError(f"Chat agent failed to start: {self.error}")
+        return self.agent
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        return self.state in (READY, DEGRADED)
+
+    def status(self) -> Dict[str, Any]:
+        """Health payload: state, uptime, phase and per-module import timings."""
+        return {
+            "status": self.state,
+            "ready": self.ready,
+            "uptime_s": round(time.perf_counter() - self._created, 3),
+            "phases": dict(self.phases),
+            "imports": dict(self.import_times),
+            "toolsets": list(self.toolsets),
+            "error": self.error,
+        }
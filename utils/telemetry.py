@@ -0,0 +1,299 @@
+"""Metrics and tracing for the chat app, the agents, the MCP server and Amadeus calls.
+
+Every instrumented step runs inside `span(name, target)`:
+
+- `chat.request`: a `/chat` or `/chat/stream` request in `chatbot_app.py`;
+- `agent.response`: `SmartTripAgent.get_response` / `stream_response`;
+- `agent.run` / `llm.call`: one agent (root or sub-agent after a transfer)
+  and one model request, timed from ADK callbacks;
+- `mcp.tool`: one tool call in `server.py` or through the in-process toolset;
+- `mcp.batch`: one JSON-RPC batch of tool calls on an MCP mount, until its
+  last result is sent;
+- `amadeus.http`: one Amadeus HTTP request (each retry is its own span);
+- `planner.task` / `planner.synthesis`: one concurrent sub-agent branch and
+  the merge step of the parallel planner.
+
+Span latencies go to one histogram labelled by span and target. Together
+with token counters and cache/rate-limit gauges collected from the services'
+`stats()`, they are rendered in the Prometheus text format by `/metrics`.
+Values are per process: scrape every worker, or run one.
+
+When OTEL_EXPORTER_OTLP_ENDPOINT is set and the OTLP exporter package is
+installed, `configure_tracing` also exports spans to that collector. ADK
+emits its own agent, model and tool spans on the same tracer provider.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds; chat turns with several model calls can take tens of seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = namedtuple("Sample", ["name", "kind", "help", "labels", "value"])
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield Sample(self.name, self.kind, self.help, dict(zip(self.label_names, key)), value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, rendered as `_bucket`, `_sum` and `_count`."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._lock = threading.Lock()
+        # label values -> ([count per bucket], sum, count)
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = {key: (list(e[0]), e[1], e[2]) for key, e in self._values.items()}
+        for key, (counts, total, count) in values.items():
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield Sample(
+                    f"{self.name}_bucket", self.kind, self.help,
+                    {**labels, "le": _format_value(bound)}, cumulative,
+                )
+            yield Sample(f"{self.name}_sum", self.kind, self.help, labels, total)
+            yield Sample(f"{self.name}_count", self.kind, self.help, labels, count)
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that turn `stats()` dicts into samples."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: list = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def histogram(
+        self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Call `collector()` on every render; it yields `Sample`s (gauges or counters)."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families: Dict[str, list] = {}
+        headers: Dict[str, Tuple[str, str]] = {}
+        for metric in metrics:
+            headers[metric.name] = (metric.kind, metric.help)
+            families[metric.name] = list(metric.samples())
+        for collector in collectors:
+            try:
+                for sample in collector():
+                    headers.setdefault(sample.name, (sample.kind, sample.help))
+                    families.setdefault(sample.name, []).append(sample)
+            except Exception as e:
+                logger.error(f"Metrics collector {collector} failed: {e}")
+        lines = []
+        for name, samples in families.items():
+            kind, help = headers[name]
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in samples:
+                if sample.value is None:
+                    continue
+                lines.append(
+                    f"{sample.name}{_format_labels(sample.labels)} {_format_value(sample.value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+SPAN_SECONDS = registry.histogram(
+    "smart_trip_span_duration_seconds",
+    "Latency of instrumented steps by span name, target and outcome.",
+    ["span", "target", "status"],
+)
+LLM_TOKENS = registry.counter(
+    "smart_trip_llm_tokens_total",
+    "Tokens reported by the model per agent and kind (prompt, completion, cached).",
+    ["agent", "kind"],
+)
+AGENT_TRANSFERS = registry.counter(
+    "smart_trip_agent_transfers_total",
+    "Runs of each sub-agent after a transfer from the root agent.",
+    ["agent"],
+)
+AMADEUS_RESPONSES = registry.counter(
+    "smart_trip_amadeus_responses_total",
+    "Amadeus HTTP responses by endpoint family and status code (error for network failures).",
+    ["family", "status"],
+)
+
+_tracer = None
+
+
+def configure_tracing(service_name: str) -> bool:
+    """Export spans over OTLP/HTTP if OTEL_EXPORTER_OTLP_ENDPOINT is set.
+
+    Returns whether tracing is on. The exporter reads the standard
+    OTEL_EXPORTER_OTLP_* variables; OTEL_SERVICE_NAME overrides `service_name`.
+    """
+    global _tracer
+    if _tracer is not None:
+        return True
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        logger.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-exporter-otlp-proto-http is not installed; tracing is off"
+        )
+        return False
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("smart_trip")
+    logger.info(f"Exporting traces for {service_name} to {os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT')}")
+    return True
+
+
+class Span:
+    """Handle yielded by `span`; attributes only reach the OpenTelemetry span."""
+
+    def __init__(self, otel_span=None):
+        self._otel_span = otel_span
+        self.status = "ok"
+
+    def set(self, key: str, value):
+        if self._otel_span is not None and value is not None:
+            self._otel_span.set_attribute(key, value)
+
+
+def record_span(name: str, target: str, seconds: float, status: str = "ok"):
+    """Record a span timed elsewhere (e.g. between two ADK callbacks)."""
+    SPAN_SECONDS.observe(seconds, span=name, target=target, status=status)
+
+
+@contextlib.contextmanager
+def span(name: str, target: str = "", **attributes):
+    """Time the block as span `name` on `target`; an exception marks it `error`.
+
+    `target` is a metric label, so it must come from a small set (tool names,
+    endpoint families, agent names), never from user input.
+    """
+    started = time.perf_counter()
+    if _tracer is not None:
+        otel = _tracer.start_as_current_span(
+            name, attributes={"target": target, **{k: v for k, v in attributes.items() if v is not None}}
+        )
+    else:
+        otel = contextlib.nullcontext()
+    with otel as otel_span:
+        current = Span(otel_span)
+        try:
+            yield current
+        except BaseException as e:
+            # GeneratorExit: a streaming client went away mid-response.
+            cancelled = isinstance(e, (asyncio.CancelledError, GeneratorExit))
+            current.status = "cancelled" if cancelled else "error"
+            raise
+        finally:
+            record_span(name, target, time.perf_counter() - started, current.status)
+
+
+def metrics_response_body() -> Tuple[str, str]:
+    """`(body, content_type)` for a `/metrics` endpoint."""
+    return registry.render(), "text/plain; version=0.0.4; charset=utf-8"
@@ -1,9 +1,19 @@
 from requests_oauthlib import OAuth2Session
 from oauthlib.oauth2 import BackendApplicationClient
 import os
+import time
+import asyncio
+import sqlite3
 import logging
+import threading
+import contextlib
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, workers may fetch in parallel
+    fcntl = None
+
 load_dotenv()
 token_url = os.getenv("ACCESS_TOKEN_URL")
 client_id = os.getenv("AMADEUS_CLIENT_ID")
@@ -13,24 +23,263 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def get_token():
+def fetch_token():
     """
     Fetch OAuth token from Amadeus API using client credentials.
-    Returns the access token string, or None if an error occurs.
+    Returns the raw token dictionary (including `expires_in`).
+    Raises on failure.
+    """
+    logger.info(f"Requesting OAuth token from Amadeus...")
+
+    client = BackendApplicationClient(client_id=client_id)
+    oauth = OAuth2Session(client=client)
+    token = oauth.fetch_token(
+        token_url=token_url,
+        client_id=client_id,
+        client_secret=client_secret,
+        verify=False,
+    )
+    logger.info(f"Successfully obtained Amadeus API token...")
+    return token
+
+
+class SQLiteTokenStore:
+    """Token record shared by every process pointing at the same SQLite file.
+
+    Used when the MCP server runs several worker processes: the first worker
+    to refresh stores the token and the others adopt it instead of requesting
+    their own. `locked()` serializes refreshes across processes with an
+    advisory lock on `<path>.lock`.
     """
-    try:
-        logger.info(f"Requesting OAuth token from Amadeus...")
-
-        client = BackendApplicationClient(client_id=client_id)
-        oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
-            token_url=token_url,
-            client_id=client_id,
-            client_secret=client_secret,
-            verify=False,
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS oauth_token ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), "
+            "access_token TEXT NOT NULL, expires_at REAL NOT NULL)"
         )
-        logger.info(f"Successfully obtained Amadeus API token...")
-        return token["access_token"]
-    except Exception as e:
-        logger.info(f"Error while fetching the token due to: {e}")
-        return None
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Return `(access_token, expires_at)` (wall-clock expiry) or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT access_token, expires_at FROM oauth_token WHERE id = 1"
+            ).fetchone()
+
+    def save(self, access_token: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO oauth_token VALUES (1, ?, ?)",
+                (access_token, expires_at),
+            )
+            self._conn.commit()
+
+    def discard(self, access_token: str):
+        """Remove the stored token if it is still `access_token`."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM oauth_token WHERE access_token = ?", (access_token,)
+            )
+            self._conn.commit()
+
+    @contextlib.contextmanager
+    def locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class TokenManager:
+    """Caches the Amadeus OAuth token for its `expires_in` lifetime.
+
+    The token is refreshed in a background thread once it enters the refresh
+    window (`refresh_margin` seconds before expiry), so callers keep getting
+    the current token while the new one is fetched. Refreshes are
+    single-flight: concurrent callers that find no usable token wait for the
+    one in-flight request instead of each fetching their own.
+
+    With a `store`, the token is also shared between processes: a refresh
+    first checks whether another process already stored a token that is
+    still outside the refresh window and only calls the fetcher otherwise.
+
+    Attributes:
+        refresh_margin: Seconds before expiry at which a background refresh starts.
+        default_ttl: Lifetime assumed when the token response has no `expires_in`.
+        store: Optional cross-process token store (e.g. `SQLiteTokenStore`).
+    """
+
+    def __init__(
+        self, fetcher=fetch_token, refresh_margin=60, default_ttl=1799, store=None
+    ):
+        self.fetcher = fetcher
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.store = store
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+        self._refreshing = False
+        self._access_token = None
+        self._expires_at = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._refreshes = 0
+        self._background_refreshes = 0
+        self._refresh_failures = 0
+        self._refresh_latency_total = 0.0
+        self._refresh_latency_max = 0.0
+        self._last_refresh_latency = 0.0
+        self._shared_adoptions = 0
+
+    def get_token(self):
+        """Return a valid access token string, or None if it cannot be obtained."""
+        with self._lock:
+            now = time.monotonic()
+            if self._access_token and now < self._expires_at:
+                self._hits += 1
+                if (
+                    now >= self._expires_at - self.refresh_margin
+                    and not self._refreshing
+                ):
+                    self._refreshing = True
+                    self._background_refreshes += 1
+                    threading.Thread(
+                        target=self._refresh, name="amadeus-token-refresh", daemon=True
+                    ).start()
+                return self._access_token
+
+            self._misses += 1
+            if self._refreshing:
+                # Another caller is already fetching a token; share its result.
+                self._coalesced += 1
+                while self._refreshing:
+                    self._refreshed.wait()
+                return self._access_token if time.monotonic() < self._expires_at else None
+
+            self._refreshing = True
+
+        self._refresh()
+        with self._lock:
+            return self._access_token if time.monotonic() < self._expires_at else None
+
+    async def get_token_async(self):
+        """Awaitable get_token() that never blocks the event loop on a fetch."""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._access_token
+                and now < self._expires_at - self.refresh_margin
+            ):
+                self._hits += 1
+                return self._access_token
+        # Refresh window or miss: the blocking path handles background refresh
+        # and single-flight, so run it off the loop.
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self):
+        """Drop the cached token, e.g. after the API rejected it with a 401."""
+        with self._lock:
+            rejected = self._access_token
+            self._access_token = None
+            self._expires_at = 0.0
+        if self.store is not None and rejected:
+            self.store.discard(rejected)
+
+    def _fetch(self, started: float):
+        """Return `(access_token, monotonic expiry)`, or `(None, 0.0)` on failure."""
+        token = self.fetcher()
+        if not token or not token.get("access_token"):
+            return None, 0.0
+        ttl = float(token.get("expires_in") or self.default_ttl)
+        return token["access_token"], started + ttl
+
+    def _fetch_shared(self, started: float):
+        """Adopt a token another process stored, fetching and storing one otherwise."""
+        with self.store.locked():
+            stored = self.store.load()
+            if stored:
+                remaining = stored[1] - time.time()
+                if remaining > self.refresh_margin:
+                    with self._lock:
+                        self._shared_adoptions += 1
+                    return stored[0], time.monotonic() + remaining
+            access_token, expires_at = self._fetch(started)
+            if access_token:
+                self.store.save(
+                    access_token, time.time() + (expires_at - time.monotonic())
+                )
+            return access_token, expires_at
+
+    def _refresh(self):
+        started = time.monotonic()
+        access_token, expires_at = None, 0.0
+        try:
+            if self.store is not None:
+                access_token, expires_at = self._fetch_shared(started)
+            else:
+                access_token, expires_at = self._fetch(started)
+        except Exception as e:
+            logger.info(f"Error while fetching the token due to: {e}")
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            self._refreshing = False
+            self._refreshes += 1
+            self._last_refresh_latency = elapsed
+            self._refresh_latency_total += elapsed
+            self._refresh_latency_max = max(self._refresh_latency_max, elapsed)
+            if access_token:
+                self._access_token = access_token
+                self._expires_at = expires_at
+            else:
+                self._refresh_failures += 1
+            self._refreshed.notify_all()
+
+    def stats(self) -> dict:
+        """Return hit-rate and refresh-latency metrics for the token cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced_waits": self._coalesced,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "refreshes": self._refreshes,
+                "background_refreshes": self._background_refreshes,
+                "refresh_failures": self._refresh_failures,
+                "shared_adoptions": self._shared_adoptions,
+                "last_refresh_latency_ms": self._last_refresh_latency * 1000,
+                "avg_refresh_latency_ms": (
+                    self._refresh_latency_total / self._refreshes * 1000
+                    if self._refreshes
+                    else 0.0
+                ),
+                "max_refresh_latency_ms": self._refresh_latency_max * 1000,
+                "expires_in_s": max(0.0, self._expires_at - time.monotonic()),
+            }
+
+
+token_store_path = os.getenv("TOKEN_STORE_PATH")
+token_manager = TokenManager(
+    store=SQLiteTokenStore(token_store_path) if token_store_path else None
+)
+
+
+def get_token():
+    """
+    Return a cached OAuth token for the Amadeus API, fetching a new one only
+    when the cached token is missing or expired.
+    Returns the access token string, or None if an error occurs.
+    """
+    return token_manager.get_token()